@@ -12,6 +12,7 @@ from collections import defaultdict
 from datetime import datetime
 from core.chat_assistant import ChatAssistant
 from core.chat_scraper import ChatScraperSync
+from core.image_cache import get_image_cache
 
 # Backend integration
 import sys
@@ -298,6 +299,27 @@ def initialize_services():
         st.error(f"Error initializing services: {e}")
         return None, None, None, None
 
+def product_image_source(image_url: Optional[str], placeholder: str) -> str:
+    """
+    Local thumbnail for a product image if it is cached, else the remote URL, or the placeholder without one
+    A miss queues the thumbnail in the background, so a cold cache never holds up the page
+    """
+    if not image_url:
+        return placeholder
+    image_cache = get_image_cache()
+    if image_cache:
+        path = image_cache.get(image_url)
+        if path:
+            return path
+        image_cache.warm([image_url])
+    return image_url
+
+def warm_thumbnails(products: List[Dict]):
+    """Start making thumbnails for a page of products without waiting for them"""
+    image_cache = get_image_cache()
+    if image_cache:
+        image_cache.warm(p.get('image_url') for p in products)
+
 def feedback_button(product_id, session_id, db_manager, action_type, icon, tooltip):
     """Create a feedback button for a product"""
     is_feedback = db_manager.is_product_feedback(session_id, product_id, action_type)
@@ -324,10 +346,8 @@ def display_cart_sidebar(session_id, db_manager):
             col1, col2 = st.columns([1, 3])
             
             with col1:
-                if item.get('image_url'):
-                    st.image(item['image_url'], width=60, caption="")
-                else:
-                    st.image("https://via.placeholder.com/60x60?text=No+Image", width=60, caption="")
+                st.image(product_image_source(item.get('image_url'), "https://via.placeholder.com/60x60?text=No+Image"),
+                         width=60, caption="")
             
             with col2:
                 st.markdown(f"**{item['product_title'][:30]}{'...' if len(item['product_title']) > 30 else ''}**")
@@ -359,7 +379,8 @@ def display_product_card(product: Dict, index: Optional[int] = None, session_id:
     col1, col2 = st.columns([1, 3])
     with col1:
         if product.get('image_url'):
-            st.image(product['image_url'], use_container_width=True, caption="Product Image")
+            st.image(product_image_source(product['image_url'], product['image_url']),
+                     use_container_width=True, caption="Product Image")
         else:
             st.image("https://via.placeholder.com/200x200?text=No+Image", use_container_width=True, caption="No Image Available")
         # Cart button
@@ -400,6 +421,7 @@ def display_products(products: List[Dict], session_id: str = None, db_manager=No
         st.warning("No products found matching your criteria.")
         return
     
+    warm_thumbnails(products)
     for i, product in enumerate(products):
         display_product_card(product, i, session_id=session_id, db_manager=db_manager)
 
@@ -757,28 +779,29 @@ def main():
                             filters = chat_assistant.extract_search_filters(parsed_query)
                             # 3. Use Japanese keywords for search
                             search_keyword = " ".join(parsed_query.get("japanese_keywords", []))
-                            # 4. Real-time scrape (no cache)
-                            products = chat_scraper.search_products_fast(search_keyword, filters, max_results=5)
-                            # 5. Show only 3-5 most relevant
-                            products = products[:5]
-                            # 6. LLM: generate reasoning
-                            reasoning = chat_assistant.generate_search_reasoning(prompt, parsed_query, products)
-                            st.markdown(reasoning)
+                            # 4. Real-time scrape (no cache), rendering each card as soon as it is extracted
+                            # 5. The reasoning needs every result, so it fills its slot above the cards afterwards
+                            reasoning_slot = st.empty()
                             st.markdown("### 🎯 Top Results")
-                            if products:
-                                for idx, product in enumerate(products):
-                                    with st.container():
-                                        st.image(product["image_url"], width=180)
-                                        st.markdown(f"**{product['name']}**")
-                                        st.markdown(f"<span class='price-tag'>¥{product['price']:,}</span>", unsafe_allow_html=True)
-                                        st.markdown(f"Condition: {product['condition'].capitalize()}")
-                                        st.markdown(f"Seller Rating: {product.get('seller_rating', 'N/A')}")
-                                        st.markdown(f"[View on Mercari]({product['product_url']})", unsafe_allow_html=True)
-                                        if st.button("Add to Cart", key=f"add_cart_{idx}"):
-                                            data_handler.db_manager.add_to_cart(st.session_state.session_id, product)
-                                            st.success("Added to cart!")
-                            else:
+                            products = []
+                            for product in chat_scraper.stream_products_fast(search_keyword, filters, max_results=5):
+                                idx = len(products)
+                                products.append(product)
+                                with st.container():
+                                    st.image(product_image_source(product["image_url"], product["image_url"]), width=180)
+                                    st.markdown(f"**{product['name']}**")
+                                    st.markdown(f"<span class='price-tag'>¥{product['price']:,}</span>", unsafe_allow_html=True)
+                                    st.markdown(f"Condition: {product['condition'].capitalize()}")
+                                    st.markdown(f"Seller Rating: {product.get('seller_rating', 'N/A')}")
+                                    st.markdown(f"[View on Mercari]({product['product_url']})", unsafe_allow_html=True)
+                                    if st.button("Add to Cart", key=f"add_cart_{idx}"):
+                                        data_handler.db_manager.add_to_cart(st.session_state.session_id, product)
+                                        st.success("Added to cart!")
+                            if not products:
                                 st.warning("No products found. Try a different query.")
+                            # 6. LLM: generate reasoning
+                            reasoning = chat_assistant.generate_search_reasoning(prompt, parsed_query, products)
+                            reasoning_slot.markdown(reasoning)
                         except Exception as e:
                             st.error(f"Error: {e}")
                             st.info("Please try again or check your internet connection.")
@@ -0,0 +1,35 @@
+from .config import SessionLocal
+from sqlalchemy import text
+
+def add_enriched_at_column():
+    """Add enriched_at column to the products table"""
+    session = SessionLocal()
+    try:
+        # Rows stay NULL until enrich_details has tried their detail page
+        session.execute(text("""
+            ALTER TABLE products 
+            ADD COLUMN IF NOT EXISTS enriched_at TIMESTAMP
+        """))
+        session.commit()
+        print("✅ Successfully added enriched_at column to products table")
+        
+        # Verify the column was added
+        result = session.execute(text("""
+            SELECT column_name, data_type 
+            FROM information_schema.columns 
+            WHERE table_name = 'products' AND column_name = 'enriched_at'
+        """))
+        
+        if result.fetchone():
+            print("✅ enriched_at column verified in database")
+        else:
+            print("❌ enriched_at column not found")
+            
+    except Exception as e:
+        session.rollback()
+        print(f"❌ Error adding enriched_at column: {e}")
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    add_enriched_at_column()
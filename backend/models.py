@@ -20,6 +20,7 @@ class Product(Base):
     url = Column(String)  # This is the product_url
     description = Column(Text)
     seo_tags = Column(ARRAY(String))  # New column for SEO tags
+    enriched_at = Column(DateTime)  # When the detail page was last tried, see scraper.enrich_details
 
 # Create indexes for better search performance
 Index('ix_products_name', Product.name)
@@ -1,4 +1,6 @@
+import argparse
 import asyncio
+import os
 import time
 import random
 import uuid
@@ -10,8 +12,14 @@ from sqlalchemy.orm import Session, sessionmaker
 
 from .config import engine, SessionLocal, SCRAPER_CONFIG, MERCARI_BASE_URL, MERCARI_SEARCH_URL
 from .models import Product, Base
+from core.checkpoint import RunCheckpoint
+from core.crawl_state import CrawlState, DEFAULT_CRAWL_STATE_PATH, listing_key
+from core.rate_limiter import get_rate_limiter, host_of
+from core.resource_blocker import ResourceBlocker
+from core.scroll_loader import scroll_until_loaded
+from core.seen_filter import load_seen_filter
 from .utils import (
-    retry_on_exception, get_random_user_agent, async_random_delay,
+    retry_on_exception, get_random_user_agent,
     sanitize_text, extract_price_from_text, extract_condition_from_text,
     extract_category_from_url, logger
 )
@@ -19,15 +27,60 @@ from .utils import (
 # Create tables
 Base.metadata.create_all(bind=engine)
 
+DEFAULT_CHECKPOINT_PATH = os.path.join(".scraper_state", "backend_checkpoint.json")
+# Separate from the app database's filter, since this scraper writes to its own products table
+DEFAULT_SEEN_FILTER_PATH = os.path.join(".scraper_state", "backend_seen_ids.bloom")
+
+# Any of the title selectors scrape_product_details reads means the item has rendered
+DETAIL_READY_SELECTOR = 'h1, [data-testid="item-name"], .item-name'
+
+# Reads the same fields as _extract_product_from_item for every item in one call
+BATCH_EXTRACT_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).map(item => {
+    const img = item.querySelector('img');
+    const divs = item.querySelectorAll(':scope > div');
+    const link = item.querySelector('a');
+    return {
+        src: img ? img.getAttribute('src') : null,
+        alt: img ? img.getAttribute('alt') : null,
+        priceText: divs.length > 2 ? divs[2].textContent : null,
+        href: link ? link.getAttribute('href') : null
+    };
+})
+"""
+
 class MercariScraper:
     """Playwright-based scraper for Mercari Japan"""
     
-    def __init__(self):
+    def __init__(self, workers: int = None):
         self.session = SessionLocal()
         self.scraped_count = 0
         self.duplicate_count = 0
         self.error_count = 0
         
+        # Concurrent pages share the process-wide limiter, so politeness holds however many workers run
+        self.workers = workers or SCRAPER_CONFIG.get("workers", 3)
+        self.rate_limiter = get_rate_limiter()
+        
+        # Per-keyword high-water marks for incremental crawls
+        self.crawl_state = CrawlState(path=SCRAPER_CONFIG.get("crawl_state_path", DEFAULT_CRAWL_STATE_PATH))
+        self.new_listing_count = 0
+        self.pages_skipped = 0
+        
+        # Search pages that raised, so a checkpointed run does not record them as done
+        self.failed_pages = set()
+        
+        # Stored listing IDs, so most duplicates are rejected in memory instead of by a failed insert
+        self.seen_filter_path = SCRAPER_CONFIG.get("seen_filter_path", DEFAULT_SEEN_FILTER_PATH)
+        self.seen_ids = load_seen_filter(
+            self.seen_filter_path, lambda: [row.id for row in self.session.query(Product.id)]
+        )
+        
+        # Only DOM text and img src attributes are read, so skip downloading heavy resources
+        self.resource_blocker = ResourceBlocker(
+            allowed_types=SCRAPER_CONFIG.get("allowed_resource_types")
+        )
+        
     async def __aenter__(self):
         self.playwright = await async_playwright().start()
         self.browser = await self.playwright.chromium.launch(
@@ -62,14 +115,34 @@ class MercariScraper:
             });
         """)
         
+        # Abort images, fonts, media, CSS and analytics requests
+        await self.resource_blocker.attach(page)
+        
         return page
     
+    async def _rate_limited_goto(self, page: Page, url: str, timeout: int):
+        """Navigate after taking a rate-limit token, reporting the outcome back"""
+        host = host_of(url)
+        await self.rate_limiter.acquire_async(host)
+        try:
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+        except Exception:
+            self.rate_limiter.record(host, error=True)
+            raise
+        # Navigation time includes rendering, so only the status is fed back to the limiter
+        self.rate_limiter.record(host, status=response.status if response else None)
+        return response
+    
     @retry_on_exception(max_retries=2, delay=5.0)
     async def scrape_product_details(self, page: Page, product_url: str) -> Dict:
         """Scrape detailed product information from product page"""
         try:
-            await page.goto(product_url, wait_until='domcontentloaded', timeout=15000)
-            await async_random_delay(2.0, 4.0)
+            await self._rate_limited_goto(page, product_url, timeout=15000)
+            # Pacing comes from the rate limiter; only wait for the item to render
+            try:
+                await page.wait_for_selector(DETAIL_READY_SELECTOR, timeout=10000)
+            except Exception:
+                logger.warning(f"Item details did not render in time on {product_url}")
             
             # Extract detailed information
             details = {}
@@ -141,6 +214,18 @@ class MercariScraper:
                     details['description'] = await desc_elem.text_content()
                     break
             
+            # Brand
+            brand_selectors = [
+                '[data-testid="brand"]',
+                '.brand',
+                '[class*="brand"]'
+            ]
+            for selector in brand_selectors:
+                brand_elem = await page.query_selector(selector)
+                if brand_elem:
+                    details['brand'] = await brand_elem.text_content()
+                    break
+            
             # Category
             category_selectors = [
                 '[data-testid="category"]',
@@ -172,10 +257,9 @@ class MercariScraper:
             logger.info(f"Scraping page {page_num} for keyword: {keyword}")
             
             # Use domcontentloaded instead of networkidle for faster loading
-            await page.goto(search_url, wait_until='domcontentloaded', timeout=20000)
-            await async_random_delay(3.0, 6.0)
+            await self._rate_limited_goto(page, search_url, timeout=20000)
             
-            # Wait for product items to load - use the working selector
+            # Wait for product items to load - use the working selector; pacing comes from the rate limiter
             working_selector = '[class*="item"]'
             try:
                 await page.wait_for_selector(working_selector, timeout=10000)
@@ -184,39 +268,71 @@ class MercariScraper:
                 return products
             
             # Scroll to load more items
-            await self._scroll_page(page)
+            await self._scroll_page(page, working_selector)
             
-            # Get all product items using the working selector
-            items = await page.query_selector_all(working_selector)
-            logger.info(f"Found {len(items)} items on page {page_num}")
+            # Read every item in one browser round trip; the per-element walk is the fallback
+            products = await self._extract_products_batch(page, working_selector)
+            if products is None:
+                products = []
+                items = await page.query_selector_all(working_selector)
+                logger.info(f"Found {len(items)} items on page {page_num}")
+                
+                for item in items:
+                    try:
+                        product_data = await self._extract_product_from_item(item, page)
+                        if product_data:
+                            products.append(product_data)
+                    except Exception as e:
+                        logger.error(f"Error extracting product: {e}")
+                        self.error_count += 1
+                        continue
+            else:
+                logger.info(f"Extracted {len(products)} products on page {page_num} in one batch")
             
-            for item in items:
-                try:
-                    product_data = await self._extract_product_from_item(item, page)
-                    if product_data:
-                        products.append(product_data)
-                except Exception as e:
-                    logger.error(f"Error extracting product: {e}")
-                    self.error_count += 1
-                    continue
+            stats = self.resource_blocker.reset_page_stats(page)
+            logger.info(f"Blocked {sum(stats['blocked'].values())} requests on page {page_num} "
+                        f"(~{stats['estimated_bytes_saved'] // 1024} KB saved)")
             
         except Exception as e:
             logger.error(f"Error scraping search page {page_num}: {e}")
+            self.failed_pages.add((keyword, page_num))
         
         return products
     
-    async def _scroll_page(self, page: Page):
-        """Scroll page to load more content"""
+    async def _scroll_page(self, page: Page, item_selector: str):
+        """Scroll until enough items are loaded or loading stalls, instead of waiting fixed delays"""
+        result = await scroll_until_loaded(
+            page,
+            item_selector,
+            max_items=SCRAPER_CONFIG.get("scroll_max_items"),
+            deadline=SCRAPER_CONFIG.get("scroll_deadline", 15.0),
+            stall_timeout=SCRAPER_CONFIG.get("scroll_stall_timeout", 1.5)
+        )
+        logger.info(f"Scrolled {result['scrolls']} times, {result['items']} items loaded in "
+                    f"{result['elapsed']:.1f}s ({result['reason']})")
+    
+    async def _extract_products_batch(self, page: Page, selector: str) -> Optional[List[Dict]]:
+        """
+        Extract all items with a single page.evaluate instead of several IPC calls per element
+        Returns None if the script fails so the caller can fall back to the per-element path
+        """
         try:
-            # Scroll down multiple times to trigger lazy loading
-            for i in range(2):
-                await page.evaluate("window.scrollBy(0, document.body.scrollHeight)")
-                await async_random_delay(2.0, 4.0)
-                
-                # Wait for new content to load
-                await page.wait_for_timeout(3000)
+            raw_items = await page.evaluate(BATCH_EXTRACT_JS, selector)
         except Exception as e:
-            logger.warning(f"Error during page scrolling: {e}")
+            logger.warning(f"Batch extraction failed, falling back to per-element extraction: {e}")
+            return None
+        
+        products = []
+        for raw in raw_items:
+            try:
+                product_data = self._build_product_data(raw.get('src'), raw.get('alt'), raw.get('priceText'),
+                                                        raw.get('href'))
+                if product_data:
+                    products.append(product_data)
+            except Exception as e:
+                logger.error(f"Error extracting product: {e}")
+                self.error_count += 1
+        return products
     
     async def _extract_product_from_item(self, item, page: Page) -> Optional[Dict]:
         """Extract product data from a single item element"""
@@ -228,89 +344,264 @@ class MercariScraper:
             if img_elem:
                 image_url = await img_elem.get_attribute('src')
                 title = await img_elem.get_attribute('alt')
-                if image_url and 'placeholder' in image_url.lower():
-                    image_url = None
-            if not title or not image_url:
-                return None
-            title = sanitize_text(title)
             
             # Price from third child div (index 2)
             child_divs = await item.query_selector_all(':scope > div')
-            price = 0
-            if len(child_divs) > 2:
-                price_text = await child_divs[2].text_content()
-                if price_text:
-                    price = int(extract_price_from_text(price_text))
+            price_text = await child_divs[2].text_content() if len(child_divs) > 2 else None
             
-            # Product URL: try to find closest ancestor a, or skip if not found
-            product_url = None
+            # Product URL from the first link inside the item
+            href = None
             link_elem = await item.query_selector('a')
             if link_elem:
                 href = await link_elem.get_attribute('href')
-                if href:
-                    product_url = f"{MERCARI_BASE_URL}{href}" if href.startswith('/') else href
-            # If not found, skip
-            if not product_url:
-                product_url = None
             
-            # Basic product data - using existing schema field names
-            product_data = {
-                'id': str(uuid.uuid4()),  # Generate string ID
-                'name': title,  # Use 'name' instead of 'title'
-                'price': price,
-                'condition': 'unknown',  # Default value for existing schema
-                'seller_rating': 0.0,  # Default value for existing schema
-                'category': extract_category_from_url(product_url) if product_url else 'unknown',
-                'brand': None,  # Will be extracted later if needed
-                'image_url': image_url,
-                'url': product_url,  # Use 'url' instead of 'product_url'
-                'description': None
-            }
-            
-            return product_data
+            return self._build_product_data(image_url, title, price_text, href)
             
         except Exception as e:
             logger.error(f"Error extracting product data: {e}")
             return None
     
-    async def scrape_products(self, keywords: List[str], pages_per_keyword: int = 2) -> Dict:
-        """Main scraping function"""
+    def _build_product_data(self, image_url: Optional[str], title: Optional[str], price_text: Optional[str],
+                            href: Optional[str]) -> Optional[Dict]:
+        """Turn the raw fields read from one item element into a product dict"""
+        if image_url and 'placeholder' in image_url.lower():
+            image_url = None
+        if not title or not image_url:
+            return None
+        title = sanitize_text(title)
+        
+        price = 0
+        if price_text:
+            price = int(extract_price_from_text(price_text))
+        
+        product_url = None
+        if href:
+            product_url = f"{MERCARI_BASE_URL}{href}" if href.startswith('/') else href
+        
+        # Key rows on the Mercari item ID so the same listing maps to the same row on every crawl;
+        # without a link, the image URL is the most stable identity left
+        product_id = listing_key({'url': product_url}) or str(uuid.uuid5(uuid.NAMESPACE_URL, image_url))
+        
+        # Basic product data - using existing schema field names
+        return {
+            'id': product_id,
+            'name': title,  # Use 'name' instead of 'title'
+            'price': price,
+            'condition': 'unknown',  # Default value for existing schema
+            'seller_rating': 0.0,  # Default value for existing schema
+            'category': extract_category_from_url(product_url) if product_url else 'unknown',
+            'brand': None,  # Will be extracted later if needed
+            'image_url': image_url,
+            'url': product_url,  # Use 'url' instead of 'product_url'
+            'description': None
+        }
+    
+    async def scrape_products(self, keywords: List[str], pages_per_keyword: int = 2,
+                              incremental: bool = False, checkpoint: Optional[RunCheckpoint] = None) -> Dict:
+        """
+        Main scraping function - crawls keyword/page pairs with a pool of browser pages
+        In incremental mode each keyword starts at page 1 and only moves on while every listing is new
+        With a checkpoint, full sweeps skip pages it records as done and record each page they finish
+        """
+        queue = asyncio.Queue()
+        self._new_by_keyword = {}
+        # Incremental runs are already bounded by their high-water marks, so only full sweeps checkpoint
+        self._checkpoint = None if incremental else checkpoint
+        if self._checkpoint:
+            counters = self._checkpoint.counters
+            self.scraped_count += counters.get('scraped_count', 0)
+            self.duplicate_count += counters.get('duplicate_count', 0)
+            self.error_count += counters.get('error_count', 0)
+        
+        for keyword in keywords:
+            last_page = 1 if incremental else pages_per_keyword
+            for page_num in range(1, last_page + 1):
+                if self._checkpoint and self._checkpoint.is_done(keyword, page_num):
+                    continue
+                queue.put_nowait((keyword, page_num))
+        
+        if queue.empty():
+            logger.info("Every page is already checkpointed as done")
+        
+        worker_count = max(1, min(self.workers, len(keywords) if incremental else max(1, queue.qsize())))
+        logger.info(f"Crawling {queue.qsize()} pages with {worker_count} workers")
+        await asyncio.gather(*[
+            self._crawl_worker(queue, i, pages_per_keyword if incremental else None)
+            for i in range(worker_count)
+        ])
+        
+        if incremental:
+            failed_keywords = {keyword for keyword, _ in self.failed_pages}
+            for keyword, pages in self._new_by_keyword.items():
+                if keyword in failed_keywords:
+                    # Keep the old mark so the listings behind the failed page are picked up next run
+                    logger.warning(f"Keeping the previous mark for {keyword}: a page failed to load")
+                    continue
+                # Pages are keyed by number so the mark advances newest first
+                self.crawl_state.advance(keyword, [p for _, products in sorted(pages.items()) for p in products])
+            self.crawl_state.save()
+        
+        if self.seen_ids is not None:
+            self.seen_ids.save(self.seen_filter_path)
+        
+        return {
+            'scraped_count': self.scraped_count,
+            'duplicate_count': self.duplicate_count,
+            'error_count': self.error_count,
+            'new_listing_count': self.new_listing_count,
+            'pages_skipped': self.pages_skipped
+        }
+    
+    async def _crawl_worker(self, queue: asyncio.Queue, worker_id: int, incremental_pages: Optional[int] = None):
+        """
+        Take keyword/page pairs off the shared queue until it is empty
+        With incremental_pages set, a page with only new listings queues the keyword's next page
+        """
         page = await self.setup_page()
         
         try:
-            for keyword in keywords:
-                logger.info(f"Starting to scrape keyword: {keyword}")
+            while True:
+                try:
+                    keyword, page_num = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
                 
-                for page_num in range(1, pages_per_keyword + 1):
-                    products = await self.scrape_search_page(page, keyword, page_num)
-                    
-                    # Save products to database
-                    for product_data in products:
-                        await self._save_product(product_data)
-                    
-                    # Add longer delay between pages
-                    if page_num < pages_per_keyword:
-                        await async_random_delay(8.0, 15.0)
+                logger.info(f"Worker {worker_id} scraping keyword: {keyword} (page {page_num})")
+                products = await self.scrape_search_page(page, keyword, page_num)
                 
-                # Add longer delay between keywords
-                if keyword != keywords[-1]:
-                    await async_random_delay(15.0, 25.0)
+                if incremental_pages:
+                    products, reached_mark = self.crawl_state.split_new(keyword, products)
+                    self._new_by_keyword.setdefault(keyword, {})[page_num] = products
+                    self.new_listing_count += len(products)
+                    if reached_mark or not products or page_num >= incremental_pages:
+                        self.pages_skipped += incremental_pages - page_num
+                        logger.info(f"Keyword {keyword} caught up at page {page_num}")
+                    else:
+                        queue.put_nowait((keyword, page_num + 1))
+                
+                # Save products to database; rows are keyed on the Mercari item ID, so redoing a page
+                # that was interrupted part-way through only counts its saved listings as duplicates
+                before = (self.scraped_count, self.duplicate_count, self.error_count)
+                for product_data in products:
+                    await self._save_product(product_data)
+                
+                if self._checkpoint and (keyword, page_num) not in self.failed_pages:
+                    self._checkpoint.mark_done(keyword, page_num, {
+                        'scraped_count': self.scraped_count - before[0],
+                        'duplicate_count': self.duplicate_count - before[1],
+                        'error_count': self.error_count - before[2]
+                    })
         
         finally:
+            self.resource_blocker.detach(page)
             await page.close()
+    
+    async def enrich_details(self, limit: int = 500, workers: int = None, batch_size: int = None) -> Dict:
+        """
+        Scrape detail pages for stored products that have not been tried yet
+        A bounded pool of pages shares the rate limiter; updates are written back in batches
+        Every tried row gets enriched_at, so a page whose selectors never match is not picked
+        again and cannot crowd newer rows out of the limit
+        """
+        rows = (
+            self.session.query(Product.id, Product.url, Product.condition, Product.seller_rating,
+                               Product.category, Product.brand, Product.description)
+            .filter(Product.url.isnot(None))
+            .filter(Product.enriched_at.is_(None))
+            .order_by(Product.id)
+            .limit(limit)
+            .all()
+        )
+        if not rows:
+            logger.info("No products need detail enrichment")
+            return {'enriched_count': 0, 'failed_count': 0}
         
-        return {
-            'scraped_count': self.scraped_count,
-            'duplicate_count': self.duplicate_count,
-            'error_count': self.error_count
-        }
+        queue = asyncio.Queue()
+        for row in rows:
+            queue.put_nowait(row)
+        
+        self._pending_updates = []
+        self.enriched_count = 0
+        self.enrich_failed_count = 0
+        batch_size = batch_size or SCRAPER_CONFIG.get("detail_batch_size", 50)
+        worker_count = max(1, min(workers or SCRAPER_CONFIG.get("detail_workers", 2), len(rows)))
+        logger.info(f"Enriching {len(rows)} products with {worker_count} detail workers")
+        
+        await asyncio.gather(*[self._detail_worker(queue, i, batch_size) for i in range(worker_count)])
+        self._flush_detail_updates()
+        
+        return {'enriched_count': self.enriched_count, 'failed_count': self.enrich_failed_count}
+    
+    async def _detail_worker(self, queue: asyncio.Queue, worker_id: int, batch_size: int):
+        """Take products off the shared queue and scrape their detail pages until it is empty"""
+        page = await self.setup_page()
+        
+        try:
+            while True:
+                try:
+                    row = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                
+                details = await self.scrape_product_details(page, row.url)
+                if not details:
+                    # Still recorded as tried; set enriched_at back to NULL to retry a row
+                    self.enrich_failed_count += 1
+                
+                self._pending_updates.append(self._build_detail_update(row, details))
+                if len(self._pending_updates) >= batch_size:
+                    self._flush_detail_updates()
+        
+        finally:
+            self.resource_blocker.detach(page)
+            await page.close()
+    
+    def _build_detail_update(self, row, details: Dict) -> Dict:
+        """
+        Column updates for one product, filling only fields the search crawl left empty
+        enriched_at is always set so the row is not picked up again
+        """
+        update = {'id': row.id, 'enriched_at': datetime.utcnow()}
+        if not row.description and details.get('description'):
+            update['description'] = sanitize_text(details['description'])
+        if row.condition == 'unknown' and details.get('condition'):
+            update['condition'] = details['condition']
+        if not row.seller_rating and details.get('seller_rating'):
+            update['seller_rating'] = details['seller_rating']
+        if row.brand is None and details.get('brand'):
+            update['brand'] = sanitize_text(details['brand'])
+        if row.category == 'unknown' and details.get('category'):
+            update['category'] = sanitize_text(details['category'])
+        return update
+    
+    def _flush_detail_updates(self):
+        """Write pending detail updates in one transaction"""
+        if not self._pending_updates:
+            return
+        batch, self._pending_updates = self._pending_updates, []
+        try:
+            self.session.bulk_update_mappings(Product, batch)
+            self.session.commit()
+            # Rows with only enriched_at were tried without anything to fill in; they are not enriched
+            self.enriched_count += sum(1 for update in batch if update.keys() - {'id', 'enriched_at'})
+            logger.info(f"Enriched {self.enriched_count} products so far...")
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error saving {len(batch)} detail updates: {e}")
+            self.error_count += 1
     
     async def _save_product(self, product_data: Dict):
-        """Save product to database"""
+        """Save product to database, skipping IDs the seen filter and database both already have"""
+        product_id = product_data.get('id', str(uuid.uuid4()))
         try:
+            # Only a possible positive from the filter costs a primary-key lookup
+            if self.seen_ids is not None and product_id in self.seen_ids and self.session.get(Product, product_id):
+                self.duplicate_count += 1
+                return
+            
             # Create Product object with existing schema
             product = Product(
-                id=product_data.get('id', str(uuid.uuid4())),
+                id=product_id,
                 name=sanitize_text(product_data.get('name', '')),
                 price=product_data.get('price', 0),
                 condition=sanitize_text(product_data.get('condition', 'unknown')),
@@ -325,19 +616,24 @@ class MercariScraper:
             self.session.add(product)
             self.session.commit()
             self.scraped_count += 1
+            if self.seen_ids is not None:
+                self.seen_ids.add(product_id)
             
             if self.scraped_count % 10 == 0:
                 logger.info(f"Scraped {self.scraped_count} products so far...")
                 
         except IntegrityError:
+            # Inserted by another process since the filter was loaded
             self.session.rollback()
             self.duplicate_count += 1
+            if self.seen_ids is not None:
+                self.seen_ids.add(product_id)
         except Exception as e:
             self.session.rollback()
             logger.error(f"Error saving product: {e}")
             self.error_count += 1
 
-async def main():
+async def main(resume: bool = False):
     """Main function to run the scraper"""
     # Reduced keywords and pages for testing
     keywords = [
@@ -348,13 +644,39 @@ async def main():
         "MacBook"
     ]
     
+    checkpoint = RunCheckpoint(SCRAPER_CONFIG.get("checkpoint_path", DEFAULT_CHECKPOINT_PATH))
+    checkpoint.begin(resume=resume)
+    
     async with MercariScraper() as scraper:
-        results = await scraper.scrape_products(keywords, pages_per_keyword=2)
+        results = await scraper.scrape_products(
+            keywords, pages_per_keyword=2, incremental=SCRAPER_CONFIG.get("incremental", False),
+            checkpoint=checkpoint
+        )
+        checkpoint.finish()
         
         logger.info("Scraping completed!")
         logger.info(f"Total scraped: {results['scraped_count']}")
         logger.info(f"Duplicates skipped: {results['duplicate_count']}")
         logger.info(f"Errors: {results['error_count']}")
+        logger.info(f"New listings: {results['new_listing_count']}")
+        logger.info(f"Pages skipped: {results['pages_skipped']}")
+
+async def enrich_main(limit: int):
+    """Fill condition, rating, brand and description from detail pages for stored products"""
+    async with MercariScraper() as scraper:
+        results = await scraper.enrich_details(limit=limit)
+        
+        logger.info("Detail enrichment completed!")
+        logger.info(f"Enriched: {results['enriched_count']}")
+        logger.info(f"Failed: {results['failed_count']}")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Mercari Playwright scraper")
+    parser.add_argument("--enrich", action="store_true",
+                        help="Scrape detail pages for stored products instead of crawling search pages")
+    parser.add_argument("--limit", type=int, default=500, help="Products to enrich per run")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted sweep, skipping keyword pages it already finished")
+    args = parser.parse_args()
+    
+    asyncio.run(enrich_main(args.limit) if args.enrich else main(resume=args.resume)) 
\ No newline at end of file
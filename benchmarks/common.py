@@ -0,0 +1,33 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+
+import math
+import os
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of numbers (q in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(latencies: List[float], items: int, elapsed: float) -> Dict:
+    """Throughput and latency figures for one benchmark run"""
+    pages = len(latencies)
+    return {
+        "pages": pages,
+        "items": items,
+        "seconds": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed else 0.0,
+        "items_per_sec": items / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000
+    }
@@ -0,0 +1,79 @@
+"""
+Benchmark HTML parser backends on recorded Mercari pages
+Usage: python -m benchmarks.parser_benchmark [PAGES_DIR] [--repeat N]
+"""
+
+import argparse
+import glob
+import logging
+import os
+import statistics
+import sys
+import time
+
+from benchmarks.common import DEFAULT_RECORDINGS_DIR, percentile
+from core.html_parser import available_backends
+from core.mercari_scraper import MercariScraper
+from core.selector_stats import SelectorStats
+
+def load_pages(pages_dir: str):
+    """Load every recorded .html page under the directory"""
+    paths = sorted(glob.glob(os.path.join(pages_dir, "**", "*.html"), recursive=True))
+    pages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((os.path.relpath(path, pages_dir), f.read()))
+    return pages
+
+def bench_backend(backend_name: str, pages, repeat: int):
+    """Time _parse_mercari_html over all pages with one backend"""
+    scraper = MercariScraper(use_selenium=False, parser=backend_name)
+    # Fresh in-memory stats so every backend learns the same selector order from scratch
+    scraper.selector_stats = SelectorStats()
+
+    timings = []
+    products = {}
+    for _ in range(repeat):
+        for name, html in pages:
+            start = time.perf_counter()
+            parsed = scraper._parse_mercari_html(html)
+            timings.append(time.perf_counter() - start)
+            products[name] = [p["name"] for p in parsed]
+
+    scraper.close()
+    return timings, products
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on recorded Mercari pages")
+    parser.add_argument("pages_dir", nargs="?", default=DEFAULT_RECORDINGS_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    pages = load_pages(args.pages_dir)
+    if not pages:
+        print(f"No recorded .html pages found in {args.pages_dir}")
+        print("Record some with: python -m benchmarks.record_replay record --queries iphone")
+        return 1
+
+    print(f"Parsing {len(pages)} pages x {args.repeat} runs")
+    print(f"{'backend':<12} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'speedup':>8}  output")
+
+    baseline_mean = None
+    baseline_products = None
+    for backend_name in available_backends():
+        timings, products = bench_backend(backend_name, pages, args.repeat)
+        mean_ms = statistics.mean(timings) * 1000
+        p50_ms = percentile(timings, 50) * 1000
+        p99_ms = percentile(timings, 99) * 1000
+
+        if baseline_mean is None:
+            baseline_mean, baseline_products = mean_ms, products
+        same_output = "same" if products == baseline_products else "DIFFERS"
+        print(f"{backend_name:<12} {mean_ms:>9.2f} {p50_ms:>9.2f} {p99_ms:>9.2f} "
+              f"{baseline_mean / mean_ms:>7.1f}x  {same_output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Record real Mercari pages and replay them from a local HTTP server
+    python -m benchmarks.record_replay record --queries iphone "nintendo switch" --details 5 [--browser]
+    python -m benchmarks.record_replay import-archive --since 2024-05-01
+    python -m benchmarks.record_replay replay --port 8765 --latency 0.05 --jitter 0.02
+Scrapers pointed at the replay server's base URL run end to end without network access
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from benchmarks.common import DEFAULT_RECORDINGS_DIR
+
+logger = logging.getLogger(__name__)
+
+MERCARI_BASE_URL = "https://jp.mercari.com"
+
+# Same parameters MercariScraper and ChatScraper send for a search
+SEARCH_PARAMS = {"sort": "created_time", "order": "desc", "status": "on_sale"}
+
+def request_key(url: str) -> str:
+    """Host-independent key for a request: path plus sorted query string"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return f"{parts.path or '/'}?{query}" if query else (parts.path or "/")
+
+def keyword_key(url: str) -> Optional[str]:
+    """Looser key (path, keyword and page only) so scrapers with different extra parameters still match"""
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    keyword = params.get("keyword")
+    # Search pages after the first are requested with page_token=v1:<zero-based page index>
+    page = params.get("page_token") or params.get("page", "1")
+    return f"{parts.path}|{keyword}|{page}" if keyword else None
+
+class Recordings:
+    """A directory of recorded responses with an index.json keyed by request"""
+
+    def __init__(self, directory: str = DEFAULT_RECORDINGS_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.index: Dict[str, Dict] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        self._by_keyword = {keyword_key(key): key for key in self.index if keyword_key(key)}
+
+    def add(self, url: str, body: str, status: int = 200, content_type: str = "text/html; charset=utf-8"):
+        """Save one response body and index it under its request key"""
+        os.makedirs(self.directory, exist_ok=True)
+        key = request_key(url)
+        filename = f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.html"
+        with open(os.path.join(self.directory, filename), "w", encoding="utf-8") as f:
+            f.write(body)
+        self.index[key] = {"file": filename, "url": url, "status": status, "content_type": content_type,
+                           "recorded_at": time.time()}
+        if keyword_key(key):
+            self._by_keyword[keyword_key(key)] = key
+
+    def save(self):
+        """Write index.json"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Find the recording for a request, exact match first, then by path and keyword"""
+        key = request_key(url)
+        entry = self.index.get(key)
+        if entry is None and keyword_key(url):
+            fallback = self._by_keyword.get(keyword_key(url))
+            entry = self.index.get(fallback) if fallback else None
+        return entry
+
+    def read_body(self, entry: Dict) -> bytes:
+        """Get a recorded response body"""
+        with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+            return f.read()
+
+    def search_queries(self) -> List[str]:
+        """Keywords of every recorded first search page"""
+        queries = []
+        for key in sorted(self.index):
+            params = dict(parse_qsl(urlsplit(key).query))
+            if urlsplit(key).path == "/search" and params.get("keyword") and params.get("page", "1") == "1":
+                queries.append(params["keyword"])
+        return queries
+
+    def item_paths(self) -> List[str]:
+        """Paths of every recorded item page"""
+        return sorted(key for key in self.index if key.startswith("/item/"))
+
+class ReplayServer:
+    """Threaded HTTP server answering from Recordings with configurable latency"""
+
+    def __init__(self, recordings: Recordings, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0):
+        self.recordings = recordings
+        self.latency = latency
+        self.jitter = jitter
+        self.stats = {"served": 0, "missing": 0}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay = replay.latency + random.uniform(0, replay.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+
+                entry = replay.recordings.lookup(self.path)
+                if entry is None:
+                    replay.stats["missing"] += 1
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                body = replay.recordings.read_body(entry)
+                replay.stats["served"] += 1
+                self.send_response(entry.get("status", 200))
+                self.send_header("Content-Type", entry.get("content_type", "text/html; charset=utf-8"))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self) -> "ReplayServer":
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted"""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Shut the server down"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+def search_url(query: str) -> str:
+    """Live search URL in the form the scrapers request it"""
+    return f"{MERCARI_BASE_URL}/search?{urlencode({'keyword': query, **SEARCH_PARAMS})}"
+
+def fetch_with_requests(urls: List[str]) -> Dict[str, str]:
+    """Download raw server HTML for each URL"""
+    import requests
+    from core.mercari_scraper import SEARCH_HEADERS
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                                          "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"})
+    pages = {}
+    for url in urls:
+        try:
+            response = session.get(url, headers=SEARCH_HEADERS, timeout=20)
+            if response.status_code == 200:
+                pages[url] = response.text
+            else:
+                logger.warning(f"Skipping {url}: HTTP {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Skipping {url}: {e}")
+        time.sleep(1.0)
+    return pages
+
+async def fetch_with_browser(urls: List[str]) -> Dict[str, str]:
+    """Capture the rendered DOM of each URL, for pages that build their results client-side"""
+    from playwright.async_api import async_playwright
+
+    pages = {}
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page()
+        for url in urls:
+            try:
+                await page.goto(url, wait_until="networkidle", timeout=30000)
+                pages[url] = await page.content()
+            except Exception as e:
+                logger.warning(f"Skipping {url}: {e}")
+        await browser.close()
+    return pages
+
+def find_item_urls(html: str, limit: int) -> List[str]:
+    """Item page URLs linked from a search page"""
+    seen = []
+    for item_id in re.findall(r'/item/(m\w+)', html):
+        if item_id not in seen:
+            seen.append(item_id)
+    return [f"{MERCARI_BASE_URL}/item/{item_id}" for item_id in seen[:limit]]
+
+def record(recordings: Recordings, queries: List[str], details: int = 0, browser: bool = False) -> int:
+    """Record search pages for the queries plus up to `details` item pages per query"""
+    fetch = (lambda urls: asyncio.run(fetch_with_browser(urls))) if browser else fetch_with_requests
+
+    search_pages = fetch([search_url(query) for query in queries])
+    for url, html in search_pages.items():
+        recordings.add(url, html)
+
+    if details:
+        item_urls = []
+        for html in search_pages.values():
+            item_urls.extend(find_item_urls(html, details))
+        for url, html in fetch(item_urls).items():
+            recordings.add(url, html)
+
+    recordings.save()
+    return len(recordings.index)
+
+def import_archive(recordings: Recordings, archive_root: str, since: Optional[float] = None) -> int:
+    """Copy the latest archived copy of each URL from the scraper page archive"""
+    from core.page_archive import PageArchive
+
+    archive = PageArchive(root=archive_root)
+    latest = {}
+    for page in archive.iter_pages(since=since):
+        if page["status"] == 200:
+            latest[request_key(page["url"])] = page
+    for page in latest.values():
+        html = archive.load(page["digest"])
+        if html:
+            url = page["url"] if "://" in page["url"] else f"{MERCARI_BASE_URL}{page['url']}"
+            recordings.add(url, html)
+    archive.close()
+    recordings.save()
+    return len(latest)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Record and replay Mercari pages for offline benchmarks")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Capture live pages")
+    record_parser.add_argument("--queries", nargs="+", required=True)
+    record_parser.add_argument("--details", type=int, default=0, help="Item pages to record per query")
+    record_parser.add_argument("--browser", action="store_true", help="Record the rendered DOM with Playwright")
+
+    import_parser = subparsers.add_parser("import-archive", help="Copy pages from the scraper page archive")
+    import_parser.add_argument("--archive", default=os.path.join(".scraper_state", "page_archive"))
+    import_parser.add_argument("--since", help="ISO date, inclusive")
+
+    replay_parser = subparsers.add_parser("replay", help="Serve recordings over HTTP")
+    replay_parser.add_argument("--host", default="127.0.0.1")
+    replay_parser.add_argument("--port", type=int, default=8765)
+    replay_parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    replay_parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds, 0 to this value")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    recordings = Recordings(args.recordings)
+
+    if args.command == "record":
+        total = record(recordings, args.queries, args.details, args.browser)
+        print(f"{total} recordings in {args.recordings}")
+    elif args.command == "import-archive":
+        since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+        imported = import_archive(recordings, args.archive, since)
+        print(f"Imported {imported} pages into {args.recordings}")
+    else:
+        server = ReplayServer(recordings, args.host, args.port, args.latency, args.jitter)
+        print(f"Replaying {len(recordings.index)} recordings at {server.base_url} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,179 @@
+"""
+End-to-end scraper benchmark against recorded pages
+Starts a local replay server and reports pages/sec, items/sec and p50/p99 page latency per scraper
+Usage: python -m benchmarks.scraper_benchmark [--scrapers mercari,mercari-concurrent,chat,backend]
+                                              [--latency 0.05] [--jitter 0.02] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Benchmarks must measure fetching and parsing, not cache hits or archive writes
+os.environ["SCRAPER_HTTP_CACHE"] = "off"
+os.environ["SCRAPER_PAGE_ARCHIVE"] = "off"
+
+from benchmarks.common import DEFAULT_RECORDINGS_DIR, summarize
+from benchmarks.record_replay import Recordings, ReplayServer
+from core.rate_limiter import AdaptiveRateLimiter
+from core.selector_stats import SelectorStats
+
+SCRAPERS = ["mercari", "mercari-concurrent", "chat", "backend"]
+
+def unthrottled_limiter() -> AdaptiveRateLimiter:
+    """A limiter that never makes the replay server wait"""
+    return AdaptiveRateLimiter(initial_rate=1e6, max_rate=1e6, burst=1e6)
+
+def make_mercari_scraper(base_url: str):
+    """requests-based MercariScraper pointed at the replay server"""
+    from core.mercari_scraper import MercariScraper
+
+    scraper = MercariScraper(use_selenium=False)
+    scraper.base_url = base_url
+    scraper.selector_stats = SelectorStats()
+    scraper.rate_limiter = scraper.fetch_engine.rate_limiter = unthrottled_limiter()
+    return scraper
+
+def bench_mercari(base_url: str, queries: List[str], repeat: int) -> Dict:
+    """Sequential search pages through MercariScraper's blocking requests path"""
+    scraper = make_mercari_scraper(base_url)
+    latencies, items = [], 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            page_start = time.perf_counter()
+            items += len(scraper._scrape_mercari_products(query))
+            latencies.append(time.perf_counter() - page_start)
+    elapsed = time.perf_counter() - start
+    scraper.close()
+    return summarize(latencies, items, elapsed)
+
+def bench_mercari_concurrent(base_url: str, queries: List[str], repeat: int) -> Dict:
+    """All search pages at once through MercariScraper's fetch engine"""
+    from core.fetch_engine import run_sync
+    from core.mercari_scraper import SEARCH_HEADERS
+
+    scraper = make_mercari_scraper(base_url)
+    latencies = []
+
+    async def one(query: str) -> int:
+        page_start = time.perf_counter()
+        url, params = scraper._build_search_request(query)
+        response = await scraper.fetch_engine.fetch(url, params, SEARCH_HEADERS)
+        products = scraper._parse_mercari_html(response["text"]) if response["status"] == 200 else []
+        latencies.append(time.perf_counter() - page_start)
+        return len(products)
+
+    async def run_all() -> int:
+        counts = await asyncio.gather(*[one(query) for _ in range(repeat) for query in queries])
+        return sum(counts)
+
+    start = time.perf_counter()
+    items = run_sync(run_all())
+    elapsed = time.perf_counter() - start
+    scraper.close()
+    return summarize(latencies, items, elapsed)
+
+def bench_chat(base_url: str, queries: List[str], repeat: int) -> Dict:
+    """ChatScraper's Playwright search through a warm browser pool"""
+    from core.chat_scraper import ChatScraper
+
+    scraper = ChatScraper()
+    scraper.base_url = base_url
+    scraper.rate_limiter = unthrottled_limiter()
+
+    async def run_all():
+        if not await scraper.initialize():
+            raise RuntimeError("Playwright browser could not be started")
+        # Warm the pool outside the timed loop; this also surfaces a missing browser install
+        async with scraper.pool.lease():
+            pass
+        latencies, items = [], 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in queries:
+                page_start = time.perf_counter()
+                items += len(await scraper.search_products_fast(query, max_results=50))
+                latencies.append(time.perf_counter() - page_start)
+        elapsed = time.perf_counter() - start
+        await scraper.cleanup()
+        return summarize(latencies, items, elapsed)
+
+    return asyncio.run(run_all())
+
+def bench_backend(base_url: str, queries: List[str], repeat: int) -> Dict:
+    """backend/scraper.py search pages on one Playwright page, without saving to the database"""
+    import backend.scraper as backend_scraper
+
+    backend_scraper.MERCARI_SEARCH_URL = f"{base_url}/search"
+
+    async def run_all():
+        async with backend_scraper.MercariScraper() as scraper:
+            scraper.rate_limiter = unthrottled_limiter()
+            page = await scraper.setup_page()
+            latencies, items = [], 0
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for query in queries:
+                    page_start = time.perf_counter()
+                    items += len(await scraper.scrape_search_page(page, query))
+                    latencies.append(time.perf_counter() - page_start)
+            elapsed = time.perf_counter() - start
+            await page.close()
+            return summarize(latencies, items, elapsed)
+
+    return asyncio.run(run_all())
+
+BENCHMARKS = {
+    "mercari": bench_mercari,
+    "mercari-concurrent": bench_mercari_concurrent,
+    "chat": bench_chat,
+    "backend": bench_backend
+}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark scrapers against recorded pages")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS_DIR)
+    parser.add_argument("--scrapers", default="mercari,mercari-concurrent",
+                        help=f"Comma-separated list from: {', '.join(SCRAPERS)}")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, 0 to this value")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.ERROR)
+
+    recordings = Recordings(args.recordings)
+    queries = recordings.search_queries()
+    if not queries:
+        print(f"No recorded search pages in {args.recordings}")
+        print("Record some with: python -m benchmarks.record_replay record --queries iphone")
+        return 1
+
+    with ReplayServer(recordings, latency=args.latency, jitter=args.jitter) as server:
+        print(f"Replaying {len(queries)} queries x {args.repeat} from {server.base_url} "
+              f"(latency {args.latency * 1000:.0f} ms, jitter {args.jitter * 1000:.0f} ms)")
+        print(f"{'scraper':<20} {'pages':>6} {'items':>6} {'pages/s':>9} {'items/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+
+        for name in [s.strip() for s in args.scrapers.split(",") if s.strip()]:
+            if name not in BENCHMARKS:
+                print(f"{name:<20} unknown scraper")
+                continue
+            try:
+                result = BENCHMARKS[name](server.base_url, queries, args.repeat)
+            except Exception as e:
+                print(f"{name:<20} skipped: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+                continue
+            print(f"{name:<20} {result['pages']:>6} {result['items']:>6} {result['pages_per_sec']:>9.2f} "
+                  f"{result['items_per_sec']:>9.1f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}")
+
+        if server.stats["missing"]:
+            print(f"Warning: {server.stats['missing']} requests had no recording")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
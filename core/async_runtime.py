@@ -0,0 +1,117 @@
+"""
+Long-lived asyncio runtime for synchronous callers
+Runs one event loop on a dedicated thread so async resources (browsers, HTTP pools) survive between calls
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+class BackgroundLoop:
+    """An event loop running forever on a daemon thread with thread-safe submission"""
+
+    def __init__(self, name: str = "async-runtime"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the loop thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the loop thread if it is not already running"""
+        with self._lock:
+            if self.is_running:
+                return
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(ready.set)
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.info(f"Background event loop '{self.name}' started")
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop and return a concurrent Future for it"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the loop and block until it finishes
+        On timeout the coroutine is cancelled and concurrent.futures.TimeoutError is raised
+        """
+        if self.is_running and threading.current_thread() is self._thread:
+            raise RuntimeError("BackgroundLoop.run() cannot be called from its own loop thread")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def iterate(self, aiterator: AsyncIterator, timeout: Optional[float] = None) -> Iterator:
+        """
+        Consume an async iterator on the loop and yield its items to the calling thread as they arrive
+        timeout bounds the whole iteration; closing the generator early cancels the producer
+        """
+        if self.is_running and threading.current_thread() is self._thread:
+            raise RuntimeError("BackgroundLoop.iterate() cannot be called from its own loop thread")
+
+        items = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in aiterator:
+                    items.put(("item", item))
+            except Exception as e:
+                items.put(("error", e))
+            finally:
+                items.put(("done", None))
+
+        future = self.submit(pump())
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            while True:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                try:
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    kind, value = items.get(timeout=remaining)
+                except queue.Empty:
+                    raise concurrent.futures.TimeoutError()
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the loop and wait for its thread to exit"""
+        with self._lock:
+            if not self.is_running:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=timeout)
+            if not self._thread.is_alive():
+                self.loop.close()
+            self._thread = None
+            logger.info(f"Background event loop '{self.name}' stopped")
@@ -0,0 +1,209 @@
+"""
+Persistent Playwright browser pool
+Keeps browsers, contexts and pages warm between scrapes and hands them out through a lease/return API
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from playwright.async_api import async_playwright
+from core.resource_blocker import ResourceBlocker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor'
+]
+
+DEFAULT_CONTEXT_OPTIONS = {
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'viewport': {'width': 1920, 'height': 1080}
+}
+
+DEFAULT_HEADERS = {
+    'Accept-Language': 'ja,en-US;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+class BrowserPool:
+    """Pool of warm Playwright pages with health checks and recycling after N uses"""
+
+    def __init__(self, max_browsers: int = 1, contexts_per_browser: int = 4, max_pages_per_context: int = 50,
+                 headless: bool = True, launch_args: Optional[List[str]] = None,
+                 context_options: Optional[Dict] = None, extra_headers: Optional[Dict] = None,
+                 resource_blocker: Optional[ResourceBlocker] = None):
+        self.max_browsers = max_browsers
+        self.contexts_per_browser = contexts_per_browser
+        self.max_pages_per_context = max_pages_per_context
+        self.headless = headless
+        self.launch_args = launch_args or DEFAULT_LAUNCH_ARGS
+        self.context_options = context_options or DEFAULT_CONTEXT_OPTIONS
+        self.extra_headers = extra_headers or DEFAULT_HEADERS
+        self.resource_blocker = resource_blocker
+
+        self.playwright = None
+        self._browsers: List[Dict] = []  # {"browser": Browser, "contexts": int}
+        self._idle_slots: List[Dict] = []  # {"browser": Dict, "context": BrowserContext, "page": Page, "uses": int}
+        self._capacity = None
+        self._start_lock = None
+        self._browser_lock = None
+        self._stats = {"leases": 0, "created": 0, "recycled": 0, "unhealthy": 0}
+
+    @property
+    def is_started(self) -> bool:
+        """Whether Playwright has been started"""
+        return self.playwright is not None
+
+    async def start(self) -> bool:
+        """Start Playwright; browsers and pages are created lazily on first lease"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self.is_started:
+                return True
+            try:
+                self.playwright = await async_playwright().start()
+                self._capacity = asyncio.Semaphore(self.max_browsers * self.contexts_per_browser)
+                self._browser_lock = asyncio.Lock()
+                logger.info("Playwright browser pool started")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to start browser pool: {e}")
+                self.playwright = None
+                return False
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Lease a warm page for the duration of the block
+        The page is returned to the pool afterwards, or discarded if the block raised
+        """
+        if not await self.start():
+            raise RuntimeError("Browser pool is not available")
+
+        async with self._capacity:
+            slot = await self._acquire_slot()
+            self._stats["leases"] += 1
+            healthy = True
+            try:
+                yield slot["page"]
+            except BaseException:
+                healthy = False
+                raise
+            finally:
+                await self._release_slot(slot, healthy)
+
+    async def _acquire_slot(self) -> Dict:
+        """Take a healthy idle slot or create a new one"""
+        while self._idle_slots:
+            slot = self._idle_slots.pop()
+            if self._is_slot_healthy(slot):
+                return slot
+            self._stats["unhealthy"] += 1
+            await self._close_slot(slot)
+
+        # Pick or launch the browser and book its context slot in one step, so concurrent
+        # leases against a cold pool neither launch extra browsers nor overbook one
+        async with self._browser_lock:
+            browser_entry = await self._get_browser()
+            browser_entry["contexts"] += 1
+
+        context = None
+        try:
+            context = await browser_entry["browser"].new_context(**self.context_options)
+            page = await context.new_page()
+            await page.set_extra_http_headers(self.extra_headers)
+            if self.resource_blocker:
+                await self.resource_blocker.attach(page)
+        except BaseException:
+            browser_entry["contexts"] = max(0, browser_entry["contexts"] - 1)
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"Error closing pooled context: {e}")
+            raise
+        self._stats["created"] += 1
+        return {"browser": browser_entry, "context": context, "page": page, "uses": 0}
+
+    async def _release_slot(self, slot: Dict, healthy: bool):
+        """Return a slot to the idle list, recycling it once it has served enough pages"""
+        slot["uses"] += 1
+        if not healthy or not self._is_slot_healthy(slot) or slot["uses"] >= self.max_pages_per_context:
+            self._stats["recycled"] += 1
+            await self._close_slot(slot)
+        else:
+            self._idle_slots.append(slot)
+
+    def _is_slot_healthy(self, slot: Dict) -> bool:
+        """Check the slot's page is open and its browser is still connected"""
+        try:
+            return slot["browser"]["browser"].is_connected() and not slot["page"].is_closed()
+        except Exception:
+            return False
+
+    async def _get_browser(self) -> Dict:
+        """Pick the least loaded connected browser with room, launching a new one when all are full"""
+        self._browsers = [b for b in self._browsers if b["browser"].is_connected()]
+
+        available = [b for b in self._browsers if b["contexts"] < self.contexts_per_browser]
+        if available:
+            return min(available, key=lambda b: b["contexts"])
+
+        if len(self._browsers) < self.max_browsers:
+            browser = await self.playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+            entry = {"browser": browser, "contexts": 0}
+            self._browsers.append(entry)
+            logger.info(f"Launched pooled browser ({len(self._browsers)}/{self.max_browsers})")
+            return entry
+
+        # Only reachable if context counts drift after a crash; share the least loaded browser
+        return min(self._browsers, key=lambda b: b["contexts"])
+
+    async def _close_slot(self, slot: Dict):
+        """Close a slot's context and page"""
+        slot["browser"]["contexts"] = max(0, slot["browser"]["contexts"] - 1)
+        if self.resource_blocker:
+            self.resource_blocker.detach(slot["page"])
+        try:
+            await slot["context"].close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled context: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get pool usage counters"""
+        stats = dict(self._stats)
+        stats["browsers"] = len(self._browsers)
+        stats["idle"] = len(self._idle_slots)
+        return stats
+
+    async def close(self):
+        """Close every page, context and browser and stop Playwright"""
+        for slot in self._idle_slots:
+            await self._close_slot(slot)
+        self._idle_slots = []
+
+        for entry in self._browsers:
+            try:
+                await entry["browser"].close()
+            except Exception as e:
+                logger.warning(f"Error closing pooled browser: {e}")
+        self._browsers = []
+
+        if self.playwright:
+            try:
+                await self.playwright.stop()
+            except Exception as e:
+                logger.error(f"Error stopping Playwright: {e}")
+            self.playwright = None
+        self._capacity = None
+        self._start_lock = None
+        self._browser_lock = None
@@ -1,57 +1,152 @@
 import asyncio
+import atexit
+import concurrent.futures
+import threading
 import time
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 import logging
-from playwright.async_api import async_playwright
 import re
+from core.async_runtime import BackgroundLoop
+from core.browser_pool import BrowserPool
+from core.rate_limiter import get_rate_limiter, host_of
+from core.resource_blocker import ResourceBlocker
+from core.structured_data import JSON_SCRIPTS_JS, extract_from_payloads
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Product containers, tried in order until one yields products
+PRODUCT_SELECTORS = [
+    '[data-testid="item-cell"]',
+    '.item-cell',
+    '[data-testid="search-item"]',
+    '.search-item',
+    'li[data-testid*="item"]',
+    '.mercari-item',
+    '[data-testid="item"]',
+    '.item',
+    'article',
+    '.product-item'
+]
+
+# Field selectors, tried in order inside each product container
+FIELD_SELECTORS = {
+    "name": ['[data-testid="item-name"]', '.item-name', 'h3', 'h2', '.title', '.name', 'a[title]'],
+    "price": ['[data-testid="price"]', '.price', '.item-price', '[data-testid="item-price"]',
+              'span[data-testid*="price"]'],
+    "image": ['img[src]', 'img[data-src]', '[data-testid="item-image"] img', '.item-image img'],
+    "condition": ['[data-testid="condition"]', '.condition', '.item-condition', 'span[data-testid*="condition"]'],
+    "rating": ['[data-testid="seller-rating"]', '.seller-rating', '.rating', 'span[data-testid*="rating"]'],
+    "url": ['a[href]', '[data-testid="item-link"]', '.item-link']
+}
+
+MERCARI_IMAGE_PATTERNS = ['static.mercdn.net', 'mercdn.net', 'mercari.com', 'mercdn.com']
+
+PLACEHOLDER_IMAGE = "https://via.placeholder.com/300x300/1e293b/60a5fa?text=Product+Image"
+
+# In-page equivalent of _extract_products/_extract_single_product, including image URL cleanup,
+# so a whole result page is read in one round trip
+EXTRACT_PRODUCTS_JS = """
+(opts) => {
+    const firstText = (item, selectors) => {
+        for (const selector of selectors) {
+            const el = item.querySelector(selector);
+            const text = el && el.textContent;
+            if (text) return text;
+        }
+        return null;
+    };
+    const firstMatch = (item, selectors, pattern) => {
+        for (const selector of selectors) {
+            const el = item.querySelector(selector);
+            const match = el && el.textContent && el.textContent.match(pattern);
+            if (match) return match[1];
+        }
+        return null;
+    };
+    const cleanImage = (url) => url.split('?')[0].replace(/http:\/\//g, 'https://');
+    const isMercariImage = (url) => opts.imagePatterns.some(p => url.toLowerCase().includes(p));
+    const now = Math.floor(Date.now() / 1000);
+
+    const extract = (item) => {
+        const nameText = firstText(item, opts.fields.name);
+        const name = nameText ? nameText.trim() : null;
+
+        const priceText = firstMatch(item, opts.fields.price, /¥?([0-9,]+)/);
+        const price = priceText ? parseInt(priceText.replace(/,/g, ''), 10) : null;
+
+        let imageUrl = null;
+        for (const selector of opts.fields.image) {
+            const img = item.querySelector(selector);
+            const src = img && (img.getAttribute('src') || img.getAttribute('data-src'));
+            if (src && isMercariImage(src)) { imageUrl = cleanImage(src); break; }
+        }
+
+        const conditionText = firstText(item, opts.fields.condition);
+        const condition = conditionText ? conditionText.trim().toLowerCase() : 'good';
+
+        let sellerRating = 4.0;
+        for (const selector of opts.fields.rating) {
+            const el = item.querySelector(selector);
+            const match = el && el.textContent && el.textContent.match(/([0-9.]+)/);
+            const value = match ? parseFloat(match[1]) : NaN;
+            if (!Number.isNaN(value)) { sellerRating = value; break; }
+        }
+
+        let productUrl = null;
+        for (const selector of opts.fields.url) {
+            const link = item.querySelector(selector);
+            const href = link && link.getAttribute('href');
+            if (href) {
+                if (href.startsWith('/')) productUrl = opts.baseUrl + href;
+                else if (href.startsWith('http')) productUrl = href;
+                break;
+            }
+        }
+
+        if (!name || !price) return null;
+        return {
+            id: `mercari_${now}_${name.length}`,
+            name: name,
+            price: price,
+            image_url: imageUrl || opts.placeholder,
+            condition: condition,
+            seller_rating: sellerRating,
+            product_url: productUrl,
+            category: 'Electronics',
+            brand: null,
+            shipping_included: true
+        };
+    };
+
+    for (const selector of opts.containers) {
+        const elements = Array.from(document.querySelectorAll(selector)).slice(0, opts.maxResults);
+        const products = [];
+        for (const element of elements) {
+            const product = extract(element);
+            if (product) products.push(product);
+            if (products.length >= opts.maxResults) break;
+        }
+        if (products.length) return products;
+    }
+    return [];
+}
+"""
+
 class ChatScraper:
     """Fast real-time scraper for Chat Assistant using Playwright"""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None):
         self.base_url = "https://jp.mercari.com"
-        self.browser = None
-        self.context = None
-        self.page = None
+        # Warm browsers shared across searches instead of a cold start per message;
+        # images, fonts, CSS and trackers are blocked since only DOM text and img src are read
+        self.pool = pool or BrowserPool(resource_blocker=ResourceBlocker())
+        self.rate_limiter = get_rate_limiter()
         
     async def initialize(self):
-        """Initialize Playwright browser"""
-        try:
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu',
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor'
-                ]
-            )
-            self.context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080}
-            )
-            self.page = await self.context.new_page()
-            
-            # Set extra headers
-            await self.page.set_extra_http_headers({
-                'Accept-Language': 'ja,en-US;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            })
-            
-            logger.info("Playwright browser initialized successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize Playwright: {e}")
-            return False
+        """Initialize the Playwright browser pool"""
+        return await self.pool.start()
     
     async def search_products_fast(self, query: str, filters: Optional[Dict] = None, max_results: int = 5) -> List[Dict]:
         """
@@ -62,27 +157,75 @@ class ChatScraper:
             return []
         
         try:
-            # Build search URL
-            search_url = await self._build_search_url(query, filters)
-            logger.info(f"Searching: {search_url}")
-            
-            # Navigate to search page
-            await self.page.goto(search_url, wait_until='networkidle', timeout=10000)
-            
-            # Wait for products to load
-            await self._wait_for_products()
-            
-            # Extract products
-            products = await self._extract_products(max_results)
-            
-            logger.info(f"Found {len(products)} products")
-            return products
+            async with self.pool.lease() as page:
+                # Build search URL
+                search_url = await self._build_search_url(query, filters)
+                logger.info(f"Searching: {search_url}")
+                
+                # Navigate to search page
+                await self._rate_limited_goto(page, search_url)
+                
+                # Wait for products to load
+                await self._wait_for_products(page)
+                
+                # Extract products
+                products = await self._extract_products(page, max_results)
+                
+                logger.info(f"Found {len(products)} products")
+                self._log_blocked_resources(page)
+                return products
             
         except Exception as e:
             logger.error(f"Error in fast search: {e}")
             return []
-        finally:
-            await self.cleanup()
+    
+    async def stream_products(self, query: str, filters: Optional[Dict] = None,
+                              max_results: int = 5) -> AsyncIterator[Dict]:
+        """
+        Streaming variant of search_products_fast
+        Yields each product as soon as it is extracted, so callers can render the first result early
+        """
+        if not await self.initialize():
+            return
+        
+        count = 0
+        try:
+            async with self.pool.lease() as page:
+                search_url = await self._build_search_url(query, filters)
+                logger.info(f"Streaming search: {search_url}")
+                
+                await self._rate_limited_goto(page, search_url)
+                await self._wait_for_products(page)
+                
+                async for product in self._iter_products(page, max_results):
+                    count += 1
+                    yield product
+                
+                logger.info(f"Streamed {count} products")
+                self._log_blocked_resources(page)
+        
+        except Exception as e:
+            logger.error(f"Error in streaming search after {count} products: {e}")
+    
+    async def _rate_limited_goto(self, page, url: str):
+        """Navigate after taking a rate-limit token, reporting the outcome back"""
+        host = host_of(url)
+        await self.rate_limiter.acquire_async(host)
+        try:
+            response = await page.goto(url, wait_until='networkidle', timeout=10000)
+        except Exception:
+            self.rate_limiter.record(host, error=True)
+            raise
+        # Navigation time includes rendering, so only the status is fed back to the limiter
+        self.rate_limiter.record(host, status=response.status if response else None)
+        return response
+    
+    def _log_blocked_resources(self, page):
+        """Log what the resource blocker saved on the last navigation"""
+        if self.pool.resource_blocker:
+            stats = self.pool.resource_blocker.reset_page_stats(page)
+            blocked = sum(stats["blocked"].values())
+            logger.info(f"Blocked {blocked} requests (~{stats['estimated_bytes_saved'] // 1024} KB saved)")
     
     async def _build_search_url(self, query: str, filters: Optional[Dict]) -> str:
         """Build optimized search URL"""
@@ -114,84 +257,115 @@ class ChatScraper:
         param_str = "&".join([f"{k}={v}" for k, v in params.items()])
         return f"{self.base_url}/search?{param_str}"
     
-    async def _wait_for_products(self):
+    async def _wait_for_products(self, page):
         """Wait for product elements to load"""
-        selectors = [
-            '[data-testid="item-cell"]',
-            '.item-cell',
-            '[data-testid="search-item"]',
-            '.search-item',
-            'li[data-testid*="item"]',
-            '.mercari-item',
-            '[data-testid="item"]',
-            '.item',
-            'article',
-            '.product-item'
-        ]
+        selectors = PRODUCT_SELECTORS
         
         for selector in selectors:
             try:
-                await self.page.wait_for_selector(selector, timeout=5000)
+                await page.wait_for_selector(selector, timeout=5000)
                 logger.info(f"Products loaded with selector: {selector}")
                 return
             except:
                 continue
         
         # Fallback: wait for any content
-        await self.page.wait_for_selector('body', timeout=5000)
+        await page.wait_for_selector('body', timeout=5000)
     
-    async def _extract_products(self, max_results: int) -> List[Dict]:
+    async def _extract_products(self, page, max_results: int) -> List[Dict]:
         """Extract product information from the page"""
+        return [product async for product in self._iter_products(page, max_results)]
+    
+    async def _iter_products(self, page, max_results: int) -> AsyncIterator[Dict]:
+        """Yield products from the page as each one is extracted"""
+        # Embedded page JSON gives every field in one round trip; the DOM walk is the fallback
+        products = await self._extract_structured_products(page, max_results)
+        if products:
+            logger.info(f"Extracted {len(products)} products from embedded page JSON")
+            for product in products:
+                yield product
+            return
+        
+        products = await self._extract_products_batch(page, max_results)
+        if products is not None:
+            for product in products:
+                yield product
+            return
+        
         try:
-            # Try multiple selectors for product elements
-            selectors = [
-                '[data-testid="item-cell"]',
-                '.item-cell',
-                '[data-testid="search-item"]',
-                '.search-item',
-                'li[data-testid*="item"]',
-                '.mercari-item',
-                '[data-testid="item"]',
-                '.item',
-                'article',
-                '.product-item'
-            ]
-            
-            products = []
-            for selector in selectors:
-                elements = await self.page.query_selector_all(selector)
+            count = 0
+            for selector in PRODUCT_SELECTORS:
+                elements = await page.query_selector_all(selector)
                 if elements:
                     logger.info(f"Found {len(elements)} elements with selector: {selector}")
                     
                     for element in elements[:max_results]:
                         product = await self._extract_single_product(element)
                         if product:
-                            products.append(product)
-                            if len(products) >= max_results:
+                            count += 1
+                            yield product
+                            if count >= max_results:
                                 break
                     
-                    if products:
+                    if count:
                         break
             
-            return products
-            
         except Exception as e:
             logger.error(f"Error extracting products: {e}")
+    
+    async def _extract_products_batch(self, page, max_results: int) -> Optional[List[Dict]]:
+        """
+        Extract finished product dicts with one in-page script instead of several IPC calls per field
+        Returns None if the script fails so the caller can fall back to the per-element path
+        """
+        try:
+            products = await page.evaluate(EXTRACT_PRODUCTS_JS, {
+                "containers": PRODUCT_SELECTORS,
+                "fields": FIELD_SELECTORS,
+                "maxResults": max_results,
+                "baseUrl": self.base_url,
+                "imagePatterns": MERCARI_IMAGE_PATTERNS,
+                "placeholder": self._get_placeholder_image()
+            })
+        except Exception as e:
+            logger.warning(f"Batch extraction failed, falling back to per-element extraction: {e}")
+            return None
+        
+        logger.info(f"Extracted {len(products)} products in one batch")
+        return products
+    
+    async def _extract_structured_products(self, page, max_results: int) -> List[Dict]:
+        """Read products from JSON-LD or hydration payloads embedded in the page"""
+        try:
+            payloads = await page.evaluate(JSON_SCRIPTS_JS)
+            raw_products = extract_from_payloads(payloads or [], self.base_url, limit=max_results)
+        except Exception as e:
+            logger.error(f"Error extracting structured data: {e}")
             return []
+        
+        products = []
+        for raw in raw_products:
+            image_url = raw["image_url"]
+            products.append({
+                "id": raw["id"] or f"mercari_{int(time.time())}_{len(raw['name'])}",
+                "name": raw["name"],
+                "price": raw["price"],
+                "image_url": self._clean_image_url(image_url) if self._is_valid_mercari_image(image_url)
+                             else self._get_placeholder_image(),
+                "condition": raw["condition"] or "good",
+                "seller_rating": raw["seller_rating"] or 4.0,
+                "product_url": raw["url"],
+                "category": raw["category"] or "Electronics",
+                "brand": raw["brand"],
+                "shipping_included": True
+            })
+        return products
     
     async def _extract_single_product(self, element) -> Optional[Dict]:
         """Extract information from a single product element"""
         try:
             # Extract name/title
-            name_selectors = [
-                '[data-testid="item-name"]',
-                '.item-name',
-                'h3',
-                'h2',
-                '.title',
-                '.name',
-                'a[title]'
-            ]
+            name_selectors = FIELD_SELECTORS["name"]
             
             name = None
             for selector in name_selectors:
@@ -206,13 +380,7 @@ class ChatScraper:
                     continue
             
             # Extract price
-            price_selectors = [
-                '[data-testid="price"]',
-                '.price',
-                '.item-price',
-                '[data-testid="item-price"]',
-                'span[data-testid*="price"]'
-            ]
+            price_selectors = FIELD_SELECTORS["price"]
             
             price = None
             for selector in price_selectors:
@@ -230,12 +398,7 @@ class ChatScraper:
                     continue
             
             # Extract image URL
-            image_selectors = [
-                'img[src]',
-                'img[data-src]',
-                '[data-testid="item-image"] img',
-                '.item-image img'
-            ]
+            image_selectors = FIELD_SELECTORS["image"]
             
             image_url = None
             for selector in image_selectors:
@@ -253,12 +416,7 @@ class ChatScraper:
                     continue
             
             # Extract condition
-            condition_selectors = [
-                '[data-testid="condition"]',
-                '.condition',
-                '.item-condition',
-                'span[data-testid*="condition"]'
-            ]
+            condition_selectors = FIELD_SELECTORS["condition"]
             
             condition = "good"  # Default
             for selector in condition_selectors:
@@ -273,12 +431,7 @@ class ChatScraper:
                     continue
             
             # Extract seller rating
-            rating_selectors = [
-                '[data-testid="seller-rating"]',
-                '.seller-rating',
-                '.rating',
-                'span[data-testid*="rating"]'
-            ]
+            rating_selectors = FIELD_SELECTORS["rating"]
             
             seller_rating = 4.0  # Default
             for selector in rating_selectors:
@@ -295,11 +448,7 @@ class ChatScraper:
                     continue
             
             # Extract product URL
-            url_selectors = [
-                'a[href]',
-                '[data-testid="item-link"]',
-                '.item-link'
-            ]
+            url_selectors = FIELD_SELECTORS["url"]
             
             product_url = None
             for selector in url_selectors:
@@ -343,14 +492,7 @@ class ChatScraper:
             return False
         
         # Check for Mercari CDN patterns
-        mercari_patterns = [
-            'static.mercdn.net',
-            'mercdn.net',
-            'mercari.com',
-            'mercdn.com'
-        ]
-        
-        return any(pattern in url.lower() for pattern in mercari_patterns)
+        return any(pattern in url.lower() for pattern in MERCARI_IMAGE_PATTERNS)
     
     def _clean_image_url(self, url: str) -> str:
         """Clean and optimize image URL"""
@@ -369,42 +511,83 @@ class ChatScraper:
     
     def _get_placeholder_image(self) -> str:
         """Get placeholder image URL"""
-        return "https://via.placeholder.com/300x300/1e293b/60a5fa?text=Product+Image"
+        return PLACEHOLDER_IMAGE
     
     async def cleanup(self):
         """Clean up Playwright resources"""
         try:
-            if self.page:
-                await self.page.close()
-            if self.context:
-                await self.context.close()
-            if self.browser:
-                await self.browser.close()
-            if hasattr(self, 'playwright'):
-                await self.playwright.stop()
+            await self.pool.close()
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
 
 # Synchronous wrapper for easier integration
 class ChatScraperSync:
-    """Synchronous wrapper for ChatScraper"""
+    """
+    Synchronous wrapper for ChatScraper
+    All instances share one background event loop and one warm ChatScraper, so Streamlit
+    reruns and concurrent sessions reuse the same browser pool
+    """
+    
+    _runtime = None
+    _shared_scraper = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self.runtime, self.scraper = self._get_shared_runtime()
     
-    def __init__(self):
-        self.scraper = ChatScraper()
+    @classmethod
+    def _get_shared_runtime(cls):
+        """Create the shared loop thread and scraper on first use"""
+        with cls._shared_lock:
+            if cls._runtime is None:
+                cls._runtime = BackgroundLoop(name="chat-scraper")
+                cls._shared_scraper = ChatScraper()
+                atexit.register(cls.shutdown)
+            return cls._runtime, cls._shared_scraper
     
-    def search_products_fast(self, query: str, filters: Optional[Dict] = None, max_results: int = 5) -> List[Dict]:
+    def search_products_fast(self, query: str, filters: Optional[Dict] = None, max_results: int = 5,
+                             timeout: Optional[float] = None) -> List[Dict]:
         """Synchronous wrapper for fast product search"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            return loop.run_until_complete(
-                self.scraper.search_products_fast(query, filters, max_results)
+            return self.runtime.run(
+                self.scraper.search_products_fast(query, filters, max_results),
+                timeout=timeout or self.timeout
             )
+        except concurrent.futures.TimeoutError:
+            logger.error(f"Sync search timed out after {timeout or self.timeout}s: {query}")
+            return []
         except Exception as e:
             logger.error(f"Error in sync search: {e}")
             return []
-        finally:
+    
+    def stream_products_fast(self, query: str, filters: Optional[Dict] = None, max_results: int = 5,
+                             timeout: Optional[float] = None) -> Iterator[Dict]:
+        """Synchronous generator over ChatScraper.stream_products; stops quietly on timeout or error"""
+        try:
+            yield from self.runtime.iterate(
+                self.scraper.stream_products(query, filters, max_results),
+                timeout=timeout or self.timeout
+            )
+        except concurrent.futures.TimeoutError:
+            logger.error(f"Streaming search timed out after {timeout or self.timeout}s: {query}")
+        except Exception as e:
+            logger.error(f"Error in streaming search: {e}")
+    
+    @classmethod
+    def shutdown(cls):
+        """Close the shared browser pool and stop the loop thread"""
+        with cls._shared_lock:
+            if cls._runtime is None:
+                return
+            if not cls._runtime.is_running:
+                cls._runtime = None
+                cls._shared_scraper = None
+                return
             try:
-                loop.close()
-            except:
-                pass 
\ No newline at end of file
+                cls._runtime.run(cls._shared_scraper.cleanup(), timeout=10)
+            except Exception as e:
+                logger.error(f"Error shutting down chat scraper: {e}")
+            cls._runtime.stop()
+            cls._runtime = None
+            cls._shared_scraper = None
@@ -0,0 +1,105 @@
+"""
+Run checkpoints for long scrape sweeps
+Records each finished (keyword, page) unit and its counters in a JSON file, written atomically
+after every unit, so an interrupted run can be resumed without repeating finished work
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class RunCheckpoint:
+    """Completed units and summed counters of one scrape run, persisted as JSON"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._state = self._fresh_state()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fresh_state() -> Dict:
+        return {"started_at": time.time(), "finished": False, "done": {}, "counters": {}}
+
+    @staticmethod
+    def unit_key(keyword: str, page: int) -> str:
+        return json.dumps([keyword, page], ensure_ascii=False)
+
+    def begin(self, resume: bool = False) -> bool:
+        """
+        Start a run, continuing the unfinished one on disk when resume is set
+        Returns whether a previous run was resumed
+        """
+        previous = self._load() if resume else None
+        with self._lock:
+            if previous and not previous.get("finished"):
+                self._state = previous
+                resumed = True
+                logger.info(f"Resuming run from {self.path}: {len(previous['done'])} units already done")
+            else:
+                self._state = self._fresh_state()
+                resumed = False
+        self.save()
+        return resumed
+
+    def _load(self) -> Optional[Dict]:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load checkpoint from {self.path}: {e}")
+            return None
+
+    def save(self):
+        """Write the checkpoint to disk atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._state, ensure_ascii=False)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save checkpoint to {self.path}: {e}")
+
+    def is_done(self, keyword: str, page: int = 1) -> bool:
+        """Whether a unit finished in this run or the one being resumed"""
+        with self._lock:
+            return self.unit_key(keyword, page) in self._state["done"]
+
+    def pending(self, units: Iterable[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """Filter units down to the ones still to do"""
+        return [(keyword, page) for keyword, page in units if not self.is_done(keyword, page)]
+
+    def mark_done(self, keyword: str, page: int = 1, counters: Optional[Dict[str, int]] = None):
+        """Record a finished unit, add its counters to the run totals and persist"""
+        counters = counters or {}
+        with self._lock:
+            self._state["done"][self.unit_key(keyword, page)] = {"at": time.time(), **counters}
+            totals = self._state["counters"]
+            for name, value in counters.items():
+                totals[name] = totals.get(name, 0) + value
+        self.save()
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Counters summed over every finished unit"""
+        with self._lock:
+            return dict(self._state["counters"])
+
+    def finish(self):
+        """Mark the run complete so the next --resume starts over"""
+        with self._lock:
+            self._state["finished"] = True
+        self.save()
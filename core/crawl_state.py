@@ -0,0 +1,113 @@
+"""
+Incremental crawl state
+Keeps a per-query high-water mark (newest listing and the IDs seen at the top of the last run)
+so crawls sorted by created_time can stop paginating once they reach listings already ingested
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CRAWL_STATE_PATH = os.path.join(".scraper_state", "crawl_state.json")
+
+_ITEM_ID_RE = re.compile(r'/item/(\w+)')
+
+def listing_key(product: Dict) -> Optional[str]:
+    """Stable identity of a listing: the Mercari item ID from its URL, else its id field"""
+    url = product.get("url") or product.get("product_url") or ""
+    match = _ITEM_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    product_id = product.get("id")
+    return str(product_id) if product_id else None
+
+class CrawlState:
+    """Per-query high-water marks persisted as JSON"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_CRAWL_STATE_PATH, keep_ids: int = 300):
+        self.path = path
+        self.keep_ids = keep_ids  # Known IDs kept per query, enough to cover bumped or re-sorted listings
+        self._marks: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load persisted marks if the state file exists"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._marks = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load crawl state from {self.path}: {e}")
+            self._marks = {}
+
+    def save(self):
+        """Write marks to disk atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._marks, ensure_ascii=False)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save crawl state to {self.path}: {e}")
+
+    def get_mark(self, query: str) -> Optional[Dict]:
+        """Get a query's high-water mark, or None if it was never crawled"""
+        with self._lock:
+            mark = self._marks.get(query)
+            return dict(mark) if mark else None
+
+    def split_new(self, query: str, products: List[Dict]) -> Tuple[List[Dict], bool]:
+        """
+        Split one newest-first page into the listings not seen before
+        Returns (new products, whether the high-water mark was reached on this page)
+        """
+        with self._lock:
+            mark = self._marks.get(query)
+            known = set(mark["known_ids"]) if mark else set()
+        if not known:
+            return list(products), False
+
+        new_products = []
+        for product in products:
+            if listing_key(product) in known:
+                return new_products, True
+            new_products.append(product)
+        return new_products, False
+
+    def advance(self, query: str, new_products: List[Dict]):
+        """Move the mark past a completed crawl's new listings (given newest first)"""
+        new_ids = [key for key in (listing_key(p) for p in new_products) if key]
+        if not new_ids:
+            return
+        with self._lock:
+            mark = self._marks.get(query) or {"known_ids": []}
+            fresh = set(new_ids)
+            known_ids = new_ids + [i for i in mark["known_ids"] if i not in fresh]
+            self._marks[query] = {
+                "newest_id": new_ids[0],
+                "newest_at": time.time(),
+                "known_ids": known_ids[:self.keep_ids]
+            }
+
+    def reset(self, query: Optional[str] = None):
+        """Forget one query's mark, or all of them"""
+        with self._lock:
+            if query is None:
+                self._marks = {}
+            else:
+                self._marks.pop(query, None)
@@ -1,4 +1,4 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from core.database import DatabaseManager
 import uuid
 import time
@@ -11,7 +11,7 @@ class DataHandler:
         # Initialize scraper for real data retrieval
         try:
             from core.mercari_scraper import MercariScraper
-            # Enable Selenium for better scraping of dynamic content
+            # Enable Selenium for dynamic content; Chrome only starts on the first live search
             self.scraper = MercariScraper(use_selenium=True)
             self.use_real_data = True
         except ImportError:
@@ -106,6 +106,46 @@ class DataHandler:
         
         return products
     
+    def iter_search_products(self, query: str, filters: Dict[str, Any], session_id: str = None) -> Iterator[Dict]:
+        """
+        Streaming variant of search_products
+        Yields scraped products as they are parsed; history is stored once the stream is exhausted
+        """
+        if not query:
+            return
+        
+        if not isinstance(filters, dict):
+            filters = {}
+        
+        if not session_id:
+            session_id = str(uuid.uuid4())
+        
+        products = []
+        
+        if self.use_real_data and self.scraper:
+            try:
+                for product in self.scraper.iter_search_products(query, filters):
+                    products.append(product)
+                    yield product
+            except Exception as e:
+                print(f"Real scraping failed: {e}, falling back to database")
+        
+        if not products:
+            try:
+                products = self.db_manager.search_products(query, filters)
+                print(f"Database search found {len(products)} products")
+            except Exception as e:
+                print(f"Database search failed: {e}")
+                return
+            yield from products
+        
+        if products:
+            try:
+                self.db_manager.store_search_results(query, products, session_id)
+                print(f"Stored {len(products)} search results in history")
+            except Exception as e:
+                print(f"Failed to store search history: {e}")
+    
     def search_with_history_fallback(self, query: str, filters: Dict[str, Any] = None, session_id: str = None) -> List[Dict]:
         """
         Search for products with fallback to recent search history
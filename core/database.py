@@ -441,6 +441,28 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def get_query_demand(self, days: int = 7) -> Dict[str, int]:
+        """
+        Count how many sessions ran each query in the last `days` days
+        Searches without a session ID are counted together as one session
+        """
+        session = self.get_session()
+        try:
+            from datetime import timedelta
+            from sqlalchemy import func
+            since = datetime.utcnow() - timedelta(days=days)
+            rows = session.query(
+                SearchHistory.query_text,
+                func.count(func.distinct(func.coalesce(SearchHistory.session_id, ''))).label('sessions')
+            ).filter(SearchHistory.created_at >= since).group_by(SearchHistory.query_text).all()
+            return {row.query_text: row.sessions for row in rows}
+            
+        except Exception as e:
+            print(f"Error getting query demand: {e}")
+            return {}
+        finally:
+            session.close()
+    
     def clear_search_history(self, session_id: str = None):
         """Clear search history, optionally for a specific session"""
         session = self.get_session()
@@ -564,6 +586,17 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def get_product_ids(self) -> Optional[List[str]]:
+        """Get the ID of every stored product, or None if they cannot be read"""
+        session = self.get_session()
+        try:
+            return [row.id for row in session.query(Product.id).all()]
+        except Exception as e:
+            print(f"Error getting product IDs: {e}")
+            return None
+        finally:
+            session.close()
+    
     def add_product(self, product_data: Dict) -> bool:
         """Add a new product to the database"""
         session = self.get_session()
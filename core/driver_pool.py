@@ -0,0 +1,205 @@
+"""
+Lazy Selenium driver pool
+Chrome is only started when a page is first leased, and drivers are recycled after N pages
+or once their process tree grows past a memory ceiling. After Chrome fails to start the pool
+reports itself unavailable for a backoff interval, doubling on each further failure
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+_memory_ceiling_warned = False
+
+CHROME_ARGS = [
+    '--headless',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--window-size=1920,1080',
+    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+]
+
+def create_chrome_driver():
+    """Start a headless Chrome driver, or return None if Chrome cannot be started"""
+    chrome_options = Options()
+    for arg in CHROME_ARGS:
+        chrome_options.add_argument(arg)
+
+    # Disable images to speed up loading (we'll extract URLs from HTML)
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    # Try to use ChromeDriverManager with version compatibility
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver = webdriver.Chrome(
+            service=webdriver.chrome.service.Service(ChromeDriverManager().install()),
+            options=chrome_options
+        )
+        logger.info("Selenium WebDriver initialized successfully")
+        return driver
+    except Exception as chrome_error:
+        logger.warning(f"ChromeDriver failed, trying without version management: {chrome_error}")
+
+    # Fallback: try without ChromeDriverManager
+    try:
+        driver = webdriver.Chrome(options=chrome_options)
+        logger.info("Selenium WebDriver initialized with fallback method")
+        return driver
+    except Exception as fallback_error:
+        logger.error(f"Fallback ChromeDriver also failed: {fallback_error}")
+        return None
+
+def driver_memory_mb(driver) -> Optional[float]:
+    """Resident memory of a driver's chromedriver process and its Chrome children, None if unknown"""
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except Exception:
+        return None
+
+class DriverPool:
+    """Thread-safe pool of Selenium drivers created on first lease and recycled when worn out"""
+
+    def __init__(self, max_drivers: int = 1, max_pages_per_driver: int = 50, max_memory_mb: float = 1024,
+                 driver_factory: Optional[Callable] = None, retry_interval: float = 60.0,
+                 max_retry_interval: float = 900.0):
+        self.max_drivers = max_drivers
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_memory_mb = max_memory_mb  # Only enforced when psutil is installed
+        self.driver_factory = driver_factory or create_chrome_driver
+        self.retry_interval = retry_interval  # Seconds without Selenium after the first failed start
+        self.max_retry_interval = max_retry_interval
+        self._warn_if_memory_unenforced()
+
+        # Set after Chrome fails to start, so searches skip straight to requests until it passes
+        self._retry_at: Optional[float] = None
+        self._start_failures = 0
+        self._idle: List[Dict] = []  # {"driver": WebDriver, "pages": int}
+        self._capacity = threading.BoundedSemaphore(max_drivers)
+        self._lock = threading.Lock()
+        self._stats = {"leases": 0, "created": 0, "recycled": 0, "unhealthy": 0, "memory_recycled": 0}
+
+    def _warn_if_memory_unenforced(self):
+        """Say once per process that max_memory_mb is ignored without psutil"""
+        global _memory_ceiling_warned
+        if self.max_memory_mb and not PSUTIL_AVAILABLE and not _memory_ceiling_warned:
+            _memory_ceiling_warned = True
+            logger.warning(f"psutil is not installed, so the {self.max_memory_mb} MB driver memory ceiling "
+                           f"is not enforced; drivers are only recycled every {self.max_pages_per_driver} pages")
+
+    @property
+    def available(self) -> bool:
+        """False while backing off after Chrome failed to start"""
+        return self._retry_at is None or time.monotonic() >= self._retry_at
+
+    @contextmanager
+    def lease(self):
+        """
+        Lease a driver for the duration of the block
+        Raises RuntimeError if no driver can be started; a driver that died in the block is discarded
+        """
+        if not self.available:
+            raise RuntimeError("Selenium is not available")
+
+        with self._capacity:
+            slot = self._acquire_slot()
+            self._stats["leases"] += 1
+            healthy = True
+            try:
+                yield slot["driver"]
+            except BaseException:
+                # Page timeouts leave the driver usable, so only a dead driver is thrown away
+                healthy = self._is_healthy(slot["driver"])
+                raise
+            finally:
+                self._release_slot(slot, healthy)
+
+    def _acquire_slot(self) -> Dict:
+        """Take a healthy idle driver or start a new one"""
+        while True:
+            with self._lock:
+                slot = self._idle.pop() if self._idle else None
+            if slot is None:
+                break
+            if self._is_healthy(slot["driver"]):
+                return slot
+            self._stats["unhealthy"] += 1
+            self._quit(slot)
+
+        driver = self.driver_factory()
+        with self._lock:
+            if driver is None:
+                self._start_failures += 1
+                backoff = min(self.retry_interval * 2 ** (self._start_failures - 1), self.max_retry_interval)
+                self._retry_at = time.monotonic() + backoff
+                logger.warning(f"Chrome failed to start ({self._start_failures} in a row), "
+                               f"retrying Selenium in {backoff:.0f}s")
+                raise RuntimeError("Could not start a Selenium driver")
+            self._start_failures = 0
+            self._retry_at = None
+        self._stats["created"] += 1
+        return {"driver": driver, "pages": 0}
+
+    def _release_slot(self, slot: Dict, healthy: bool):
+        """Return a driver to the idle list, or quit it once it has served enough pages or grown too large"""
+        slot["pages"] += 1
+        if not healthy or slot["pages"] >= self.max_pages_per_driver:
+            self._stats["recycled"] += 1
+            self._quit(slot)
+            return
+
+        memory = driver_memory_mb(slot["driver"])
+        if memory is not None and memory > self.max_memory_mb:
+            logger.info(f"Recycling Selenium driver using {memory:.0f} MB after {slot['pages']} pages")
+            self._stats["memory_recycled"] += 1
+            self._quit(slot)
+            return
+
+        with self._lock:
+            self._idle.append(slot)
+
+    def _is_healthy(self, driver) -> bool:
+        """Check the driver still answers commands"""
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, slot: Dict):
+        """Quit a driver, ignoring errors from one that already died"""
+        try:
+            slot["driver"].quit()
+        except Exception as e:
+            logger.warning(f"Error closing WebDriver: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get pool usage counters"""
+        stats = dict(self._stats)
+        stats["idle"] = len(self._idle)
+        return stats
+
+    def close(self):
+        """Quit every idle driver"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for slot in idle:
+            self._quit(slot)
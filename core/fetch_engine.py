@@ -0,0 +1,178 @@
+"""
+Concurrent fetch engine for Mercari scraping
+Runs many HTTP requests at once over a pooled keep-alive session with a per-host concurrency cap,
+answering from the HTTP cache where possible
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from core.http_cache import HttpCache
+from core.rate_limiter import AdaptiveRateLimiter, get_rate_limiter, host_of, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code
+    Works both from plain scripts and from threads that already run an event loop (e.g. Streamlit)
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # A loop is already running in this thread, so run the coroutine on a helper thread
+    result = {}
+
+    def _runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=_runner, daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+class AsyncFetchEngine:
+    """Fetches many URLs concurrently with keep-alive connection reuse and per-host limits"""
+
+    def __init__(self, session: Optional[requests.Session] = None, max_concurrency: int = 16,
+                 per_host_limit: int = 4, timeout: float = 15,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, http_cache: Optional[HttpCache] = None):
+        self.session = session or requests.Session()
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.http_cache = http_cache
+
+        # Size the urllib3 pools so concurrent workers reuse connections instead of reopening them
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # requests is blocking, so each fetch runs on a worker thread; the pool size is the global cap
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="fetch")
+
+        # Semaphores are bound to the loop they are used on, so keep one set per loop
+        self._host_semaphores = weakref.WeakKeyDictionary()
+
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Get the concurrency semaphore for the URL's host on the running loop"""
+        loop = asyncio.get_running_loop()
+        semaphores = self._host_semaphores.setdefault(loop, {})
+        host = urlsplit(url).netloc
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return semaphores[host]
+
+    def _get(self, url: str, params: Optional[Dict], headers: Optional[Dict]) -> Dict:
+        """Blocking GET executed on a worker thread"""
+        start = time.time()
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            return {
+                "url": response.url,
+                "status": response.status_code,
+                # Copied, but kept case-insensitive so Retry-After, ETag etc. match however the server cased them
+                "headers": CaseInsensitiveDict(response.headers),
+                "text": response.text,
+                "elapsed": time.time() - start,
+                "error": None,
+                "cache": None
+            }
+        except Exception as e:
+            return {
+                "url": url,
+                "status": None,
+                "headers": CaseInsensitiveDict(),
+                "text": "",
+                "elapsed": time.time() - start,
+                "error": str(e),
+                "cache": None
+            }
+
+    async def fetch(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> Dict:
+        """
+        Fetch a single URL, waiting for a free slot and a rate-limit token on its host
+        Fresh cache entries are returned without any request; stale ones are revalidated conditionally
+        """
+        cached = self.http_cache.lookup(url, params) if self.http_cache else None
+        if cached and self.http_cache.is_fresh(cached):
+            logger.info(f"Cache hit for {cached['url']}")
+            return self._cached_result(cached, "hit", 0.0, url, params)
+        if cached:
+            headers = {**(headers or {}), **self.http_cache.conditional_headers(cached)}
+
+        host = host_of(url)
+        async with self._get_host_semaphore(url):
+            await self.rate_limiter.acquire_async(host)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, self._get, url, params, headers)
+            self.rate_limiter.record(
+                host,
+                status=result["status"],
+                latency=result["elapsed"],
+                retry_after=parse_retry_after(result["headers"].get("Retry-After")),
+                error=result["error"] is not None
+            )
+
+        if result["error"]:
+            logger.error(f"Fetch failed for {url}: {result['error']}")
+            return result
+
+        if self.http_cache and cached and result["status"] == 304:
+            self.http_cache.revalidated(cached, result["headers"])
+            logger.info(f"Not modified: {cached['url']} in {result['elapsed']:.2f}s")
+            return self._cached_result(cached, "revalidated", result["elapsed"], url, params)
+        if self.http_cache and result["status"] == 200:
+            self.http_cache.store(url, params, result["headers"], result["text"])
+
+        logger.info(f"Fetched {result['url']} ({result['status']}) in {result['elapsed']:.2f}s")
+        return result
+
+    def _cached_result(self, entry: Dict, cache_state: str, elapsed: float, url: str,
+                       params: Optional[Dict] = None) -> Dict:
+        """Build a fetch result from a cache entry, reporting the full request URL as a live fetch would"""
+        return {
+            "url": requests.Request("GET", url, params=params).prepare().url,
+            "status": 200,
+            "headers": CaseInsensitiveDict(entry["headers"]),
+            "text": entry["text"],
+            "elapsed": elapsed,
+            "error": None,
+            "cache": cache_state
+        }
+
+    async def fetch_many(self, requests_to_send: List[Tuple[str, Optional[Dict]]],
+                         headers: Optional[Dict] = None) -> List[Dict]:
+        """
+        Fetch a batch of (url, params) pairs concurrently
+        Results are returned in the same order as the input
+        """
+        tasks = [self.fetch(url, params, headers) for url, params in requests_to_send]
+        return await asyncio.gather(*tasks)
+
+    def fetch_many_sync(self, requests_to_send: List[Tuple[str, Optional[Dict]]],
+                        headers: Optional[Dict] = None) -> List[Dict]:
+        """Synchronous facade for fetch_many"""
+        return run_sync(self.fetch_many(requests_to_send, headers))
+
+    def close(self):
+        """Shut down worker threads and pooled connections"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
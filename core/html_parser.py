@@ -0,0 +1,165 @@
+"""
+Pluggable HTML parsing backends
+A small node interface (select, select_one, get, text, parent, ...) implemented over
+BeautifulSoup and, when installed, the much faster selectolax (lexbor) parser
+"""
+
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    LexborHTMLParser = None
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml  # noqa: F401 - only needed as a BeautifulSoup tree builder
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+class BeautifulSoupNode:
+    """Node interface over a BeautifulSoup tag"""
+
+    __slots__ = ("_tag",)
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    def select(self, css: str) -> List["BeautifulSoupNode"]:
+        return [BeautifulSoupNode(t) for t in self._tag.select(css)]
+
+    def select_one(self, css: str) -> Optional["BeautifulSoupNode"]:
+        tag = self._tag.select_one(css)
+        return BeautifulSoupNode(tag) if tag is not None else None
+
+    def get(self, attr: str, default=None):
+        return self._tag.get(attr, default)
+
+    @property
+    def text(self) -> str:
+        return self._tag.get_text()
+
+    def get_text(self) -> str:
+        return self._tag.get_text()
+
+    @property
+    def parent(self) -> Optional["BeautifulSoupNode"]:
+        return BeautifulSoupNode(self._tag.parent) if self._tag.parent is not None else None
+
+    def strings(self) -> List[str]:
+        """All text nodes under this node, in document order"""
+        return [str(s) for s in self._tag.find_all(string=True)]
+
+    def find_links(self, href_pattern: str) -> List["BeautifulSoupNode"]:
+        """Anchors whose href matches the regex"""
+        return [BeautifulSoupNode(a) for a in self._tag.find_all('a', href=re.compile(href_pattern))]
+
+    def find_text_parents(self, text_pattern: str) -> List["BeautifulSoupNode"]:
+        """Parents of text nodes matching the regex"""
+        return [BeautifulSoupNode(s.parent) for s in self._tag.find_all(string=re.compile(text_pattern))]
+
+class SelectolaxNode:
+    """Node interface over a selectolax (lexbor) node"""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, css: str) -> List["SelectolaxNode"]:
+        return [SelectolaxNode(n) for n in self._node.css(css)]
+
+    def select_one(self, css: str) -> Optional["SelectolaxNode"]:
+        node = self._node.css_first(css)
+        return SelectolaxNode(node) if node is not None else None
+
+    def get(self, attr: str, default=None):
+        value = self._node.attributes.get(attr)
+        return value if value is not None else default
+
+    @property
+    def text(self) -> str:
+        return self._node.text(deep=True)
+
+    def get_text(self) -> str:
+        return self._node.text(deep=True)
+
+    @property
+    def parent(self) -> Optional["SelectolaxNode"]:
+        parent = self._node.parent
+        return SelectolaxNode(parent) if parent is not None else None
+
+    def _text_nodes(self):
+        return (n for n in self._node.traverse(include_text=True) if n.tag == '-text')
+
+    def strings(self) -> List[str]:
+        """All text nodes under this node, in document order"""
+        return [n.text(deep=False) for n in self._text_nodes()]
+
+    def find_links(self, href_pattern: str) -> List["SelectolaxNode"]:
+        """Anchors whose href matches the regex"""
+        pattern = re.compile(href_pattern)
+        return [
+            SelectolaxNode(a) for a in self._node.css('a[href]')
+            if pattern.search(a.attributes.get('href') or '')
+        ]
+
+    def find_text_parents(self, text_pattern: str) -> List["SelectolaxNode"]:
+        """Parents of text nodes matching the regex"""
+        pattern = re.compile(text_pattern)
+        return [SelectolaxNode(n.parent) for n in self._text_nodes() if pattern.search(n.text(deep=False))]
+
+class BeautifulSoupBackend:
+    """BeautifulSoup with a selectable tree builder"""
+
+    def __init__(self, features: str = 'html.parser'):
+        self.features = features
+        self.name = 'bs4' if features == 'html.parser' else f'bs4-{features}'
+
+    def parse(self, html: str) -> BeautifulSoupNode:
+        return BeautifulSoupNode(BeautifulSoup(html, self.features))
+
+class SelectolaxBackend:
+    """selectolax's lexbor engine - a C parser with native CSS selectors"""
+
+    name = 'selectolax'
+
+    def parse(self, html: str) -> SelectolaxNode:
+        tree = LexborHTMLParser(html)
+        return SelectolaxNode(tree.root)
+
+def available_backends() -> Dict[str, object]:
+    """Instantiate every backend whose dependencies are installed"""
+    backends = {'bs4': BeautifulSoupBackend()}
+    if LXML_AVAILABLE:
+        backends['bs4-lxml'] = BeautifulSoupBackend('lxml')
+    if SELECTOLAX_AVAILABLE:
+        backends['selectolax'] = SelectolaxBackend()
+    return backends
+
+def get_parser_backend(name: Optional[str] = None):
+    """
+    Get a parser backend by name ('bs4', 'bs4-lxml', 'selectolax' or 'auto')
+    Defaults to SCRAPER_HTML_PARSER, then 'auto', which picks the fastest installed backend
+    """
+    name = name or os.environ.get("SCRAPER_HTML_PARSER", "auto")
+    backends = available_backends()
+
+    if name == 'auto':
+        for preferred in ('selectolax', 'bs4-lxml', 'bs4'):
+            if preferred in backends:
+                return backends[preferred]
+
+    if name not in backends:
+        logger.warning(f"HTML parser backend '{name}' is not available, using bs4")
+        return backends['bs4']
+    return backends[name]
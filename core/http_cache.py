@@ -0,0 +1,197 @@
+"""
+On-disk HTTP cache for scraped pages
+Stores responses in SQLite with per-URL-class freshness TTLs, revalidates stale entries
+with conditional GETs (ETag / Last-Modified) and evicts least recently used entries past a size cap
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(".scraper_state", "http_cache.sqlite")
+
+# (URL regex, seconds an entry is served without asking the server), first match wins
+DEFAULT_TTL_POLICIES = [
+    (r"/item/", 6 * 3600),   # Item pages change rarely; revalidation catches price or status edits
+    (r"/search", 5 * 60)     # Search results move quickly
+]
+
+class HttpCache:
+    """SQLite-backed response cache with TTL freshness, conditional revalidation and LRU eviction"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 256 * 1024 * 1024,
+                 ttl_policies: Optional[List[Tuple[str, float]]] = None, default_ttl: float = 600,
+                 max_stale: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale  # Stale entries older than this are dropped instead of revalidated
+        policies = ttl_policies if ttl_policies is not None else DEFAULT_TTL_POLICIES
+        self.ttl_policies = [(re.compile(pattern), ttl) for pattern, ttl in policies]
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS http_cache ("
+                "key TEXT PRIMARY KEY, url TEXT, headers TEXT, body BLOB, etag TEXT, last_modified TEXT, "
+                "stored_at REAL, expires_at REAL, last_access REAL, size INTEGER)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS http_cache_access ON http_cache (last_access)")
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[Dict] = None) -> str:
+        """Stable key for a URL and its query parameters"""
+        canonical = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        """Freshness lifetime for a URL according to the TTL policies"""
+        for pattern, ttl in self.ttl_policies:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """Get the cached entry for a request, fresh or stale, or None"""
+        key = self.cache_key(url, params)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT url, headers, body, etag, last_modified, stored_at, expires_at "
+                "FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            if now - row[5] > self.max_stale:
+                self._conn.execute("DELETE FROM http_cache WHERE key = ?", (key,))
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE http_cache SET last_access = ? WHERE key = ?", (now, key))
+
+        return {
+            "key": key,
+            "url": row[0],
+            "headers": json.loads(row[1]),
+            "text": zlib.decompress(row[2]).decode("utf-8"),
+            "etag": row[3],
+            "last_modified": row[4],
+            "stored_at": row[5],
+            "expires_at": row[6]
+        }
+
+    def is_fresh(self, entry: Optional[Dict]) -> bool:
+        """Whether an entry can be served without contacting the server"""
+        fresh = bool(entry) and time.time() < entry["expires_at"]
+        if fresh:
+            self.stats["hits"] += 1
+        return fresh
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Validators to send so an unchanged page comes back as a 304"""
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, entry: Dict, headers: Optional[Dict] = None):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        headers = CaseInsensitiveDict(headers or {})
+        now = time.time()
+        etag = headers.get("ETag") or entry["etag"]
+        last_modified = headers.get("Last-Modified") or entry["last_modified"]
+        expires_at = now + self.ttl_for(entry["url"])
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE http_cache SET etag = ?, last_modified = ?, stored_at = ?, expires_at = ?, "
+                "last_access = ? WHERE key = ?",
+                (etag, last_modified, now, expires_at, now, entry["key"])
+            )
+        entry.update(etag=etag, last_modified=last_modified, stored_at=now, expires_at=expires_at)
+        self.stats["revalidated"] += 1
+
+    def store(self, url: str, params: Optional[Dict], headers: Dict, text: str):
+        """Cache a 200 response unless the server forbids storing it"""
+        headers = CaseInsensitiveDict(headers)
+        if "no-store" in (headers.get("Cache-Control") or "").lower():
+            return
+        now = time.time()
+        body = zlib.compress(text.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache "
+                "(key, url, headers, body, etag, last_modified, stored_at, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.cache_key(url, params), url, json.dumps(dict(headers)), body,
+                 headers.get("ETag"), headers.get("Last-Modified"), now, now + self.ttl_for(url), now, len(body))
+            )
+            self.stats["stored"] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM http_cache ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM http_cache WHERE key = ?", (key,))
+            total -= size
+            self.stats["evicted"] += 1
+
+    def get_stats(self) -> Dict:
+        """Hit/revalidation/miss counters plus current entry count and size"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache"
+            ).fetchone()
+        return {**self.stats, "entries": entries, "bytes": size}
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_http_cache() -> Optional[HttpCache]:
+    """
+    Get the process-wide HTTP cache
+    SCRAPER_HTTP_CACHE sets the database path; set it to 'off' to disable caching
+    """
+    global _shared_cache
+    path = os.environ.get("SCRAPER_HTTP_CACHE", DEFAULT_CACHE_PATH)
+    if path.lower() == "off":
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = HttpCache(path=path)
+            except Exception as e:
+                logger.warning(f"HTTP cache disabled, could not open {path}: {e}")
+                return None
+        return _shared_cache
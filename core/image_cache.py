@@ -0,0 +1,267 @@
+"""
+Local thumbnail cache for product images
+Downloads each remote image once, turns it into a fixed-size WebP thumbnail in a process pool
+and keeps the thumbnails in a size-bounded directory, evicting the least recently used first,
+so product cards load small local files instead of full-size CDN photos.
+Pages should call get() and warm() rather than thumbnail(): a miss renders the remote URL once
+while the thumbnail is made in the background, so a cold cache never delays rendering
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    PIL_AVAILABLE = False
+
+DEFAULT_IMAGE_CACHE_PATH = os.path.join(".scraper_state", "image_cache")
+
+DOWNLOAD_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; mercari-recommender thumbnail cache)"}
+MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+
+def make_thumbnail(data: bytes, size: Tuple[int, int], quality: int) -> bytes:
+    """Shrink an image to fit within size, keeping its aspect ratio, and encode it as WebP"""
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", size)  # Lets JPEG decode at a reduced scale
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        image.thumbnail(size)
+        out = io.BytesIO()
+        image.save(out, "WEBP", quality=quality, method=4)
+    return out.getvalue()
+
+class ImageCache:
+    """Directory of WebP thumbnails keyed by source URL, bounded by total size with LRU eviction"""
+
+    def __init__(self, root: str = DEFAULT_IMAGE_CACHE_PATH, max_bytes: int = 200 * 1024 * 1024,
+                 size: Tuple[int, int] = (320, 320), quality: int = 80, workers: Optional[int] = None,
+                 timeout: float = 10.0, warm_workers: int = 4):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.size = size
+        self.quality = quality
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self.timeout = timeout
+        self.warm_workers = warm_workers
+        self.stats = {"hits": 0, "misses": 0, "errors": 0, "evictions": 0}
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._warmers = None
+        self._queued = set()
+        self._pending: Dict[str, threading.Event] = {}
+        self._failed = set()
+        # path -> size in bytes, oldest access first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from file access times left by previous processes"""
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                if name.endswith(".tmp"):
+                    os.remove(path)
+                    continue
+                stat = os.stat(path)
+                files.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            self._entries[path] = size
+            self._total_bytes += size
+
+    def path_for(self, url: str) -> str:
+        """Where the thumbnail for a URL is stored, fanned out by the first two hex digits"""
+        digest = hashlib.sha256(f"{url}|{self.size[0]}x{self.size[1]}|{self.quality}".encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest[:2], f"{digest}.webp")
+
+    def _touch(self, path: str) -> bool:
+        """Mark a cached thumbnail as just used; returns False if it is not cached"""
+        with self._lock:
+            if path not in self._entries:
+                return False
+            self._entries.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True
+
+    def get(self, url: str) -> Optional[str]:
+        """Local path of the cached thumbnail for a URL, without fetching it"""
+        path = self.path_for(url)
+        if self._touch(path):
+            self.stats["hits"] += 1
+            return path
+        return None
+
+    def _download(self, url: str) -> bytes:
+        """Fetch an image, refusing anything larger than MAX_DOWNLOAD_BYTES"""
+        with requests.get(url, headers=DOWNLOAD_HEADERS, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            data = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                data.extend(chunk)
+                if len(data) > MAX_DOWNLOAD_BYTES:
+                    raise ValueError(f"image larger than {MAX_DOWNLOAD_BYTES} bytes")
+        return bytes(data)
+
+    def _render(self, data: bytes) -> bytes:
+        """Make a thumbnail in the process pool, or inline when workers is 0 or the pool broke"""
+        if self.workers > 0:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                pool = self._pool
+            try:
+                return pool.submit(make_thumbnail, data, self.size, self.quality).result()
+            except BrokenProcessPool as e:
+                logger.warning(f"Thumbnail pool unavailable, rendering inline: {e}")
+                self.workers = 0
+        return make_thumbnail(data, self.size, self.quality)
+
+    def _store(self, path: str, thumbnail: bytes):
+        """Write a thumbnail atomically and evict old ones past max_bytes"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(thumbnail)
+        os.replace(tmp_path, path)
+
+        evicted = []
+        with self._lock:
+            self._total_bytes += len(thumbnail) - self._entries.pop(path, 0)
+            self._entries[path] = len(thumbnail)
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_path, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_path)
+        for old_path in evicted:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+        self.stats["evictions"] += len(evicted)
+
+    def thumbnail(self, url: Optional[str]) -> Optional[str]:
+        """
+        Local path of a thumbnail for a remote image, downloading and converting it on first use
+        Returns None if the image cannot be fetched or decoded, so callers can fall back to the URL;
+        failed URLs are not retried for the life of the process
+        """
+        if not url or not url.startswith(("http://", "https://")):
+            return None
+        path = self.get(url)
+        if path:
+            return path
+
+        # Concurrent requests for the same image wait for the first one instead of downloading again
+        with self._lock:
+            if url in self._failed:
+                return None
+            event = self._pending.get(url)
+            owner = event is None
+            if owner:
+                event = self._pending[url] = threading.Event()
+        if not owner:
+            event.wait(self.timeout * 2)
+            return self.get(url)
+
+        try:
+            self.stats["misses"] += 1
+            path = self.path_for(url)
+            self._store(path, self._render(self._download(url)))
+            return path
+        except Exception as e:
+            logger.warning(f"Could not cache thumbnail for {url}: {e}")
+            self.stats["errors"] += 1
+            with self._lock:
+                self._failed.add(url)
+            return None
+        finally:
+            with self._lock:
+                self._pending.pop(url, None)
+            event.set()
+
+    def thumbnails(self, urls: Iterable[Optional[str]], concurrency: int = 8) -> Dict[str, Optional[str]]:
+        """Thumbnail paths for many URLs, downloading the missing ones in parallel"""
+        unique = list(dict.fromkeys(url for url in urls if url))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(unique))) as executor:
+            return dict(zip(unique, executor.map(self.thumbnail, unique)))
+
+    def warm(self, urls: Iterable[Optional[str]]):
+        """Queue thumbnails for uncached URLs on background threads and return at once"""
+        for url in dict.fromkeys(urls):
+            if not url or not url.startswith(("http://", "https://")):
+                continue
+            with self._lock:
+                if (self.path_for(url) in self._entries or url in self._failed
+                        or url in self._pending or url in self._queued):
+                    continue
+                self._queued.add(url)
+                if self._warmers is None:
+                    self._warmers = ThreadPoolExecutor(max_workers=self.warm_workers,
+                                                       thread_name_prefix="thumbnail-warm")
+                warmers = self._warmers
+            warmers.submit(self._warm_one, url)
+
+    def _warm_one(self, url: str):
+        try:
+            self.thumbnail(url)
+        finally:
+            with self._lock:
+                self._queued.discard(url)
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters plus entry count and bytes on disk"""
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "bytes": self._total_bytes}
+
+    def close(self):
+        """Wait for queued warm-ups, then shut down the thumbnail process pool"""
+        with self._lock:
+            warmers, self._warmers = self._warmers, None
+        if warmers:
+            warmers.shutdown()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown()
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_image_cache() -> Optional[ImageCache]:
+    """
+    Get the process-wide thumbnail cache
+    SCRAPER_IMAGE_CACHE sets the directory; set it to 'off' to serve remote images directly
+    """
+    global _shared_cache
+    root = os.environ.get("SCRAPER_IMAGE_CACHE", DEFAULT_IMAGE_CACHE_PATH)
+    if root.lower() == "off" or not PIL_AVAILABLE:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = ImageCache(root=root)
+            except Exception as e:
+                logger.warning(f"Image cache disabled, could not open {root}: {e}")
+                return None
+        return _shared_cache
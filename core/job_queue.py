@@ -0,0 +1,242 @@
+"""
+Persistent scrape job queue
+Jobs live in a SQLite file and are handed to workers under a lease that must be renewed with
+heartbeats; a lease that runs past its visibility timeout is given to the next worker, and
+failed jobs are retried with exponential backoff until max_attempts
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = os.path.join(".scraper_state", "job_queue.sqlite")
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+_COLUMNS = ("id", "kind", "payload", "dedupe_key", "status", "priority", "attempts", "max_attempts",
+            "available_at", "lease_owner", "lease_expires", "last_error", "result", "created_at", "updated_at")
+
+class JobQueue:
+    """SQLite job table with leases, heartbeats, retries and visibility timeouts, safe across processes"""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH, visibility_timeout: float = 300,
+                 retry_backoff: float = 30):
+        self.path = path
+        self.visibility_timeout = visibility_timeout  # Seconds a lease lasts without a heartbeat
+        self.retry_backoff = retry_backoff  # Delay before the first retry, doubled per attempt
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+                "dedupe_key TEXT, status TEXT NOT NULL, priority REAL DEFAULT 0, attempts INTEGER DEFAULT 0, "
+                "max_attempts INTEGER DEFAULT 3, available_at REAL, lease_owner TEXT, lease_expires REAL, "
+                "last_error TEXT, result TEXT, created_at REAL, updated_at REAL)"
+            )
+            # At most one pending or running job per dedupe key; finished jobs may be enqueued again
+            self._conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key ON jobs (dedupe_key) "
+                "WHERE status IN ('queued', 'leased')"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority, available_at)")
+
+    def _transaction(self, fn):
+        """Run fn(conn) inside BEGIN IMMEDIATE so concurrent workers never lease the same job"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _row_to_job(row) -> Dict:
+        job = dict(zip(_COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, kind: str, payload: Dict, priority: float = 0, dedupe_key: Optional[str] = None,
+                max_attempts: int = 3, delay: float = 0) -> Optional[int]:
+        """
+        Add a job; higher priority is leased first
+        Returns the job id, or None if a job with the same dedupe_key is already pending or running
+        """
+        now = time.time()
+
+        def insert(conn):
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (kind, payload, dedupe_key, status, priority, max_attempts, "
+                "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload, ensure_ascii=False), dedupe_key, QUEUED, priority, max_attempts,
+                 now + delay, now, now)
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+        return self._transaction(insert)
+
+    def lease(self, worker_id: str, kinds: Optional[List[str]] = None,
+              visibility_timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Lease the highest-priority ready job, including jobs whose previous lease expired
+        Returns the job (with its attempt counted) or None if nothing is ready
+        """
+        timeout = visibility_timeout or self.visibility_timeout
+        kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+
+        def take(conn):
+            now = time.time()
+            while True:
+                row = conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM jobs "
+                    "WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_expires <= ?))"
+                    f"{kind_filter} ORDER BY priority DESC, id LIMIT 1",
+                    (QUEUED, now, LEASED, now, *(kinds or []))
+                ).fetchone()
+                if row is None:
+                    return None
+                job = self._row_to_job(row)
+
+                if job["status"] == LEASED and job["attempts"] >= job["max_attempts"]:
+                    # The last allowed attempt crashed without reporting back
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, lease_owner = NULL, last_error = ?, updated_at = ? "
+                        "WHERE id = ?",
+                        (FAILED, f"lease expired on {job['lease_owner']}", now, job["id"])
+                    )
+                    continue
+
+                if job["status"] == LEASED:
+                    logger.warning(f"Re-leasing job {job['id']} after {job['lease_owner']}'s lease expired")
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?",
+                    (LEASED, worker_id, now + timeout, now, job["id"])
+                )
+                job.update(status=LEASED, lease_owner=worker_id, lease_expires=now + timeout,
+                           attempts=job["attempts"] + 1)
+                return job
+
+        return self._transaction(take)
+
+    def _update_leased(self, job_id: int, worker_id: str, sql: str, params: tuple) -> bool:
+        """Apply an update only while worker_id still holds the job's lease"""
+        def update(conn):
+            cursor = conn.execute(
+                f"UPDATE jobs SET {sql} WHERE id = ? AND status = ? AND lease_owner = ?",
+                (*params, job_id, LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(update)
+
+    def heartbeat(self, job_id: int, worker_id: str, visibility_timeout: Optional[float] = None) -> bool:
+        """Extend a lease; False means the lease was lost and the job may be running elsewhere"""
+        now = time.time()
+        timeout = visibility_timeout or self.visibility_timeout
+        return self._update_leased(job_id, worker_id, "lease_expires = ?, updated_at = ?", (now + timeout, now))
+
+    def complete(self, job_id: int, worker_id: str, result: Optional[Dict] = None) -> bool:
+        """Mark a leased job done"""
+        return self._update_leased(
+            job_id, worker_id, "status = ?, lease_owner = NULL, result = ?, updated_at = ?",
+            (DONE, json.dumps(result, ensure_ascii=False) if result is not None else None, time.time())
+        )
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Record a failed attempt, scheduling a retry with backoff or failing the job for good"""
+        now = time.time()
+
+        def update(conn):
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?",
+                (job_id, LEASED, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            attempts, max_attempts = row
+            if attempts >= max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                    (FAILED, error, now, job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = NULL, last_error = ?, available_at = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (QUEUED, error, now + self.retry_backoff * 2 ** (attempts - 1), now, job_id)
+                )
+            return True
+
+        return self._transaction(update)
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Get one job by id"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_stats(self) -> Dict:
+        """Count jobs by status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        stats = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        stats.update(dict(rows))
+        return stats
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs last updated more than older_than seconds ago"""
+        cutoff = time.time() - older_than
+        return self._transaction(lambda conn: conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (DONE, FAILED, cutoff)
+        ).rowcount)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+class LeaseKeeper:
+    """Background thread that heartbeats a leased job until stopped"""
+
+    def __init__(self, queue: JobQueue, job_id: int, worker_id: str, interval: Optional[float] = None):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval or queue.visibility_timeout / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{job_id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker_id):
+                    logger.warning(f"Lost the lease on job {self.job_id}")
+                    self.lost = True
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {self.job_id} failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
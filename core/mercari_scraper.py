@@ -1,40 +1,101 @@
+import asyncio
+import json
 import requests
 import random
 import time
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from fake_useragent import UserAgent
 import re
 import logging
 import os
+from core.crawl_state import CrawlState, DEFAULT_CRAWL_STATE_PATH, listing_key
+from core.driver_pool import DriverPool
+from core.fetch_engine import AsyncFetchEngine, run_sync
+from core.html_parser import get_parser_backend
+from core.page_archive import get_page_archive
+from core.page_readiness import ReadinessWaiter
+from core.http_cache import get_http_cache
+from core.rate_limiter import get_rate_limiter, host_of, parse_retry_after
+from core.selector_stats import SelectorStats, DEFAULT_STATS_PATH
+from core.structured_data import extract_products as extract_structured_products
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Headers sent with search page requests
+SEARCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'ja,en-US;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0',
+    'Referer': 'https://jp.mercari.com/'
+}
+
+# Any of these means search results have rendered, in rough order of reliability
+SEARCH_READY_SELECTORS = [
+    '[data-testid="item-cell"]',
+    '.item-cell',
+    '[data-testid="search-item"]',
+    '.search-item',
+    '.mercari-item',
+    '.product-item'
+]
+# Generic selectors page chrome or loading skeletons can match, only checked once the specific ones miss
+SEARCH_FALLBACK_SELECTORS = [
+    'li[data-testid*="item"]',
+    '[data-testid="item"]',
+    '.item',
+    'article'
+]
+DETAIL_READY_SELECTORS = ['[data-testid="item-detail"]']
+
+# Total seconds each Selenium page type may wait for its readiness selectors
+DEFAULT_READY_DEADLINES = {"search": 15.0, "detail": 10.0}
+
+_user_agents = None
+
+def random_user_agent() -> str:
+    """Random browser User-Agent; the fake_useragent data is loaded once per process"""
+    global _user_agents
+    try:
+        if _user_agents is None:
+            from fake_useragent import UserAgent
+            _user_agents = UserAgent()
+        return _user_agents.random
+    except Exception as e:
+        logger.warning(f"fake_useragent unavailable, using a fixed User-Agent: {e}")
+        return SEARCH_HEADERS['User-Agent']
+
 class MercariScraper:
     """Enhanced Mercari Japan scraper that extracts real product images"""
     
-    def __init__(self, use_selenium: bool = True):
+    def __init__(self, use_selenium: bool = True, max_concurrency: int = 16, per_host_limit: int = 4,
+                 parser: Optional[str] = None, max_drivers: int = 1,
+                 ready_deadlines: Optional[Dict[str, float]] = None):
         # Disable Selenium on Streamlit Cloud
         if ("CI" in os.environ or "STREAMLIT_CLOUD" in os.environ or os.environ.get("HOME", "").startswith("/home/appuser")):
             use_selenium = False
         self.session = requests.Session()
         self.base_url = "https://jp.mercari.com"
         self.use_selenium = use_selenium
-        self.driver = None
+        
+        # Chrome is started on the first Selenium page load, never at construction
+        self.driver_pool = DriverPool(max_drivers=max_drivers) if use_selenium else None
+        
+        # Selenium pages wait for the first of their readiness selectors under one deadline per page type
+        self.ready_deadlines = {**DEFAULT_READY_DEADLINES, **(ready_deadlines or {})}
+        self.readiness = ReadinessWaiter()
         
         # Set up headers to mimic a real browser
-        ua = UserAgent()
         self.session.headers.update({
-            'User-Agent': ua.random,
+            'User-Agent': random_user_agent(),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'ja,en-US;q=0.7,en;q=0.3',
             'Accept-Encoding': 'gzip, deflate, br',
@@ -46,44 +107,33 @@ class MercariScraper:
             'Cache-Control': 'max-age=0',
         })
         
-        if self.use_selenium:
-            self._setup_selenium()
-    
-    def _setup_selenium(self):
-        """Set up Selenium WebDriver with Chrome options"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')  # Run in headless mode
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-            
-            # Disable images to speed up loading (we'll extract URLs from HTML)
-            prefs = {"profile.managed_default_content_settings.images": 2}
-            chrome_options.add_experimental_option("prefs", prefs)
-            
-            # Try to use ChromeDriverManager with version compatibility
-            try:
-                self.driver = webdriver.Chrome(
-                    service=webdriver.chrome.service.Service(ChromeDriverManager().install()),
-                    options=chrome_options
-                )
-                logger.info("Selenium WebDriver initialized successfully")
-            except Exception as chrome_error:
-                logger.warning(f"ChromeDriver failed, trying without version management: {chrome_error}")
-                # Fallback: try without ChromeDriverManager
-                try:
-                    self.driver = webdriver.Chrome(options=chrome_options)
-                    logger.info("Selenium WebDriver initialized with fallback method")
-                except Exception as fallback_error:
-                    logger.error(f"Fallback ChromeDriver also failed: {fallback_error}")
-                    self.use_selenium = False
-                    
-        except Exception as e:
-            logger.error(f"Failed to initialize Selenium: {e}")
-            self.use_selenium = False
+        # HTML parsing backend (selectolax when installed, BeautifulSoup otherwise)
+        self.parser = get_parser_backend(parser)
+        
+        # Learned selector order, so parsing tries the selector that matched last time first
+        self.selector_stats = SelectorStats(path=os.environ.get("SCRAPER_SELECTOR_STATS", DEFAULT_STATS_PATH))
+        
+        # Per-query high-water marks for incremental crawls
+        self.crawl_state = CrawlState(path=os.environ.get("SCRAPER_CRAWL_STATE", DEFAULT_CRAWL_STATE_PATH))
+        
+        # Every request, sync or concurrent, goes through the shared per-host rate limiter
+        self.rate_limiter = get_rate_limiter()
+        
+        # On-disk HTTP cache so unchanged pages come back as local hits or 304s
+        self.http_cache = get_http_cache()
+        
+        # Raw copies of fetched pages, so extraction can be re-run later without re-crawling
+        self.page_archive = get_page_archive()
+        
+        # Concurrent fetcher sharing the session's keep-alive connections
+        self.fetch_engine = AsyncFetchEngine(
+            session=self.session,
+            max_concurrency=max_concurrency,
+            per_host_limit=per_host_limit,
+            rate_limiter=self.rate_limiter,
+            http_cache=self.http_cache
+        )
+
     
     def search_products(self, query: str, filters: Optional[Dict] = None) -> List[Dict]:
         """
@@ -103,8 +153,181 @@ class MercariScraper:
         logger.info("Using fallback sample data with Mercari-style image URLs")
         return self._get_sample_products_with_mercari_images(query)
     
-    def _scrape_mercari_products(self, query: str, filters: Optional[Dict] = None) -> List[Dict]:
-        """Scrape real products from Mercari Japan"""
+    def iter_search_products(self, query: str, filters: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Streaming variant of search_products
+        Yields each product as soon as it is parsed, with the same sample-data fallback when none are found
+        """
+        count = 0
+        try:
+            html_content = self._fetch_search_html(query, filters)
+            for product in self._iter_mercari_html(html_content) if html_content else ():
+                count += 1
+                yield product
+        except Exception as e:
+            logger.error(f"Error scraping Mercari: {e}")
+        
+        if not count:
+            logger.info("Using fallback sample data with Mercari-style image URLs")
+            yield from self._get_sample_products_with_mercari_images(query)
+    
+    async def stream_search_many(self, queries: List[str],
+                                 filters: Optional[Dict] = None) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Fetch several queries concurrently and yield (query, product) pairs in the order pages arrive
+        Queries whose page fails yield nothing; there is no sample-data fallback
+        """
+        async def fetch(query: str):
+            url, params = self._build_search_request(query, filters)
+            return query, await self.fetch_engine.fetch(url, params, SEARCH_HEADERS)
+        
+        for next_page in asyncio.as_completed([fetch(query) for query in queries]):
+            query, response = await next_page
+            if response["error"] or response["status"] != 200:
+                logger.warning(f"Search for {query} failed: {response['error'] or response['status']}")
+                continue
+            if response["cache"] != "hit":
+                self._archive_page(response["url"], response["text"])
+            try:
+                for product in self._iter_mercari_html(response["text"]):
+                    yield query, product
+            except Exception as e:
+                logger.error(f"Error parsing results for {query}: {e}")
+    
+    def fetch_search_page(self, query: str, filters: Optional[Dict] = None, page: int = 1) -> List[Dict]:
+        """
+        Fetch and parse one search results page over requests
+        Unlike search_products, errors are raised instead of replaced with sample data
+        """
+        url, params = self._build_search_request(query, filters, page)
+        html_content = self._cached_get(url, params=params, headers=SEARCH_HEADERS, timeout=15)
+        return self._parse_mercari_html(html_content)
+    
+    def search_many(self, queries: List[str], filters: Optional[Dict] = None) -> Dict[str, List[Dict]]:
+        """
+        Search several queries at once
+        Returns a dict mapping each query to its products, with the same fallback as search_products
+        """
+        # The Selenium path loads one page per leased driver, so it stays sequential
+        if self.use_selenium:
+            return {query: self.search_products(query, filters) for query in queries}
+        
+        return run_sync(self.search_many_async(queries, filters))
+    
+    async def search_many_async(self, queries: List[str], filters: Optional[Dict] = None) -> Dict[str, List[Dict]]:
+        """Fetch and parse search pages for several queries concurrently"""
+        search_requests = [self._build_search_request(query, filters) for query in queries]
+        responses = await self.fetch_engine.fetch_many(search_requests, headers=SEARCH_HEADERS)
+        
+        results = {}
+        for query, response in zip(queries, responses):
+            products = []
+            if not response["error"] and response["status"] == 200:
+                if response["cache"] != "hit":
+                    self._archive_page(response["url"], response["text"])
+                try:
+                    products = self._parse_mercari_html(response["text"])
+                except Exception as e:
+                    logger.error(f"Error parsing results for {query}: {e}")
+            
+            if products:
+                logger.info(f"Successfully scraped {len(products)} products from Mercari for {query}")
+                results[query] = products
+            else:
+                logger.info(f"Using fallback sample data for {query}")
+                results[query] = self._get_sample_products_with_mercari_images(query)
+        
+        return results
+    
+    def search_many_incremental(self, queries: List[str], filters: Optional[Dict] = None,
+                                max_pages: int = 5, page_limits: Optional[Dict[str, int]] = None) -> Dict[str, Dict]:
+        """
+        Crawl several queries newest-first, stopping each one at listings ingested on a previous run
+        page_limits overrides max_pages for individual queries
+        Returns a per-query summary with the new products and how many pages were fetched and skipped
+        """
+        return run_sync(self.search_many_incremental_async(queries, filters, max_pages, page_limits))
+    
+    async def search_many_incremental_async(self, queries: List[str], filters: Optional[Dict] = None,
+                                            max_pages: int = 5,
+                                            page_limits: Optional[Dict[str, int]] = None) -> Dict[str, Dict]:
+        """
+        Run incremental crawls for several queries concurrently
+        Marks are left where they were; call commit_incremental for each query once its products are stored
+        """
+        page_limits = page_limits or {}
+        summaries = await asyncio.gather(*[
+            self._crawl_new_listings(query, filters, page_limits.get(query, max_pages)) for query in queries
+        ])
+        return dict(zip(queries, summaries))
+    
+    def commit_incremental(self, query: str, summary: Dict, filters: Optional[Dict] = None) -> bool:
+        """
+        Move a query's high-water mark past the new listings of a finished crawl and persist it
+        Only call this after those listings are stored, or a failed write loses them for good;
+        a crawl that stopped on an error keeps the old mark. Returns whether the mark moved
+        """
+        if summary["error"]:
+            return False
+        self.crawl_state.advance(self._crawl_state_key(query, filters), summary["new_products"])
+        self.crawl_state.save()
+        return True
+    
+    def _crawl_state_key(self, query: str, filters: Optional[Dict] = None) -> str:
+        """Key of a query's high-water mark; different filters crawl different result lists"""
+        return f"{query} {json.dumps(filters, sort_keys=True)}" if filters else query
+    
+    async def _crawl_new_listings(self, query: str, filters: Optional[Dict], max_pages: int) -> Dict:
+        """Page through one query's results until its high-water mark is reached"""
+        state_key = self._crawl_state_key(query, filters)
+        new_products = []
+        seen = set()
+        pages_fetched = 0
+        reached_mark = False
+        error = None
+        
+        for page in range(1, max_pages + 1):
+            url, params = self._build_search_request(query, filters, page)
+            response = await self.fetch_engine.fetch(url, params, SEARCH_HEADERS)
+            if response["error"] or response["status"] != 200:
+                error = response["error"] or f"HTTP {response['status']}"
+                break
+            if response["cache"] != "hit":
+                self._archive_page(response["url"], response["text"])
+            pages_fetched += 1
+            
+            try:
+                products = self._parse_mercari_html(response["text"])
+            except Exception as e:
+                error = str(e)
+                break
+            
+            fresh, reached_mark = self.crawl_state.split_new(state_key, products)
+            for product in fresh:
+                # Listings can shift between pages while paginating
+                key = listing_key(product)
+                if key not in seen:
+                    seen.add(key)
+                    new_products.append(product)
+            if reached_mark or not products:
+                break
+        
+        if error:
+            # commit_incremental keeps the old mark so the listings behind the failed page are picked up next run
+            logger.warning(f"Incremental crawl for {query} stopped at page {pages_fetched + 1}: {error}")
+        
+        logger.info(f"{query}: {len(new_products)} new listings, {pages_fetched} pages fetched, "
+                    f"{max_pages - pages_fetched} skipped")
+        return {
+            "new_products": new_products,
+            "pages_fetched": pages_fetched,
+            "pages_skipped": max_pages - pages_fetched,
+            "reached_mark": reached_mark,
+            "error": error
+        }
+    
+    def _build_search_request(self, query: str, filters: Optional[Dict] = None, page: int = 1):
+        """Build the search URL and query parameters for a query"""
         # Use the correct Mercari Japan search URL
         search_url = f"{self.base_url}/search"
         params = {
@@ -117,103 +340,171 @@ class MercariScraper:
         if filters:
             params.update(filters)
         
+        if page > 1:
+            # Mercari paginates search results with a token of the form v1:<zero-based page index>
+            params['page_token'] = f"v1:{page - 1}"
+        
+        return search_url, params
+    
+    def _scrape_mercari_products(self, query: str, filters: Optional[Dict] = None) -> List[Dict]:
+        """Scrape real products from Mercari Japan"""
+        search_url, params = self._build_search_request(query, filters)
+        
         try:
-            if self.use_selenium and self.driver:
-                return self._scrape_with_selenium(search_url, params)
-            else:
-                return self._scrape_with_requests(search_url, params)
+            if self.use_selenium and self.driver_pool.available:
+                products = self._scrape_with_selenium(search_url, params)
+                if self.driver_pool.available:
+                    return products
+            # Chrome could not be started; requests serves until the pool retries it
+            return self._scrape_with_requests(search_url, params)
                 
         except Exception as e:
             logger.error(f"Scraping failed: {e}")
             return []
     
+    def _fetch_search_html(self, query: str, filters: Optional[Dict] = None) -> Optional[str]:
+        """Search page HTML, rendered by Selenium when it is enabled and Chrome starts, else through requests"""
+        search_url, params = self._build_search_request(query, filters)
+        if self.use_selenium and self.driver_pool.available:
+            page_source = self._fetch_with_selenium(search_url, params)
+            if self.driver_pool.available:
+                return page_source
+        # Chrome could not be started; requests serves until the pool retries it
+        return self._cached_get(search_url, params=params, headers=SEARCH_HEADERS, timeout=15)
+    
     def _scrape_with_selenium(self, search_url: str, params: Dict) -> List[Dict]:
         """Scrape using Selenium for JavaScript-rendered content"""
+        page_source = self._fetch_with_selenium(search_url, params)
+        return self._parse_mercari_html(page_source) if page_source else []
+    
+    def _fetch_with_selenium(self, search_url: str, params: Dict) -> Optional[str]:
+        """Load a search page in a pooled browser and return its rendered source, or None on failure"""
         try:
             # Build URL with parameters
             param_str = '&'.join([f"{k}={v}" for k, v in params.items()])
             full_url = f"{search_url}?{param_str}"
             
             logger.info(f"Scraping with Selenium: {full_url}")
-            self.driver.get(full_url)
+            with self.driver_pool.lease() as driver:
+                self._rate_limited_driver_get(driver, full_url)
+                page_source = self._wait_for_search_results(driver)
             
-            # Wait for content to load - try multiple selectors
-            wait = WebDriverWait(self.driver, 15)
-            selectors_to_try = [
-                '[data-testid="item-cell"]',
-                '.item-cell',
-                '[data-testid="search-item"]',
-                '.search-item',
-                'li[data-testid*="item"]',
-                '.mercari-item',
-                '[data-testid="item"]',
-                '.item',
-                'article',
-                '.product-item'
-            ]
-            
-            content_loaded = False
-            for selector in selectors_to_try:
-                try:
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    logger.info(f"Content loaded with selector: {selector}")
-                    content_loaded = True
-                    break
-                except TimeoutException:
-                    continue
-            
-            if not content_loaded:
-                # Wait for any content to load
-                wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                logger.warning("No specific product elements found, but page loaded")
-            
-            # Get page source after JavaScript rendering
-            page_source = self.driver.page_source
-            return self._parse_mercari_html(page_source)
+            self._archive_page(full_url, page_source)
+            return page_source
             
         except TimeoutException:
             logger.warning("Timeout waiting for page to load")
-            return []
+            return None
         except Exception as e:
             logger.error(f"Selenium scraping error: {e}")
-            return []
+            return None
+    
+    def _wait_for_search_results(self, driver, deadline: Optional[float] = None) -> str:
+        """Wait up to the search deadline for any results selector and return the page source"""
+        matched = self.readiness.wait_for_any(driver, SEARCH_READY_SELECTORS, site="search",
+                                              deadline=deadline or self.ready_deadlines["search"],
+                                              fallback_selectors=SEARCH_FALLBACK_SELECTORS)
+        if not matched:
+            logger.warning("No specific product elements found, parsing the page as loaded")
+        
+        # Get page source after JavaScript rendering
+        return driver.page_source
     
     def _scrape_with_requests(self, search_url: str, params: Dict) -> List[Dict]:
-        """Scrape using requests and BeautifulSoup"""
+        """Scrape using requests and the configured HTML parser"""
         try:
             logger.info(f"Scraping with requests: {search_url}")
             
-            # Add more realistic headers
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'ja,en-US;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Cache-Control': 'max-age=0',
-                'Referer': 'https://jp.mercari.com/'
-            }
-            
-            response = self.session.get(search_url, params=params, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response URL: {response.url}")
-            
-            return self._parse_mercari_html(response.text)
+            html_content = self._cached_get(search_url, params=params, headers=SEARCH_HEADERS, timeout=15)
+            return self._parse_mercari_html(html_content)
             
         except Exception as e:
             logger.error(f"Requests scraping error: {e}")
             return []
     
+    def _cached_get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                    timeout: float = 15) -> str:
+        """
+        Get a page body through the HTTP cache
+        Fresh entries skip the network, stale ones are revalidated with a conditional GET
+        """
+        cached = self.http_cache.lookup(url, params) if self.http_cache else None
+        if cached and self.http_cache.is_fresh(cached):
+            logger.info(f"Cache hit for {cached['url']}")
+            return cached["text"]
+        
+        request_headers = dict(headers or {})
+        if cached:
+            request_headers.update(self.http_cache.conditional_headers(cached))
+        
+        response = self._rate_limited_get(url, params=params, headers=request_headers, timeout=timeout)
+        if cached and response.status_code == 304:
+            logger.info(f"Not modified: {cached['url']}")
+            self.http_cache.revalidated(cached, response.headers)
+            return cached["text"]
+        
+        response.raise_for_status()
+        logger.info(f"Response status: {response.status_code}")
+        logger.info(f"Response URL: {response.url}")
+        if self.http_cache and response.status_code == 200:
+            self.http_cache.store(url, params, response.headers, response.text)
+        self._archive_page(response.url, response.text, response.status_code)
+        return response.text
+    
+    def _archive_page(self, url: str, html: str, status: int = 200):
+        """Keep a raw copy of a fetched page; archiving problems never fail a scrape"""
+        if not self.page_archive or not html:
+            return
+        try:
+            page_type = 'detail' if '/item/' in url else 'search'
+            self.page_archive.store(url, html, page_type=page_type, status=status)
+        except Exception as e:
+            logger.warning(f"Could not archive {url}: {e}")
+    
+    def _rate_limited_get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the session after taking a rate-limit token, reporting the outcome back"""
+        host = host_of(url)
+        self.rate_limiter.acquire(host)
+        start = time.time()
+        try:
+            response = self.session.get(url, **kwargs)
+        except Exception:
+            self.rate_limiter.record(host, latency=time.time() - start, error=True)
+            raise
+        self.rate_limiter.record(
+            host,
+            status=response.status_code,
+            latency=time.time() - start,
+            retry_after=parse_retry_after(response.headers.get('Retry-After'))
+        )
+        return response
+    
+    def _rate_limited_driver_get(self, driver, url: str):
+        """Load a page in a Selenium driver after taking a rate-limit token"""
+        host = host_of(url)
+        self.rate_limiter.acquire(host)
+        try:
+            driver.get(url)
+        except Exception:
+            self.rate_limiter.record(host, error=True)
+            raise
+        # Selenium exposes no status code and its load time includes rendering, so report plain success
+        self.rate_limiter.record(host)
+    
     def _parse_mercari_html(self, html_content: str) -> List[Dict]:
         """Parse Mercari HTML and extract product information with images"""
-        products = []
-        soup = BeautifulSoup(html_content, 'html.parser')
+        return list(self._iter_mercari_html(html_content))
+    
+    def _iter_mercari_html(self, html_content: str) -> Iterator[Dict]:
+        """Yield products from Mercari HTML as each one is extracted"""
+        # Embedded page JSON carries every field of the page; the DOM walk is the fallback
+        products = self._parse_structured_products(html_content, limit=15)
+        if products:
+            logger.info(f"Extracted {len(products)} products from embedded page JSON")
+            yield from products
+            return
+        
+        soup = self.parser.parse(html_content)
         
         # Comprehensive list of selectors for Mercari Japan product items
         product_selectors = [
@@ -253,8 +544,9 @@ class MercariScraper:
         product_elements = []
         used_selector = None
         
-        for selector in product_selectors:
+        for selector in self.selector_stats.ordered('search', 'item', product_selectors):
             product_elements = soup.select(selector)
+            self.selector_stats.record('search', 'item', selector, bool(product_elements))
             if product_elements:
                 logger.info(f"Found {len(product_elements)} products using selector: {selector}")
                 used_selector = selector
@@ -265,7 +557,7 @@ class MercariScraper:
             logger.warning("No product elements found with standard selectors, trying fallback methods")
             
             # Look for any links that contain /item/ in href
-            item_links = soup.find_all('a', href=re.compile(r'/item/'))
+            item_links = soup.find_links(r'/item/')
             if item_links:
                 logger.info(f"Found {len(item_links)} item links, using parent elements")
                 product_elements = [link.parent for link in item_links[:20]]  # Limit to 20
@@ -273,27 +565,59 @@ class MercariScraper:
             
             # If still no elements, try to find any div with price-like content
             if not product_elements:
-                price_elements = soup.find_all(text=re.compile(r'¥[\d,]+'))
+                price_elements = soup.find_text_parents(r'¥[\d,]+')
                 if price_elements:
                     logger.info(f"Found {len(price_elements)} price elements, using parent elements")
-                    product_elements = [elem.parent for elem in price_elements[:20]]
+                    product_elements = price_elements[:20]
                     used_selector = "fallback-price-elements"
         
         if not product_elements:
             logger.warning("No product elements found with any method")
-            return []
+            return
         
         # Extract products from found elements
+        count = 0
         for element in product_elements[:15]:  # Limit to first 15 products
             try:
                 product = self._extract_product_from_element(element, used_selector)
-                if product:
-                    products.append(product)
             except Exception as e:
                 logger.error(f"Error extracting product: {e}")
                 continue
+            if product:
+                count += 1
+                yield product
+        
+        logger.info(f"Successfully extracted {count} products from {len(product_elements)} elements")
+        self.selector_stats.maybe_save()
+    
+    def _parse_structured_products(self, html_content: str, limit: Optional[int] = None) -> List[Dict]:
+        """Extract products from JSON-LD or hydration payloads, filling the same defaults as the DOM path"""
+        try:
+            raw_products = extract_structured_products(html_content, self.base_url, limit=limit)
+        except Exception as e:
+            logger.error(f"Error extracting structured data: {e}")
+            return []
         
-        logger.info(f"Successfully extracted {len(products)} products from {len(product_elements)} elements")
+        products = []
+        for raw in raw_products:
+            image_url = raw["image_url"]
+            if image_url and self._is_valid_mercari_image_url(image_url):
+                image_url = self._clean_image_url(image_url)
+            else:
+                image_url = self._get_placeholder_image_url()
+            condition = raw["condition"] or "good"
+            products.append({
+                "id": raw["id"] or f"mercari_{random.randint(1000, 9999)}",
+                "name": raw["name"],
+                "price": raw["price"],
+                "condition": condition,
+                "seller_rating": raw["seller_rating"] or 4.5,
+                "category": raw["category"] or "Electronics",
+                "brand": raw["brand"] or "Unknown",
+                "image_url": image_url,
+                "url": raw["url"],
+                "description": raw["description"] or f"{raw['name']} - {condition} condition"
+            })
         return products
     
     def _extract_product_from_element(self, element, used_selector: str = None) -> Optional[Dict]:
@@ -340,6 +664,19 @@ class MercariScraper:
             logger.error(f"Error extracting product from element: {e}")
             return None
     
+    def _select_value(self, element, page_type: str, field: str, selectors: List[str], extract):
+        """
+        Try selectors in learned order and return the first value extract() accepts
+        Every attempt is recorded so the winning selector is tried first next time
+        """
+        for selector in self.selector_stats.ordered(page_type, field, selectors):
+            found = element.select_one(selector)
+            value = extract(found) if found is not None else None
+            self.selector_stats.record(page_type, field, selector, value is not None)
+            if value is not None:
+                return value
+        return None
+    
     def _extract_product_id(self, element) -> Optional[str]:
         """Extract product ID from element"""
         # Try multiple selectors for product ID
@@ -353,25 +690,28 @@ class MercariScraper:
             '[data-testid*="item-id"]'
         ]
         
-        for selector in id_selectors:
-            id_element = element.select_one(selector)
-            if id_element:
-                # Extract ID from href or data attribute
-                href = id_element.get('href', '')
-                if '/item/' in href:
-                    item_id = href.split('/item/')[-1].split('?')[0].split('#')[0]
-                    if item_id and item_id != 'item':
-                        return item_id
-                
-                # Try data attributes
-                data_id = id_element.get('data-item-id') or id_element.get('data-testid')
-                if data_id:
-                    return data_id
-                
-                # Try text content
-                text_id = id_element.text.strip()
-                if text_id and text_id.isalnum():
-                    return text_id
+        def id_from(id_element) -> Optional[str]:
+            # Extract ID from href or data attribute
+            href = id_element.get('href', '')
+            if '/item/' in href:
+                item_id = href.split('/item/')[-1].split('?')[0].split('#')[0]
+                if item_id and item_id != 'item':
+                    return item_id
+            
+            # Try data attributes
+            data_id = id_element.get('data-item-id') or id_element.get('data-testid')
+            if data_id:
+                return data_id
+            
+            # Try text content
+            text_id = id_element.text.strip()
+            if text_id and text_id.isalnum():
+                return text_id
+            return None
+        
+        product_id = self._select_value(element, 'search', 'id', id_selectors, id_from)
+        if product_id:
+            return product_id
         
         # Fallback: generate ID from element attributes
         element_id = element.get('id') or element.get('data-testid')
@@ -397,16 +737,18 @@ class MercariScraper:
             'div[class*="name"]'
         ]
         
-        for selector in name_selectors:
-            name_element = element.select_one(selector)
-            if name_element:
-                name_text = name_element.text.strip()
-                if name_text and len(name_text) > 2 and len(name_text) < 200:
-                    return name_text
+        def name_from(name_element) -> Optional[str]:
+            name_text = name_element.text.strip()
+            if name_text and len(name_text) > 2 and len(name_text) < 200:
+                return name_text
+            return None
+        
+        name = self._select_value(element, 'search', 'name', name_selectors, name_from)
+        if name:
+            return name
         
         # Fallback: look for any text that might be a product name
-        text_elements = element.find_all(text=True, recursive=True)
-        for text in text_elements:
+        for text in element.strings():
             text = text.strip()
             if text and len(text) > 5 and len(text) < 100 and not text.isdigit() and '¥' not in text:
                 return text
@@ -427,14 +769,9 @@ class MercariScraper:
             'div[class*="price"]'
         ]
         
-        for selector in price_selectors:
-            price_element = element.select_one(selector)
-            if price_element:
-                price_text = price_element.text.strip()
-                # Extract numeric value from price text
-                price_match = re.search(r'[\d,]+', price_text.replace('¥', '').replace(',', ''))
-                if price_match:
-                    return int(price_match.group().replace(',', ''))
+        price = self._select_value(element, 'search', 'price', price_selectors, self._price_from_element)
+        if price is not None:
+            return price
         
         # Fallback: search for price pattern in all text
         all_text = element.get_text()
@@ -448,6 +785,15 @@ class MercariScraper:
         
         return None
     
+    def _price_from_element(self, price_element) -> Optional[int]:
+        """Parse a yen price from an element's text"""
+        price_text = price_element.text.strip()
+        # Extract numeric value from price text
+        price_match = re.search(r'[\d,]+', price_text.replace('¥', '').replace(',', ''))
+        if price_match:
+            return int(price_match.group().replace(',', ''))
+        return None
+    
     def _extract_image_url(self, element) -> Optional[str]:
         """Extract real image URL from element - this is the key method"""
         # Try multiple selectors for images
@@ -462,23 +808,26 @@ class MercariScraper:
             'img[data-src]'
         ]
         
-        for selector in img_selectors:
-            img_element = element.select_one(selector)
-            if img_element:
-                # Try different attributes for image URL
-                image_url = (
-                    img_element.get('src') or 
-                    img_element.get('data-src') or 
-                    img_element.get('data-lazy-src') or
-                    img_element.get('data-original')
-                )
-                
-                if image_url:
-                    # Clean and validate the URL
-                    image_url = self._clean_image_url(image_url)
-                    if self._is_valid_mercari_image_url(image_url):
-                        logger.info(f"Found valid Mercari image URL: {image_url}")
-                        return image_url
+        def image_from(img_element) -> Optional[str]:
+            # Try different attributes for image URL
+            image_url = (
+                img_element.get('src') or 
+                img_element.get('data-src') or 
+                img_element.get('data-lazy-src') or
+                img_element.get('data-original')
+            )
+            
+            if image_url:
+                # Clean and validate the URL
+                image_url = self._clean_image_url(image_url)
+                if self._is_valid_mercari_image_url(image_url):
+                    return image_url
+            return None
+        
+        image_url = self._select_value(element, 'search', 'image', img_selectors, image_from)
+        if image_url:
+            logger.info(f"Found valid Mercari image URL: {image_url}")
+            return image_url
         
         # If no Mercari image found, return a placeholder
         logger.warning("No valid Mercari image URL found, using placeholder")
@@ -534,22 +883,21 @@ class MercariScraper:
             '.item-condition'
         ]
         
-        for selector in condition_selectors:
-            condition_element = element.select_one(selector)
-            if condition_element:
-                condition_text = condition_element.text.strip().lower()
-                if 'new' in condition_text:
-                    return 'new'
-                elif 'like' in condition_text:
-                    return 'like_new'
-                elif 'very' in condition_text:
-                    return 'very_good'
-                elif 'good' in condition_text:
-                    return 'good'
-                elif 'acceptable' in condition_text:
-                    return 'acceptable'
-        
-        return 'good'
+        def condition_from(condition_element) -> Optional[str]:
+            condition_text = condition_element.text.strip().lower()
+            if 'new' in condition_text:
+                return 'new'
+            elif 'like' in condition_text:
+                return 'like_new'
+            elif 'very' in condition_text:
+                return 'very_good'
+            elif 'good' in condition_text:
+                return 'good'
+            elif 'acceptable' in condition_text:
+                return 'acceptable'
+            return None
+        
+        return self._select_value(element, 'search', 'condition', condition_selectors, condition_from) or 'good'
     
     def _extract_seller_rating(self, element) -> float:
         """Extract seller rating from element"""
@@ -559,15 +907,15 @@ class MercariScraper:
             '.rating'
         ]
         
-        for selector in rating_selectors:
-            rating_element = element.select_one(selector)
-            if rating_element:
-                rating_text = rating_element.text.strip()
-                rating_match = re.search(r'[\d.]+', rating_text)
-                if rating_match:
-                    return float(rating_match.group())
+        def rating_from(rating_element) -> Optional[float]:
+            rating_text = rating_element.text.strip()
+            rating_match = re.search(r'[\d.]+', rating_text)
+            if rating_match:
+                return float(rating_match.group())
+            return None
         
-        return 4.5
+        rating = self._select_value(element, 'search', 'seller_rating', rating_selectors, rating_from)
+        return rating if rating is not None else 4.5
     
     def _extract_category(self, element) -> str:
         """Extract product category from element"""
@@ -577,12 +925,8 @@ class MercariScraper:
             '.item-category'
         ]
         
-        for selector in category_selectors:
-            category_element = element.select_one(selector)
-            if category_element:
-                return category_element.text.strip()
-        
-        return "Electronics"
+        category = self._select_value(element, 'search', 'category', category_selectors, lambda e: e.text.strip())
+        return category if category is not None else "Electronics"
     
     def _extract_brand(self, element) -> str:
         """Extract product brand from element"""
@@ -592,12 +936,8 @@ class MercariScraper:
             '.item-brand'
         ]
         
-        for selector in brand_selectors:
-            brand_element = element.select_one(selector)
-            if brand_element:
-                return brand_element.text.strip()
-        
-        return "Unknown"
+        brand = self._select_value(element, 'search', 'brand', brand_selectors, lambda e: e.text.strip())
+        return brand if brand is not None else "Unknown"
     
     def _get_sample_products_with_mercari_images(self, query: str) -> List[Dict]:
         """Return sample products with Mercari-style image URLs"""
@@ -668,10 +1008,11 @@ class MercariScraper:
             # Try to scrape the actual product page
             product_url = f"{self.base_url}/item/{product_id}"
             
-            if self.use_selenium and self.driver:
-                return self._get_product_details_with_selenium(product_url)
-            else:
-                return self._get_product_details_with_requests(product_url)
+            if self.use_selenium and self.driver_pool.available:
+                details = self._get_product_details_with_selenium(product_url)
+                if self.driver_pool.available:
+                    return details
+            return self._get_product_details_with_requests(product_url)
                 
         except Exception as e:
             logger.error(f"Error getting product details: {e}")
@@ -680,11 +1021,14 @@ class MercariScraper:
     def _get_product_details_with_selenium(self, product_url: str) -> Optional[Dict]:
         """Get product details using Selenium"""
         try:
-            self.driver.get(product_url)
-            wait = WebDriverWait(self.driver, 10)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="item-detail"]')))
+            with self.driver_pool.lease() as driver:
+                self._rate_limited_driver_get(driver, product_url)
+                if not self.readiness.wait_for_any(driver, DETAIL_READY_SELECTORS, site="detail",
+                                                   deadline=self.ready_deadlines["detail"]):
+                    return None
+                page_source = driver.page_source
             
-            page_source = self.driver.page_source
+            self._archive_page(product_url, page_source)
             return self._parse_product_detail_page(page_source, product_url)
             
         except Exception as e:
@@ -694,10 +1038,8 @@ class MercariScraper:
     def _get_product_details_with_requests(self, product_url: str) -> Optional[Dict]:
         """Get product details using requests"""
         try:
-            response = self.session.get(product_url, timeout=10)
-            response.raise_for_status()
-            
-            return self._parse_product_detail_page(response.text, product_url)
+            html_content = self._cached_get(product_url, timeout=10)
+            return self._parse_product_detail_page(html_content, product_url)
             
         except Exception as e:
             logger.error(f"Requests product detail error: {e}")
@@ -705,13 +1047,19 @@ class MercariScraper:
     
     def _parse_product_detail_page(self, html_content: str, product_url: str) -> Optional[Dict]:
         """Parse product detail page HTML"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        product_id = product_url.split('/')[-1]
+        for product in self._parse_structured_products(html_content):
+            if product["id"] == product_id:
+                return product
+        
+        soup = self.parser.parse(html_content)
         
         # Extract detailed information
         name = self._extract_detail_name(soup)
         price = self._extract_detail_price(soup)
         image_url = self._extract_detail_image(soup)
         description = self._extract_detail_description(soup)
+        self.selector_stats.maybe_save()
         
         if not name or not price:
             return None
@@ -738,12 +1086,7 @@ class MercariScraper:
             '.product-title'
         ]
         
-        for selector in name_selectors:
-            element = soup.select_one(selector)
-            if element:
-                return element.text.strip()
-        
-        return None
+        return self._select_value(soup, 'detail', 'name', name_selectors, lambda e: e.text.strip())
     
     def _extract_detail_price(self, soup) -> Optional[int]:
         """Extract price from detail page"""
@@ -753,15 +1096,7 @@ class MercariScraper:
             '.item-price'
         ]
         
-        for selector in price_selectors:
-            element = soup.select_one(selector)
-            if element:
-                price_text = element.text.strip()
-                price_match = re.search(r'[\d,]+', price_text.replace('¥', '').replace(',', ''))
-                if price_match:
-                    return int(price_match.group().replace(',', ''))
-        
-        return None
+        return self._select_value(soup, 'detail', 'price', price_selectors, self._price_from_element)
     
     def _extract_detail_image(self, soup) -> Optional[str]:
         """Extract main image from detail page"""
@@ -772,14 +1107,11 @@ class MercariScraper:
             '.product-image img'
         ]
         
-        for selector in img_selectors:
-            img_element = soup.select_one(selector)
-            if img_element:
-                image_url = img_element.get('src') or img_element.get('data-src')
-                if image_url:
-                    return self._clean_image_url(image_url)
+        def image_from(img_element) -> Optional[str]:
+            image_url = img_element.get('src') or img_element.get('data-src')
+            return self._clean_image_url(image_url) if image_url else None
         
-        return None
+        return self._select_value(soup, 'detail', 'image', img_selectors, image_from)
     
     def _extract_detail_description(self, soup) -> Optional[str]:
         """Extract description from detail page"""
@@ -789,12 +1121,7 @@ class MercariScraper:
             '.item-description'
         ]
         
-        for selector in desc_selectors:
-            element = soup.select_one(selector)
-            if element:
-                return element.text.strip()
-        
-        return None
+        return self._select_value(soup, 'detail', 'description', desc_selectors, lambda e: e.text.strip())
     
     def _get_fallback_product_details(self, product_id: str) -> Dict:
         """Get fallback product details when scraping fails"""
@@ -813,11 +1140,13 @@ class MercariScraper:
     
     def close(self):
         """Clean up resources"""
-        if hasattr(self, 'session'):
+        if hasattr(self, 'selector_stats'):
+            self.selector_stats.save()
+        
+        if hasattr(self, 'fetch_engine'):
+            self.fetch_engine.close()
+        elif hasattr(self, 'session'):
             self.session.close()
         
-        if self.driver:
-            try:
-                self.driver.quit()
-            except Exception as e:
-                logger.error(f"Error closing WebDriver: {e}") 
\ No newline at end of file
+        if getattr(self, 'driver_pool', None):
+            self.driver_pool.close() 
\ No newline at end of file
@@ -0,0 +1,259 @@
+"""
+Raw page archive for scrapes
+Keeps every fetched HTML page compressed (zstd, or zlib when zstandard is not installed) and
+content-addressed so identical pages are stored once, with a SQLite index by URL and fetch time.
+Archived pages can be re-parsed in bulk without touching Mercari:
+
+    python -m core.page_archive reparse --since 2024-05-01 --workers 8 --output products.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+DEFAULT_ARCHIVE_PATH = os.path.join(".scraper_state", "page_archive")
+
+class PageArchive:
+    """Content-addressed store of compressed pages plus a URL / fetch-time index"""
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_PATH, compression_level: int = 10):
+        self.root = root
+        self.compression_level = compression_level
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite"), timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, page_type TEXT, status INTEGER, "
+                "fetched_at REAL, digest TEXT, size INTEGER)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pages_url ON pages (url)")
+
+    def _object_path(self, digest: str, extension: str) -> str:
+        """Path of a stored object, fanned out by the first two hex digits"""
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.{extension}")
+
+    def _compress(self, data: bytes):
+        """Compress with zstd when available, returning (bytes, extension)"""
+        if ZSTD_AVAILABLE:
+            return zstandard.ZstdCompressor(level=self.compression_level).compress(data), "zst"
+        return zlib.compress(data, min(self.compression_level, 9)), "zlib"
+
+    def store(self, url: str, html: str, page_type: str = "search", status: int = 200,
+              fetched_at: Optional[float] = None) -> str:
+        """Archive a page and return its content digest; identical pages share one object"""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        if not self._find_object(digest):
+            compressed, extension = self._compress(data)
+            path = self._object_path(digest, extension)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pages (url, page_type, status, fetched_at, digest, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, page_type, status, fetched_at or time.time(), digest, len(data))
+            )
+        return digest
+
+    def _find_object(self, digest: str) -> Optional[str]:
+        """Get the path of a stored object in either format"""
+        for extension in ("zst", "zlib"):
+            path = self._object_path(digest, extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def load(self, digest: str) -> Optional[str]:
+        """Get the HTML stored under a digest"""
+        path = self._find_object(digest)
+        if not path:
+            return None
+        with open(path, "rb") as f:
+            compressed = f.read()
+        if path.endswith(".zst"):
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is required to read zstd-compressed archive objects")
+            data = zstandard.ZstdDecompressor().decompress(compressed)
+        else:
+            data = zlib.decompress(compressed)
+        return data.decode("utf-8")
+
+    def iter_pages(self, since: Optional[float] = None, until: Optional[float] = None,
+                   page_type: Optional[str] = None, url_contains: Optional[str] = None) -> Iterator[Dict]:
+        """Yield index rows in fetch order, optionally filtered by time range, page type and URL"""
+        query = "SELECT url, page_type, status, fetched_at, digest, size FROM pages WHERE 1 = 1"
+        args: List = []
+        if since is not None:
+            query += " AND fetched_at >= ?"
+            args.append(since)
+        if until is not None:
+            query += " AND fetched_at < ?"
+            args.append(until)
+        if page_type:
+            query += " AND page_type = ?"
+            args.append(page_type)
+        if url_contains:
+            query += " AND url LIKE ?"
+            args.append(f"%{url_contains}%")
+        query += " ORDER BY fetched_at"
+
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        for row in rows:
+            yield dict(zip(("url", "page_type", "status", "fetched_at", "digest", "size"), row))
+
+    def get_stats(self) -> Dict:
+        """Page count, distinct objects and raw vs on-disk bytes"""
+        with self._lock:
+            pages, objects, raw_bytes = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT digest), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        disk_bytes = 0
+        for directory, _, files in os.walk(self.objects_dir):
+            disk_bytes += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return {"pages": pages, "objects": objects, "raw_bytes": raw_bytes, "disk_bytes": disk_bytes}
+
+    def close(self):
+        """Close the index database"""
+        with self._lock:
+            self._conn.close()
+
+_shared_archive = None
+_shared_lock = threading.Lock()
+
+def get_page_archive() -> Optional[PageArchive]:
+    """
+    Get the process-wide page archive
+    SCRAPER_PAGE_ARCHIVE sets the archive directory; set it to 'off' to stop archiving
+    """
+    global _shared_archive
+    root = os.environ.get("SCRAPER_PAGE_ARCHIVE", DEFAULT_ARCHIVE_PATH)
+    if root.lower() == "off":
+        return None
+    with _shared_lock:
+        if _shared_archive is None:
+            try:
+                _shared_archive = PageArchive(root=root)
+            except Exception as e:
+                logger.warning(f"Page archive disabled, could not open {root}: {e}")
+                return None
+        return _shared_archive
+
+# Per-process state for reparse workers
+_worker_archive = None
+_worker_scraper = None
+
+def _init_reparse_worker(root: str):
+    """Open the archive and a network-free scraper once per worker process"""
+    global _worker_archive, _worker_scraper
+    # Re-parsing must not write back into the archive, the HTTP cache or the live selector stats
+    os.environ["SCRAPER_PAGE_ARCHIVE"] = "off"
+    os.environ["SCRAPER_HTTP_CACHE"] = "off"
+    from core.mercari_scraper import MercariScraper
+    from core.selector_stats import SelectorStats
+
+    logging.disable(logging.WARNING)
+    _worker_archive = PageArchive(root=root)
+    _worker_scraper = MercariScraper(use_selenium=False)
+    _worker_scraper.selector_stats = SelectorStats()
+
+def _reparse_page(page: Dict) -> Dict:
+    """Parse one archived page with the current extraction code"""
+    try:
+        html = _worker_archive.load(page["digest"])
+        if html is None:
+            return {**page, "products": [], "error": "object missing"}
+        if page["page_type"] == "detail":
+            product = _worker_scraper._parse_product_detail_page(html, page["url"])
+            products = [product] if product else []
+        else:
+            products = _worker_scraper._parse_mercari_html(html)
+        return {**page, "products": products, "error": None}
+    except Exception as e:
+        return {**page, "products": [], "error": str(e)}
+
+def reparse(root: str, pages: List[Dict], workers: Optional[int] = None) -> Iterator[Dict]:
+    """Re-run extraction over archived pages in a process pool, yielding results in input order"""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_reparse_worker, initargs=(root,)) as pool:
+        yield from pool.map(_reparse_page, pages, chunksize=16)
+
+def _parse_date(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO date or datetime into a timestamp"""
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Raw page archive tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reparse_parser = subparsers.add_parser("reparse", help="Re-extract products from archived pages")
+    reparse_parser.add_argument("--archive", default=os.environ.get("SCRAPER_PAGE_ARCHIVE", DEFAULT_ARCHIVE_PATH))
+    reparse_parser.add_argument("--since", help="ISO date, inclusive")
+    reparse_parser.add_argument("--until", help="ISO date, exclusive")
+    reparse_parser.add_argument("--page-type", choices=["search", "detail"])
+    reparse_parser.add_argument("--url-contains")
+    reparse_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    reparse_parser.add_argument("--output", help="JSONL file to write; defaults to stdout")
+
+    stats_parser = subparsers.add_parser("stats", help="Show archive size and deduplication")
+    stats_parser.add_argument("--archive", default=os.environ.get("SCRAPER_PAGE_ARCHIVE", DEFAULT_ARCHIVE_PATH))
+
+    args = parser.parse_args(argv)
+    archive = PageArchive(root=args.archive)
+
+    if args.command == "stats":
+        print(json.dumps(archive.get_stats(), indent=2))
+        return 0
+
+    pages = list(archive.iter_pages(_parse_date(args.since), _parse_date(args.until),
+                                    args.page_type, args.url_contains))
+    archive.close()
+    print(f"Re-parsing {len(pages)} archived pages with {args.workers} workers", file=sys.stderr)
+
+    start = time.time()
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    product_count = error_count = 0
+    try:
+        for result in reparse(args.archive, pages, args.workers):
+            product_count += len(result["products"])
+            error_count += bool(result["error"])
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if args.output:
+            output.close()
+
+    elapsed = time.time() - start
+    print(f"Extracted {product_count} products from {len(pages)} pages in {elapsed:.1f}s "
+          f"({error_count} errors)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Page readiness waits for Selenium
+Polls every candidate selector together under one total deadline and returns the first that
+matches, so a page none of them fits costs one deadline instead of one timeout per selector.
+Wait times, matches and timeouts are counted per call site
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# One round trip per poll: the first selector, in priority order, with a match on the page
+_FIRST_PRESENT_JS = """
+for (const selector of arguments[0]) {
+    try {
+        if (document.querySelector(selector)) return selector;
+    } catch (e) {}
+}
+return null;
+"""
+
+def first_present(driver, selectors: List[str]) -> Optional[str]:
+    """The first selector with a matching element, checking all of them in one pass"""
+    try:
+        matched = driver.execute_script(_FIRST_PRESENT_JS, list(selectors))
+        return matched if matched in selectors else None
+    except WebDriverException:
+        # Scripts disabled or the page is mid-navigation; fall back to one lookup per selector
+        for selector in selectors:
+            if driver.find_elements(By.CSS_SELECTOR, selector):
+                return selector
+        return None
+
+class ReadinessWaiter:
+    """Deadline-bounded race between readiness selectors, with per-site wait metrics"""
+
+    def __init__(self, default_deadline: float = 15.0, poll_interval: float = 0.25):
+        self.default_deadline = default_deadline
+        self.poll_interval = poll_interval
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def wait_for_any(self, driver, selectors: List[str], site: str = "default",
+                     deadline: Optional[float] = None, fallback_selectors: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Wait until any selector matches, returning it, or None once the deadline has passed
+        fallback_selectors, generic ones that page chrome or skeletons can also match, are checked
+        once after the specific selectors miss rather than raced against them
+        The whole wait is bounded by the deadline plus two polls, however many selectors there are
+        """
+        deadline = self.default_deadline if deadline is None else deadline
+        started = time.monotonic()
+        fallback = False
+        try:
+            matched = WebDriverWait(driver, deadline, poll_frequency=self.poll_interval,
+                                    ignored_exceptions=(WebDriverException,)).until(
+                lambda d: first_present(d, selectors)
+            )
+        except TimeoutException:
+            matched = None
+            if fallback_selectors:
+                try:
+                    matched = first_present(driver, fallback_selectors)
+                except WebDriverException:
+                    matched = None
+                fallback = matched is not None
+        elapsed = time.monotonic() - started
+        self._record(site, matched, elapsed, fallback)
+
+        if matched and not fallback:
+            logger.info(f"{site}: ready after {elapsed:.2f}s with selector {matched}")
+        elif matched:
+            logger.warning(f"{site}: no specific selector matched within {deadline:.1f}s, "
+                           f"fallback selector {matched} did")
+        else:
+            logger.warning(f"{site}: no readiness selector matched within {deadline:.1f}s")
+        return matched
+
+    def _record(self, site: str, matched: Optional[str], elapsed: float, fallback: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(site, {
+                "waits": 0, "timeouts": 0, "fallbacks": 0, "total_seconds": 0.0, "max_seconds": 0.0, "matches": {}
+            })
+            stats["waits"] += 1
+            stats["fallbacks"] += fallback
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            if matched:
+                stats["matches"][matched] = stats["matches"].get(matched, 0) + 1
+            else:
+                stats["timeouts"] += 1
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-site wait count, timeouts, fallback matches, total and longest wait, and which selectors matched"""
+        with self._lock:
+            return {site: {**stats, "matches": dict(stats["matches"])} for site, stats in self._stats.items()}
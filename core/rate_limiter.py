@@ -0,0 +1,191 @@
+"""
+Shared adaptive rate limiter for all scrapers
+Per-host token buckets whose rate adapts AIMD-style to latency and 429/503 responses,
+optionally shared across processes through a SQLite file
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean the server wants us to slow down
+THROTTLE_STATUSES = {429, 503}
+
+def host_of(url: str) -> str:
+    """Get the bucket key for a URL"""
+    return urlsplit(url).netloc or url
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds"""
+    try:
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+class _MemoryStore:
+    """Bucket state kept in this process"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def update(self, host: str, default: Dict, fn: Callable[[Dict], float]) -> float:
+        """Apply fn to the host's state atomically and return its result"""
+        with self._lock:
+            state = self._buckets.setdefault(host, dict(default))
+            return fn(state)
+
+    def get(self, host: str) -> Optional[Dict]:
+        """Get a copy of the host's state"""
+        with self._lock:
+            state = self._buckets.get(host)
+            return dict(state) if state else None
+
+class _SQLiteStore:
+    """Bucket state in a SQLite file, locked with BEGIN IMMEDIATE so several processes can share it"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                "host TEXT PRIMARY KEY, rate REAL, tokens REAL, updated_at REAL)"
+            )
+
+    def update(self, host: str, default: Dict, fn: Callable[[Dict], float]) -> float:
+        """Apply fn to the host's row inside an exclusive transaction and return its result"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT rate, tokens, updated_at FROM rate_buckets WHERE host = ?", (host,)
+                ).fetchone()
+                state = dict(zip(("rate", "tokens", "updated_at"), row)) if row else dict(default)
+                result = fn(state)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (host, rate, tokens, updated_at) VALUES (?, ?, ?, ?)",
+                    (host, state["rate"], state["tokens"], state["updated_at"])
+                )
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, host: str) -> Optional[Dict]:
+        """Get the host's stored state"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rate, tokens, updated_at FROM rate_buckets WHERE host = ?", (host,)
+            ).fetchone()
+        return dict(zip(("rate", "tokens", "updated_at"), row)) if row else None
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token buckets with additive-increase / multiplicative-decrease rate control
+    Callers reserve a token before each request and report the outcome afterwards
+    """
+
+    def __init__(self, initial_rate: float = 1.0, min_rate: float = 0.1, max_rate: float = 5.0,
+                 burst: float = 2.0, additive_increase: float = 0.05, multiplicative_decrease: float = 0.5,
+                 latency_target: float = 3.0, state_path: Optional[str] = None):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.latency_target = latency_target
+        self.store = _SQLiteStore(state_path) if state_path else _MemoryStore()
+
+    def _default_state(self) -> Dict:
+        """State for a host seen for the first time"""
+        return {"rate": self.initial_rate, "tokens": self.burst, "updated_at": time.time()}
+
+    def _refill(self, state: Dict, now: float):
+        """Add tokens earned since the last update"""
+        elapsed = max(0.0, now - state["updated_at"])
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * state["rate"])
+        state["updated_at"] = now
+
+    def reserve(self, host: str) -> float:
+        """
+        Take a token for the host and return how long the caller must wait before sending
+        Tokens may go negative, which queues later callers behind earlier reservations
+        """
+        def take(state: Dict) -> float:
+            self._refill(state, time.time())
+            state["tokens"] -= 1
+            return 0.0 if state["tokens"] >= 0 else -state["tokens"] / state["rate"]
+
+        return self.store.update(host, self._default_state(), take)
+
+    def acquire(self, host: str) -> float:
+        """Block until a request to the host may be sent; returns the time waited"""
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, host: str) -> float:
+        """Async version of acquire"""
+        wait = self.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record(self, host: str, status: Optional[int] = None, latency: Optional[float] = None,
+               retry_after: Optional[float] = None, error: bool = False) -> float:
+        """
+        Adjust the host's rate from a request outcome
+        Throttling responses, network errors and slow responses cut the rate; healthy responses raise it slowly
+        """
+        throttled = error or status in THROTTLE_STATUSES
+
+        def adjust(state: Dict) -> float:
+            self._refill(state, time.time())
+            if throttled:
+                state["rate"] = max(self.min_rate, state["rate"] * self.multiplicative_decrease)
+                # Honour Retry-After by pushing the bucket into debt
+                if retry_after:
+                    state["tokens"] = min(state["tokens"], -retry_after * state["rate"])
+            elif latency is not None and latency > self.latency_target:
+                state["rate"] = max(self.min_rate, state["rate"] * self.multiplicative_decrease)
+            else:
+                state["rate"] = min(self.max_rate, state["rate"] + self.additive_increase)
+            return state["rate"]
+
+        new_rate = self.store.update(host, self._default_state(), adjust)
+        if throttled:
+            logger.warning(f"Throttled by {host} ({status or 'error'}), rate lowered to {new_rate:.2f} req/s")
+        return new_rate
+
+    def get_rate(self, host: str) -> float:
+        """Get the current requests-per-second allowance for a host"""
+        state = self.store.get(host)
+        return state["rate"] if state else self.initial_rate
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """
+    Get the process-wide rate limiter used by every scraper
+    Set SCRAPER_RATE_LIMIT_DB to a file path to share buckets with other processes
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter(state_path=os.environ.get("SCRAPER_RATE_LIMIT_DB"))
+        return _shared_limiter
@@ -0,0 +1,143 @@
+"""
+Freshness-priority refresh scheduler
+Ranks recurring queries by how many unseen listings they have probably accumulated (observed
+churn times time since the last refresh), weighted by how often users search for them, and
+dispatches the most valuable ones within a global per-hour page budget
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEDULE_PATH = os.path.join(".scraper_state", "refresh_schedule.json")
+
+def match_demand(queries: List[str], query_counts: Dict[str, int]) -> Dict[str, int]:
+    """Attribute user searches to scheduled queries: every search containing a query counts for it"""
+    demand = {}
+    for query in queries:
+        needle = query.lower()
+        demand[query] = sum(count for text, count in query_counts.items() if needle in (text or "").lower())
+    return demand
+
+class RefreshScheduler:
+    """Per-query churn estimates and a shared page budget, persisted as JSON"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_SCHEDULE_PATH, pages_per_hour: int = 60,
+                 default_churn: float = 2.0, churn_smoothing: float = 0.3, min_interval: float = 600,
+                 max_staleness: float = 24 * 3600, default_pages: int = 5):
+        self.path = path
+        self.pages_per_hour = pages_per_hour
+        self.default_churn = default_churn  # New listings per hour assumed before a query has been observed
+        self.churn_smoothing = churn_smoothing  # Weight of the newest observation in the churn average
+        self.min_interval = min_interval  # Seconds before the same query may be refreshed again
+        self.max_staleness = max_staleness  # Age credited to queries that were never refreshed
+        self.default_pages = default_pages  # Cost assumed for a query never refreshed: the crawl's page limit
+        self._state = {"queries": {}, "fetches": []}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load persisted state if the file exists"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._state = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load refresh schedule from {self.path}: {e}")
+
+    def save(self):
+        """Write state to disk atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._state, ensure_ascii=False)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save refresh schedule to {self.path}: {e}")
+
+    def budget_remaining(self, now: Optional[float] = None) -> int:
+        """Pages that may still be fetched in the current one-hour window"""
+        now = now or time.time()
+        with self._lock:
+            self._state["fetches"] = [f for f in self._state["fetches"] if f[0] > now - 3600]
+            used = sum(pages for _, pages in self._state["fetches"])
+        return max(0, self.pages_per_hour - used)
+
+    def priority(self, query: str, demand: int = 0, now: Optional[float] = None) -> float:
+        """Expected unseen listings for a query, scaled up logarithmically by search demand"""
+        now = now or time.time()
+        with self._lock:
+            entry = self._state["queries"].get(query, {})
+        last_refresh = entry.get("last_refresh")
+        if last_refresh and now - last_refresh < self.min_interval:
+            return 0.0
+        age = min(now - last_refresh, self.max_staleness) if last_refresh else self.max_staleness
+        churn = entry.get("churn", self.default_churn)
+        return (1 + math.log1p(demand)) * churn * age / 3600
+
+    def plan(self, queries: List[str], demand: Optional[Dict[str, int]] = None,
+             now: Optional[float] = None) -> List[Dict]:
+        """
+        Pick the queries to refresh now, highest priority first, until the page budget is spent
+        Each entry has the query, its priority, its expected page cost and its page cap; the caps
+        hand budget left after the costs to the highest priorities, up to default_pages, and never
+        add up to more than the budget, so crawls that find more pages than last time stay within it
+        """
+        now = now or time.time()
+        demand = demand or {}
+        remaining = self.budget_remaining(now)
+
+        ranked = []
+        for query in queries:
+            score = self.priority(query, demand.get(query, 0), now)
+            if score > 0:
+                with self._lock:
+                    cost = self._state["queries"].get(query, {}).get("pages", self.default_pages)
+                ranked.append({"query": query, "priority": score, "cost": max(1, cost)})
+        ranked.sort(key=lambda item: item["priority"], reverse=True)
+
+        selected = []
+        for item in ranked:
+            if item["cost"] > remaining:
+                continue
+            selected.append(item)
+            remaining -= item["cost"]
+        for item in selected:
+            extra = min(remaining, max(0, self.default_pages - item["cost"]))
+            item["pages"] = item["cost"] + extra
+            remaining -= extra
+        return selected
+
+    def record_refresh(self, query: str, new_listings: int, pages_fetched: int, now: Optional[float] = None):
+        """Charge a refresh to the budget and update the query's churn estimate"""
+        now = now or time.time()
+        with self._lock:
+            entry = self._state["queries"].setdefault(query, {})
+            last_refresh = entry.get("last_refresh")
+            if last_refresh and now > last_refresh:
+                observed = new_listings / ((now - last_refresh) / 3600)
+                previous = entry.get("churn", self.default_churn)
+                entry["churn"] = previous + self.churn_smoothing * (observed - previous)
+            entry["last_refresh"] = now
+            entry["pages"] = pages_fetched
+            self._state["fetches"].append([now, pages_fetched])
+
+    def get_query_state(self, query: str) -> Optional[Dict]:
+        """Get a query's last refresh time, churn estimate and page cost"""
+        with self._lock:
+            entry = self._state["queries"].get(query)
+            return dict(entry) if entry else None
@@ -0,0 +1,112 @@
+"""
+Network request interception for Playwright scrapers
+Aborts heavy resources (images, fonts, media, CSS, analytics) that are not needed to read the DOM
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Resource types needed to render Mercari's client-side search results
+DEFAULT_ALLOWED_TYPES = {"document", "script", "xhr", "fetch"}
+
+# Third-party trackers that are blocked even when their resource type is allowed
+DEFAULT_BLOCKED_URL_PATTERNS = [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"googlesyndication\.com",
+    r"facebook\.(net|com)/tr",
+    r"connect\.facebook\.net",
+    r"analytics\.tiktok\.com",
+    r"bat\.bing\.com",
+    r"criteo\.(com|net)",
+    r"sentry\.io",
+    r"newrelic\.com|nr-data\.net"
+]
+
+# Rough transfer sizes used to estimate bytes saved, since aborted requests never report a size
+ESTIMATED_BYTES_BY_TYPE = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 50_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "other": 10_000
+}
+
+class ResourceBlocker:
+    """Route handler that aborts unwanted requests and counts what was saved"""
+
+    def __init__(self, allowed_types: Optional[Iterable[str]] = None,
+                 blocked_url_patterns: Optional[List[str]] = None):
+        self.allowed_types = set(allowed_types) if allowed_types is not None else set(DEFAULT_ALLOWED_TYPES)
+        patterns = blocked_url_patterns if blocked_url_patterns is not None else DEFAULT_BLOCKED_URL_PATTERNS
+        self._blocked_url_re = re.compile("|".join(patterns)) if patterns else None
+        self.totals = self._new_stats()
+        self._page_stats: Dict[int, Dict] = {}
+
+    def _new_stats(self) -> Dict:
+        """Create an empty counters dict"""
+        return {"allowed": 0, "blocked": {}, "estimated_bytes_saved": 0}
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """Decide whether a request should be aborted"""
+        if resource_type not in self.allowed_types:
+            return True
+        return bool(self._blocked_url_re and self._blocked_url_re.search(url))
+
+    async def attach(self, page) -> Dict:
+        """
+        Install the route handler on a page (or browser context)
+        Returns the live stats dict for that target
+        """
+        stats = self._new_stats()
+        self._page_stats[id(page)] = stats
+
+        async def handle(route):
+            request = route.request
+            if self.should_block(request.resource_type, request.url):
+                self._record_blocked(stats, request.resource_type)
+                await route.abort()
+            else:
+                stats["allowed"] += 1
+                self.totals["allowed"] += 1
+                await route.continue_()
+
+        await page.route("**/*", handle)
+        return stats
+
+    def _record_blocked(self, stats: Dict, resource_type: str):
+        """Update per-page and total counters for a blocked request"""
+        saved = ESTIMATED_BYTES_BY_TYPE.get(resource_type, ESTIMATED_BYTES_BY_TYPE["other"])
+        for target in (stats, self.totals):
+            target["blocked"][resource_type] = target["blocked"].get(resource_type, 0) + 1
+            target["estimated_bytes_saved"] += saved
+
+    def page_stats(self, page) -> Dict:
+        """Get the counters for a page since it was attached or last reset"""
+        return self._page_stats.get(id(page), self._new_stats())
+
+    def reset_page_stats(self, page) -> Dict:
+        """Return a page's counters and start counting from zero again"""
+        stats = self._page_stats.get(id(page))
+        if stats is None:
+            return self._new_stats()
+        snapshot = {
+            "allowed": stats["allowed"],
+            "blocked": dict(stats["blocked"]),
+            "estimated_bytes_saved": stats["estimated_bytes_saved"]
+        }
+        stats["allowed"] = 0
+        stats["blocked"] = {}
+        stats["estimated_bytes_saved"] = 0
+        return snapshot
+
+    def detach(self, page):
+        """Forget a page's counters once it is closed"""
+        self._page_stats.pop(id(page), None)
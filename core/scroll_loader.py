@@ -0,0 +1,75 @@
+"""
+Event-driven infinite-scroll loader for Playwright pages
+Scrolls and watches the item count with a MutationObserver inside the page, returning as soon as
+the target count is reached or growth stalls instead of sleeping for fixed intervals
+"""
+
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Runs entirely in the browser so the whole scroll session is a single round trip
+SCROLL_UNTIL_LOADED_JS = """
+async ({selector, maxItems, deadlineMs, stallMs}) => {
+    const start = performance.now();
+    const count = () => document.querySelectorAll(selector).length;
+    let items = count();
+    let scrolls = 0;
+
+    const waitForGrowth = (timeoutMs) => new Promise(resolve => {
+        const before = items;
+        let timer = null;
+        const observer = new MutationObserver(() => {
+            if (count() > before) {
+                clearTimeout(timer);
+                observer.disconnect();
+                resolve(true);
+            }
+        });
+        observer.observe(document.body, {childList: true, subtree: true});
+        timer = setTimeout(() => { observer.disconnect(); resolve(count() > before); }, timeoutMs);
+    });
+
+    while (true) {
+        if (maxItems && items >= maxItems) return {items, scrolls, elapsed_ms: performance.now() - start, reason: 'target'};
+        const remaining = deadlineMs - (performance.now() - start);
+        if (remaining <= 0) return {items, scrolls, elapsed_ms: performance.now() - start, reason: 'deadline'};
+
+        window.scrollTo(0, document.body.scrollHeight);
+        scrolls += 1;
+        const grew = await waitForGrowth(Math.min(stallMs, remaining));
+        items = count();
+        if (!grew) {
+            // A wait cut short by the deadline is not a stall
+            const elapsed_ms = performance.now() - start;
+            return {items, scrolls, elapsed_ms, reason: elapsed_ms >= deadlineMs ? 'deadline' : 'stalled'};
+        }
+    }
+}
+"""
+
+async def scroll_until_loaded(page, item_selector: str, max_items: Optional[int] = None,
+                              deadline: float = 15.0, stall_timeout: float = 1.5) -> Dict:
+    """
+    Scroll until max_items items match item_selector, no new items appear within stall_timeout,
+    or the deadline (seconds) passes
+    Returns the item count, scroll count, elapsed seconds and the reason it stopped
+    """
+    try:
+        result = await page.evaluate(SCROLL_UNTIL_LOADED_JS, {
+            "selector": item_selector,
+            "maxItems": max_items or 0,
+            "deadlineMs": deadline * 1000,
+            "stallMs": stall_timeout * 1000
+        })
+    except Exception as e:
+        logger.warning(f"Scroll loader failed: {e}")
+        return {"items": None, "scrolls": 0, "elapsed": 0.0, "reason": "error"}
+
+    return {
+        "items": result["items"],
+        "scrolls": result["scrolls"],
+        "elapsed": result["elapsed_ms"] / 1000,
+        "reason": result["reason"]
+    }
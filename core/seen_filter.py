@@ -0,0 +1,132 @@
+"""
+Persisted Bloom filter of ingested listing IDs
+Lets ingestion reject most duplicates in memory; a "maybe seen" answer still has to be
+confirmed against the database, but a "not seen" answer is always right for IDs added here
+"""
+
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEEN_FILTER_PATH = os.path.join(".scraper_state", "seen_ids.bloom")
+
+_MAGIC = b"SEEN1"
+_HEADER = struct.Struct("<5sQIQQ")  # magic, bit count, hash count, items added, capacity
+
+class SeenFilter:
+    """Bloom filter sized for a capacity and false-positive rate, saved as a small binary file"""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        """Bit positions for an item by double hashing one 128-bit digest"""
+        digest = hashlib.blake2b(str(item).encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1  # An odd step visits distinct positions
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns False if it was probably present already"""
+        positions = self._positions(item)
+        with self._lock:
+            present = all(self._bits[p >> 3] & (1 << (p & 7)) for p in positions)
+            if not present:
+                for p in positions:
+                    self._bits[p >> 3] |= 1 << (p & 7)
+                self.count += 1
+            return not present
+
+    def update(self, items: Iterable[str]):
+        """Add many items"""
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        positions = self._positions(item)
+        with self._lock:
+            return all(self._bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    @property
+    def is_saturated(self) -> bool:
+        """Whether more items were added than the filter was sized for, raising its false-positive rate"""
+        return self.count > self.capacity
+
+    def save(self, path: str):
+        """Write the filter to disk atomically"""
+        with self._lock:
+            header = _HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count, self.capacity)
+            data = header + bytes(self._bits)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SeenFilter":
+        """Read a filter written by save"""
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, num_bits, num_hashes, count, capacity = _HEADER.unpack_from(data)
+        if magic != _MAGIC or len(data) - _HEADER.size != (num_bits + 7) // 8:
+            raise ValueError(f"{path} is not a seen-ID filter")
+        seen = cls.__new__(cls)
+        seen.capacity = capacity
+        seen.error_rate = None
+        seen.num_bits = num_bits
+        seen.num_hashes = num_hashes
+        seen.count = count
+        seen._bits = bytearray(data[_HEADER.size:])
+        seen._lock = threading.Lock()
+        return seen
+
+def load_seen_filter(path: Optional[str], load_ids: Callable[[], Optional[Iterable[str]]],
+                     capacity: int = 1_000_000, error_rate: float = 0.001) -> Optional[SeenFilter]:
+    """
+    Load the filter from path, or rebuild it from load_ids() when the file is missing,
+    unreadable or saturated, so every ID already in the database is covered
+    Returns None if the stored IDs cannot be read, since an incomplete filter would wrongly say "not seen"
+    """
+    if path and os.path.exists(path):
+        try:
+            seen = SeenFilter.load(path)
+            if not seen.is_saturated:
+                logger.info(f"Loaded seen-ID filter with {seen.count} IDs from {path}")
+                return seen
+            capacity = max(capacity, seen.count * 2)
+            logger.info(f"Seen-ID filter is saturated, rebuilding with capacity {capacity}")
+        except Exception as e:
+            logger.warning(f"Could not load seen-ID filter from {path}: {e}")
+
+    try:
+        ids = load_ids()
+    except Exception as e:
+        logger.warning(f"Could not read stored IDs for the seen-ID filter: {e}")
+        ids = None
+    if ids is None:
+        return None
+    ids = list(ids)
+    seen = SeenFilter(capacity=max(capacity, len(ids) * 2), error_rate=error_rate)
+    seen.update(ids)
+    logger.info(f"Built seen-ID filter from {len(ids)} stored IDs")
+    if path:
+        try:
+            seen.save(path)
+        except Exception as e:
+            logger.warning(f"Could not save seen-ID filter to {path}: {e}")
+    return seen
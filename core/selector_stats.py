@@ -0,0 +1,114 @@
+"""
+Selector statistics cache
+Remembers which CSS selector matched for each page type and field, tries winners first
+and drops selectors that never match
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_PATH = os.path.join(".scraper_state", "selector_stats.json")
+
+class SelectorStats:
+    """Hit/attempt counters per (page type, field, selector) with learned ordering"""
+
+    def __init__(self, path: Optional[str] = None, dead_after: int = 50, reprobe_interval: int = 200,
+                 save_interval: float = 30.0):
+        self.path = path
+        self.dead_after = dead_after  # Attempts without a single hit before a selector is dropped
+        self.reprobe_interval = reprobe_interval  # Every Nth lookup retries dropped selectors
+        self.save_interval = save_interval
+        self._stats: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
+        self._lookups = 0
+        self._dirty = False
+        self._last_save = time.time()
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load persisted counters if the stats file exists"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._stats = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load selector stats from {self.path}: {e}")
+            self._stats = {}
+
+    def save(self):
+        """Write counters to disk atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._stats)
+            self._dirty = False
+            self._last_save = time.time()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save selector stats to {self.path}: {e}")
+
+    def maybe_save(self):
+        """Save if there are changes and the save interval has passed"""
+        if self._dirty and time.time() - self._last_save >= self.save_interval:
+            self.save()
+
+    def _counters(self, page_type: str, field: str) -> Dict[str, List[int]]:
+        """Get the [hits, attempts] table for a field, creating it if needed"""
+        return self._stats.setdefault(page_type, {}).setdefault(field, {})
+
+    def _is_dead(self, counts: Optional[List[int]]) -> bool:
+        """Whether a selector has been tried enough times without ever matching"""
+        return bool(counts) and counts[0] == 0 and counts[1] >= self.dead_after
+
+    def ordered(self, page_type: str, field: str, selectors: List[str]) -> List[str]:
+        """
+        Order candidate selectors by observed hit rate, best first
+        Unseen selectors keep their original relative order; dead ones are skipped except on reprobe
+        """
+        with self._lock:
+            self._lookups += 1
+            reprobe = self.reprobe_interval and self._lookups % self.reprobe_interval == 0
+            counters = self._counters(page_type, field)
+
+            def hit_rate(selector: str) -> float:
+                counts = counters.get(selector)
+                return counts[0] / counts[1] if counts and counts[1] else 0.0
+
+            ranked = sorted(enumerate(selectors), key=lambda item: (-hit_rate(item[1]), item[0]))
+            live = [s for _, s in ranked if not self._is_dead(counters.get(s))]
+
+        # Never return an empty list: if everything looks dead the page layout probably changed
+        if reprobe or not live:
+            return [s for _, s in ranked]
+        return live
+
+    def record(self, page_type: str, field: str, selector: str, hit: bool):
+        """Count one attempt of a selector and whether it produced a value"""
+        with self._lock:
+            counts = self._counters(page_type, field).setdefault(selector, [0, 0])
+            if hit:
+                counts[0] += 1
+            counts[1] += 1
+            self._dirty = True
+
+    def get_hit_rates(self, page_type: str, field: str) -> Dict[str, float]:
+        """Get hit rate per selector for a field"""
+        with self._lock:
+            counters = dict(self._counters(page_type, field))
+        return {s: (c[0] / c[1] if c[1] else 0.0) for s, c in counters.items()}
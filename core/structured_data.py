@@ -0,0 +1,193 @@
+"""
+Structured-data extraction from embedded page JSON
+Reads products straight from hydration payloads (__NEXT_DATA__ and other application/json
+scripts) and JSON-LD blocks, so a whole result page costs a few json.loads calls
+instead of hundreds of DOM queries
+"""
+
+import json
+import logging
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCRIPT_RE = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+_JSON_TYPE_RE = re.compile(r'type\s*=\s*["\']?application/(?:ld\+)?json', re.IGNORECASE)
+_ITEM_ID_RE = re.compile(r'/item/(m?\w+)')
+
+# Mercari's itemConditionId values mapped to the condition names used across the app
+MERCARI_CONDITION_IDS = {
+    "1": "new",
+    "2": "like_new",
+    "3": "very_good",
+    "4": "good",
+    "5": "acceptable",
+    "6": "acceptable"
+}
+
+SCHEMA_CONDITIONS = {
+    "newcondition": "new",
+    "refurbishedcondition": "very_good",
+    "usedcondition": "good",
+    "damagedcondition": "acceptable"
+}
+
+# In-browser equivalent of find_json_scripts, for Playwright's page.evaluate
+JSON_SCRIPTS_JS = """
+() => Array.from(document.querySelectorAll(
+    'script[type="application/json"], script[type="application/ld+json"], script#__NEXT_DATA__'
+)).map(s => s.textContent.trim()).filter(Boolean)
+"""
+
+def find_json_scripts(html: str) -> List[str]:
+    """Get the bodies of JSON-LD, __NEXT_DATA__ and other application/json script tags"""
+    payloads = []
+    for attrs, body in _SCRIPT_RE.findall(html or ""):
+        if _JSON_TYPE_RE.search(attrs) or '__NEXT_DATA__' in attrs:
+            body = body.strip()
+            if body:
+                payloads.append(body)
+    return payloads
+
+def _looks_like_product(node: Dict) -> bool:
+    """Whether a JSON object describes a single listing"""
+    node_type = node.get("@type")
+    if node_type == "Product" or (isinstance(node_type, list) and "Product" in node_type):
+        return True
+    return "name" in node and ("price" in node or "offers" in node)
+
+def iter_product_nodes(data) -> Iterator[Dict]:
+    """Walk a JSON document and yield product-like objects in document order"""
+    if isinstance(data, dict):
+        if _looks_like_product(data):
+            yield data
+            return
+        for value in data.values():
+            yield from iter_product_nodes(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from iter_product_nodes(value)
+
+def _first(value):
+    """First element of a list, or the value itself"""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+def _name_of(value) -> Optional[str]:
+    """Get a display name from a string or an object with a name"""
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+def _parse_price(node: Dict) -> Optional[int]:
+    """Get an integer yen price from a Mercari item or a schema.org offer"""
+    price = node.get("price")
+    if price is None:
+        offers = _first(node.get("offers"))
+        if isinstance(offers, dict):
+            price = offers.get("price", offers.get("lowPrice"))
+    if isinstance(price, (int, float)):
+        return int(price)
+    if isinstance(price, str):
+        digits = re.sub(r'[^\d.]', '', price)
+        try:
+            return int(float(digits)) if digits else None
+        except ValueError:
+            return None
+    return None
+
+def _parse_image(node: Dict) -> Optional[str]:
+    """Get the first image URL"""
+    for key in ("thumbnails", "thumbnail", "image", "photos", "imageUrl"):
+        image = _first(node.get(key))
+        if isinstance(image, dict):
+            image = image.get("url") or image.get("contentUrl")
+        if isinstance(image, str) and image:
+            return image
+    return None
+
+def _parse_condition(node: Dict) -> Optional[str]:
+    """Map Mercari condition ids or schema.org conditions to app condition names"""
+    condition_id = node.get("itemConditionId")
+    if condition_id is not None:
+        return MERCARI_CONDITION_IDS.get(str(condition_id))
+    condition = node.get("itemCondition")
+    if condition is None:
+        offers = _first(node.get("offers"))
+        condition = offers.get("itemCondition") if isinstance(offers, dict) else None
+    if isinstance(condition, str):
+        return SCHEMA_CONDITIONS.get(condition.rsplit("/", 1)[-1].lower())
+    return None
+
+def _parse_rating(node: Dict) -> Optional[float]:
+    """Get a seller or aggregate rating if the payload has one"""
+    rating = node.get("aggregateRating")
+    value = rating.get("ratingValue") if isinstance(rating, dict) else node.get("sellerRating")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def normalize_product(node: Dict, base_url: str) -> Optional[Dict]:
+    """
+    Convert one product node into the scrapers' product fields
+    Fields missing from the payload are None so each scraper can apply its own defaults
+    """
+    name = _name_of(node.get("name"))
+    price = _parse_price(node)
+    if not name or price is None:
+        return None
+
+    url = node.get("url") if isinstance(node.get("url"), str) else None
+    product_id = node.get("id") or node.get("productID") or node.get("sku")
+    if not product_id and url:
+        match = _ITEM_ID_RE.search(url)
+        product_id = match.group(1) if match else None
+    product_id = str(product_id) if product_id else None
+    if url and url.startswith("/"):
+        url = f"{base_url}{url}"
+    elif not url and product_id:
+        url = f"{base_url}/item/{product_id}"
+
+    return {
+        "id": product_id,
+        "name": name,
+        "price": price,
+        "image_url": _parse_image(node),
+        "condition": _parse_condition(node),
+        "seller_rating": _parse_rating(node),
+        "category": _name_of(node.get("categoryName") or node.get("itemCategory") or node.get("category")),
+        "brand": _name_of(node.get("itemBrand") or node.get("brand")),
+        "url": url,
+        "description": node.get("description") if isinstance(node.get("description"), str) else None
+    }
+
+def extract_from_payloads(payloads: Iterable[str], base_url: str, limit: Optional[int] = None) -> List[Dict]:
+    """Parse JSON script bodies and return de-duplicated products"""
+    products = []
+    seen = set()
+    for payload in payloads:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.debug("Skipping script tag that is not valid JSON")
+            continue
+        for node in iter_product_nodes(data):
+            product = normalize_product(node, base_url)
+            if not product:
+                continue
+            key = product["id"] or (product["name"], product["price"])
+            if key in seen:
+                continue
+            seen.add(key)
+            products.append(product)
+            if limit and len(products) >= limit:
+                return products
+    return products
+
+def extract_products(html: str, base_url: str, limit: Optional[int] = None) -> List[Dict]:
+    """Extract products from the JSON embedded in a page, without building a DOM"""
+    return extract_from_payloads(find_json_scripts(html), base_url, limit)
@@ -1,9 +1,12 @@
+import argparse
 import os
 import sys
-import time
 from core.mercari_scraper import MercariScraper
 from core.product_ranker import ProductRanker
+from core.checkpoint import RunCheckpoint
 from core.database import DatabaseManager
+from core.refresh_scheduler import DEFAULT_SCHEDULE_PATH, RefreshScheduler, match_demand
+from core.seen_filter import DEFAULT_SEEN_FILTER_PATH, load_seen_filter
 from dotenv import load_dotenv
 
 # Load environment variables (for DATABASE_URL, etc.)
@@ -17,33 +20,136 @@ CATEGORIES = [
     "Electronics", "Gaming", "Fashion", "Watches", "Collectibles", "Trading Cards"
 ]
 
+DEFAULT_CHECKPOINT_PATH = os.path.join(".scraper_state", "scheduled_checkpoint.json")
+
+def save_products(db, ranker, query, products, seen=None, failed=None):
+    """
+    Rank a query's products and add the ones not already in the database; returns how many were added
+    With a seen-ID filter, only IDs the filter may have seen are looked up in the database
+    IDs that could not be stored are appended to failed, when given
+    """
+    added = 0
+    ranked_products = ranker.rank_products(products, {"product_keywords": [query]})
+    for product in ranked_products:
+        # Use product['id'] as unique key; skip if already exists
+        if (seen is None or product['id'] in seen) and db.get_product_by_id(product['id']):
+            if seen is not None:
+                seen.add(product['id'])
+            continue
+        # Add product to database
+        success = db.add_product(product)
+        if success:
+            added += 1
+            if seen is not None:
+                seen.add(product['id'])
+            print(f"Added product: {product['name']} (ID: {product['id']})")
+        elif db.get_product_by_id(product['id']):
+            # Another writer stored it first; remember it so later runs skip the insert
+            if seen is not None:
+                seen.add(product['id'])
+        else:
+            print(f"Failed to add product: {product['name']} (ID: {product['id']})")
+            if failed is not None:
+                failed.append(product['id'])
+    return added
+
+def run_incremental(scraper, db, ranker, queries, max_pages, checkpoint=None, seen=None, page_limits=None):
+    """
+    Crawl each query's newest listings up to last run's mark and save them
+    page_limits caps individual queries below max_pages
+    A query's mark only moves once all of its new listings are stored, so a crash or a failed
+    write leaves them to be crawled again
+    """
+    summaries = scraper.search_many_incremental(queries, max_pages=max_pages, page_limits=page_limits)
+    for query in queries:
+        summary = summaries[query]
+        print(f"{query}: {len(summary['new_products'])} new listings, "
+              f"{summary['pages_fetched']} pages fetched, {summary['pages_skipped']} skipped")
+        failed = []
+        added = save_products(db, ranker, query, summary["new_products"], seen, failed) if summary["new_products"] else 0
+        if failed:
+            print(f"{query}: {len(failed)} listings could not be saved, keeping the previous mark")
+            continue
+        if scraper.commit_incremental(query, summary) and checkpoint:
+            checkpoint.mark_done(query, 1, {"added": added})
+    return summaries
+
+def record_refreshes(scheduler, summaries):
+    """Charge finished crawls to the refresh budget; a failed crawl keeps its churn and stays eligible"""
+    for query, summary in summaries.items():
+        if summary["error"]:
+            continue
+        scheduler.record_refresh(query, len(summary["new_products"]), summary["pages_fetched"])
+
 def main():
+    parser = argparse.ArgumentParser(description="Scheduled Mercari scraping job")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only page through results newer than the last run")
+    parser.add_argument("--max-pages", type=int, default=5, help="Page limit per query in incremental mode")
+    parser.add_argument("--prioritized", action="store_true",
+                        help="Refresh only the queries with the most expected unseen listings, within --budget")
+    parser.add_argument("--budget", type=int, default=60, help="Pages per hour shared by prioritized runs")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run, skipping queries it already saved")
+    args = parser.parse_args()
+
     print("Starting scheduled Mercari scraping job...")
     db = DatabaseManager(os.environ.get("DATABASE_URL"))
     scraper = MercariScraper(use_selenium=False)  # Use Playwright/requests for cloud compatibility
     ranker = ProductRanker()
+    # Filter of stored listing IDs so most duplicates are rejected without a database lookup
+    seen_path = os.environ.get("SCRAPER_SEEN_FILTER", DEFAULT_SEEN_FILTER_PATH)
+    seen = load_seen_filter(seen_path, db.get_product_ids)
 
-    for query in QUERIES:
-        print(f"Scraping for query: {query}")
-        products = scraper.search_products(query)
-        if not products:
-            print(f"No products found for query: {query}")
-            continue
+    # Each query is checkpointed once its products are saved; saving skips existing IDs, so redoing one is safe
+    checkpoint = RunCheckpoint(os.environ.get("SCRAPER_CHECKPOINT", DEFAULT_CHECKPOINT_PATH))
+    if checkpoint.begin(resume=args.resume):
+        print(f"Resuming: {checkpoint.counters.get('added', 0)} products were added before the interruption")
+    queries = [query for query, _ in checkpoint.pending((query, 1) for query in QUERIES)]
+
+    if args.prioritized:
+        # Spend the hourly page budget on the queries users search most and that churn fastest
+        scheduler = RefreshScheduler(path=os.environ.get("SCRAPER_REFRESH_STATE", DEFAULT_SCHEDULE_PATH),
+                                     pages_per_hour=args.budget, default_pages=args.max_pages)
+        demand = match_demand(queries, db.get_query_demand())
+        plan = scheduler.plan(queries, demand)
+        for item in plan:
+            print(f"Refreshing {item['query']} (priority {item['priority']:.1f}, "
+                  f"{demand.get(item['query'], 0)} searching sessions)")
+        queries = [item["query"] for item in plan]
+        # Cap each crawl at its share of the budget, in case a query has more new pages than last time
+        page_limits = {item["query"]: item["pages"] for item in plan}
+
+        summaries = run_incremental(scraper, db, ranker, queries, args.max_pages, checkpoint, seen,
+                                    page_limits) if queries else {}
+        record_refreshes(scheduler, summaries)
+        scheduler.save()
+        print(f"Prioritized run: refreshed {len(queries)} of {len(QUERIES)} queries, "
+              f"{scheduler.budget_remaining()} pages left in this hour's budget")
+    elif args.incremental:
+        # Newest-first crawl per query that stops at listings ingested last run
+        summaries = run_incremental(scraper, db, ranker, queries, args.max_pages, checkpoint, seen)
+
+        total_new = sum(len(s["new_products"]) for s in summaries.values())
+        total_skipped = sum(s["pages_skipped"] for s in summaries.values())
+        print(f"Incremental run: {total_new} new listings, {total_skipped} of "
+              f"{len(queries) * args.max_pages} pages skipped")
+    else:
+        # Fetch every query concurrently; the fetch engine caps requests per host to stay polite
+        results = scraper.search_many(queries)
 
-        # Deduplicate and rank products
-        ranked_products = ranker.rank_products(products, {"product_keywords": [query]})
-        for product in ranked_products:
-            # Use product['id'] as unique key; skip if already exists
-            if db.get_product_by_id(product['id']):
+        for query in queries:
+            print(f"Processing results for query: {query}")
+            products = results.get(query)
+            if not products:
+                print(f"No products found for query: {query}")
                 continue
-            # Add product to database
-            success = db.add_product(product)
-            if success:
-                print(f"Added product: {product['name']} (ID: {product['id']})")
-            else:
-                print(f"Failed to add product: {product['name']} (ID: {product['id']})")
-        time.sleep(2)  # Be polite to Mercari
+            checkpoint.mark_done(query, 1, {"added": save_products(db, ranker, query, products, seen)})
 
+    checkpoint.finish()
+    if seen is not None:
+        seen.save(seen_path)
+    scraper.close()
     print("Scheduled scraping job complete.")
 
 if __name__ == "__main__":
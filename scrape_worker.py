@@ -0,0 +1,129 @@
+"""
+Distributed scrape worker
+    python scrape_worker.py enqueue [--queries iPhone MacBook] [--pages 2]
+    python scrape_worker.py work [--worker-id host-1] [--exit-when-empty]
+    python scrape_worker.py stats
+Run as many `work` processes as needed against the same SCRAPER_JOB_QUEUE file; a crashed
+worker's jobs are leased again once their visibility timeout passes
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+from dotenv import load_dotenv
+from core.job_queue import DEFAULT_QUEUE_PATH, JobQueue, LeaseKeeper
+
+# Load environment variables (for DATABASE_URL, etc.)
+load_dotenv()
+
+def open_queue(visibility_timeout: float = 300) -> JobQueue:
+    """Open the shared job queue named by SCRAPER_JOB_QUEUE"""
+    return JobQueue(os.environ.get("SCRAPER_JOB_QUEUE", DEFAULT_QUEUE_PATH), visibility_timeout=visibility_timeout)
+
+def enqueue_searches(queue: JobQueue, queries, pages: int = 1, priority: float = 0) -> int:
+    """Queue one search job per query and page, skipping pages already pending or running"""
+    added = 0
+    for query in queries:
+        for page in range(1, pages + 1):
+            job_id = queue.enqueue("search", {"query": query, "page": page}, priority=priority,
+                                   dedupe_key=f"search:{query}:{page}")
+            added += job_id is not None
+    return added
+
+def run_search_job(scraper, db, ranker, payload, seen=None) -> dict:
+    """Scrape one search page and save its products"""
+    from scheduled_scraper import save_products
+
+    products = scraper.fetch_search_page(payload["query"], payload.get("filters"), payload.get("page", 1))
+    if products:
+        save_products(db, ranker, payload["query"], products, seen)
+    return {"products": len(products)}
+
+def work(queue: JobQueue, worker_id: str, exit_when_empty: bool = False, poll_interval: float = 5.0) -> int:
+    """Lease and run jobs until interrupted, or until the queue is empty with exit_when_empty"""
+    from core.database import DatabaseManager
+    from core.mercari_scraper import MercariScraper
+    from core.product_ranker import ProductRanker
+    from core.seen_filter import DEFAULT_SEEN_FILTER_PATH, load_seen_filter
+
+    db = DatabaseManager(os.environ.get("DATABASE_URL"))
+    scraper = MercariScraper(use_selenium=False)
+    ranker = ProductRanker()
+    # Workers each keep their own copy; an ID missing from a copy only costs the insert attempt
+    seen_path = os.environ.get("SCRAPER_SEEN_FILTER", DEFAULT_SEEN_FILTER_PATH)
+    seen = load_seen_filter(seen_path, db.get_product_ids)
+    handlers = {"search": lambda scraper, db, ranker, payload: run_search_job(scraper, db, ranker, payload, seen)}
+    processed = 0
+
+    try:
+        while True:
+            job = queue.lease(worker_id, kinds=list(handlers))
+            if job is None:
+                if exit_when_empty:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            print(f"[{worker_id}] job {job['id']} {job['kind']} {job['payload']} (attempt {job['attempts']})")
+            try:
+                with LeaseKeeper(queue, job["id"], worker_id) as keeper:
+                    result = handlers[job["kind"]](scraper, db, ranker, job["payload"])
+            except Exception as e:
+                print(f"[{worker_id}] job {job['id']} failed: {e}")
+                queue.fail(job["id"], worker_id, str(e))
+                continue
+
+            if keeper.lost:
+                # Another worker owns the job now; its result will be the one recorded
+                print(f"[{worker_id}] job {job['id']} finished after its lease was lost")
+            else:
+                queue.complete(job["id"], worker_id, result)
+                processed += 1
+    except KeyboardInterrupt:
+        print(f"[{worker_id}] interrupted; unfinished work will be leased again after the timeout")
+    finally:
+        scraper.close()
+        if seen is not None:
+            seen.save(seen_path)
+    return processed
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Distributed Mercari scrape worker")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue search jobs")
+    enqueue_parser.add_argument("--queries", nargs="+", help="Defaults to scheduled_scraper.QUERIES")
+    enqueue_parser.add_argument("--pages", type=int, default=1, help="Search pages per query")
+    enqueue_parser.add_argument("--priority", type=float, default=0)
+
+    work_parser = subparsers.add_parser("work", help="Run jobs")
+    work_parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    work_parser.add_argument("--visibility-timeout", type=float, default=300,
+                             help="Seconds before an unrenewed lease is handed to another worker")
+    work_parser.add_argument("--exit-when-empty", action="store_true")
+
+    subparsers.add_parser("stats", help="Show job counts by status")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        from scheduled_scraper import QUERIES
+
+        queue = open_queue()
+        added = enqueue_searches(queue, args.queries or QUERIES, args.pages, args.priority)
+        print(f"Queued {added} search jobs")
+    elif args.command == "work":
+        queue = open_queue(args.visibility_timeout)
+        processed = work(queue, args.worker_id, args.exit_when_empty)
+        print(f"[{args.worker_id}] completed {processed} jobs")
+    else:
+        queue = open_queue()
+        for status, count in queue.get_stats().items():
+            print(f"{status:<8} {count}")
+    queue.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
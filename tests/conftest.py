@@ -88,6 +88,32 @@ def mock_environment_variables():
     }):
         yield
 
+# Environment variables naming the scrapers' on-disk state, and the file or directory each one gets
+SCRAPER_STATE_PATHS = {
+    'SCRAPER_SELECTOR_STATS': 'selector_stats.json',
+    'SCRAPER_CRAWL_STATE': 'crawl_state.json',
+    'SCRAPER_HTTP_CACHE': 'http_cache.sqlite',
+    'SCRAPER_PAGE_ARCHIVE': 'page_archive',
+    'SCRAPER_RATE_LIMIT_DB': 'rate_limits.sqlite',
+    'SCRAPER_JOB_QUEUE': 'job_queue.sqlite',
+    'SCRAPER_REFRESH_STATE': 'refresh_schedule.json',
+    'SCRAPER_CHECKPOINT': 'scheduled_checkpoint.json',
+    'SCRAPER_SEEN_FILTER': 'seen_ids.bloom',
+    'SCRAPER_IMAGE_CACHE': 'image_cache',
+}
+
+@pytest.fixture(autouse=True)
+def isolated_scraper_state(tmp_path, monkeypatch):
+    """Keep scraper state in a per-test directory instead of the checkout's .scraper_state"""
+    state_dir = tmp_path / "scraper_state"
+    for name, filename in SCRAPER_STATE_PATHS.items():
+        monkeypatch.setenv(name, str(state_dir / filename))
+    # Process-wide instances would otherwise carry one test's state into the next
+    for module, attribute in [('core.http_cache', '_shared_cache'), ('core.page_archive', '_shared_archive'),
+                              ('core.rate_limiter', '_shared_limiter'), ('core.image_cache', '_shared_cache')]:
+        monkeypatch.setattr(f"{module}.{attribute}", None)
+    yield state_dir
+
 @pytest.fixture(autouse=True)
 def mock_external_services():
     """Mock external services to avoid actual API calls"""
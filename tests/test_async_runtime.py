@@ -0,0 +1,124 @@
+import asyncio
+import concurrent.futures
+import threading
+import pytest
+from core.async_runtime import BackgroundLoop
+
+class TestBackgroundLoop:
+    """Test suite for BackgroundLoop"""
+
+    @pytest.fixture
+    def runtime(self):
+        """Create a BackgroundLoop for testing"""
+        runtime = BackgroundLoop(name="test-runtime")
+        yield runtime
+        runtime.stop()
+
+    def test_run_returns_result(self, runtime):
+        """Test a coroutine result is returned to the caller"""
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        assert runtime.run(add(2, 3)) == 5
+        assert runtime.is_running
+
+    def test_loop_persists_between_calls(self, runtime):
+        """Test consecutive calls run on the same loop"""
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert runtime.run(current_loop()) is runtime.run(current_loop())
+
+    def test_timeout_cancels_coroutine(self, runtime):
+        """Test a timed-out coroutine is cancelled on the loop"""
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            runtime.run(slow(), timeout=0.05)
+
+        assert cancelled.wait(timeout=1)
+
+    def test_submit_from_many_threads(self, runtime):
+        """Test concurrent submissions from several threads share the loop"""
+        async def echo(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda v: runtime.run(echo(v)), range(8)))
+
+        assert results == list(range(8))
+
+    def test_exceptions_propagate(self, runtime):
+        """Test errors raised by the coroutine reach the caller"""
+        async def boom():
+            raise ValueError("bad query")
+
+        with pytest.raises(ValueError):
+            runtime.run(boom())
+
+    def test_stop_and_restart(self, runtime):
+        """Test the loop can be restarted after stop"""
+        async def value():
+            return 1
+
+        runtime.run(value())
+        runtime.stop()
+        assert not runtime.is_running
+
+        assert runtime.run(value()) == 1
+
+    def test_iterate_yields_items_as_they_arrive(self, runtime):
+        """Test the first item reaches the caller before the producer finishes"""
+        release = threading.Event()
+
+        async def produce():
+            yield 1
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            yield 2
+
+        stream = runtime.iterate(produce(), timeout=5)
+        assert next(stream) == 1
+        release.set()
+        assert list(stream) == [2]
+
+    def test_iterate_propagates_errors(self, runtime):
+        """Test an exception in the async iterator is raised after the items before it"""
+        async def produce():
+            yield "first"
+            raise ValueError("page crashed")
+
+        stream = runtime.iterate(produce())
+        assert next(stream) == "first"
+        with pytest.raises(ValueError):
+            next(stream)
+
+    def test_iterate_timeout_and_early_close_cancel_producer(self, runtime):
+        """Test a timeout stops iteration and cancels the producer on the loop"""
+        cancelled = threading.Event()
+
+        async def produce():
+            try:
+                yield "first"
+                await asyncio.sleep(10)
+                yield "never"
+            except (asyncio.CancelledError, GeneratorExit):
+                cancelled.set()
+                raise
+
+        items = []
+        with pytest.raises(concurrent.futures.TimeoutError):
+            for item in runtime.iterate(produce(), timeout=0.1):
+                items.append(item)
+
+        assert items == ["first"]
+        assert cancelled.wait(timeout=1)
@@ -0,0 +1,288 @@
+import asyncio
+import importlib
+import sys
+import types
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from core.checkpoint import RunCheckpoint
+
+# SQLite stand-in for the Postgres products table (seo_tags is an ARRAY there)
+PRODUCTS_DDL = (
+    "CREATE TABLE products (id VARCHAR PRIMARY KEY, name VARCHAR NOT NULL, price INTEGER NOT NULL, "
+    "condition VARCHAR NOT NULL, seller_rating FLOAT NOT NULL, category VARCHAR NOT NULL, brand VARCHAR, "
+    "image_url VARCHAR, url VARCHAR, description TEXT, seo_tags TEXT, enriched_at TIMESTAMP)"
+)
+
+@pytest.fixture(scope="module")
+def backend():
+    """backend.scraper imported against an in-memory configuration instead of the deployment's config.py"""
+    config = types.ModuleType("backend.config")
+    config.engine = None
+    config.SessionLocal = None
+    config.SCRAPER_CONFIG = {}
+    config.MERCARI_BASE_URL = "https://jp.mercari.com"
+    config.MERCARI_SEARCH_URL = "https://jp.mercari.com/search"
+    from backend.models import Base
+    with patch.dict(sys.modules, {"backend.config": config}), patch.object(Base.metadata, "create_all"):
+        sys.modules.pop("backend.utils", None)
+        sys.modules.pop("backend.scraper", None)
+        return importlib.import_module("backend.scraper")
+
+@pytest.fixture
+def session_factory():
+    """Sessions on a fresh in-memory products table"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text(PRODUCTS_DDL))
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def make_scraper(backend, session_factory, tmp_path):
+    """Build scrapers that share the test database and state directory"""
+    config = {
+        "headless": True,
+        "workers": 2,
+        "crawl_state_path": str(tmp_path / "crawl_state.json"),
+        "seen_filter_path": str(tmp_path / "seen_ids.bloom"),
+    }
+    scrapers = []
+
+    def make():
+        with patch.object(backend, "SessionLocal", session_factory), patch.object(backend, "SCRAPER_CONFIG", config):
+            scraper = backend.MercariScraper()
+        scrapers.append(scraper)
+        return scraper
+
+    yield make
+    for scraper in scrapers:
+        scraper.session.close()
+
+def listing(scraper, item_id):
+    """Product dict as the search page extraction builds it"""
+    return scraper._build_product_data(f"https://static.mercdn.net/{item_id}.jpg", f"Item {item_id}",
+                                       "¥1,000", f"/item/{item_id}")
+
+def stored_ids(session_factory):
+    """IDs of every stored product"""
+    session = session_factory()
+    try:
+        return sorted(row[0] for row in session.execute(text("SELECT id FROM products")))
+    finally:
+        session.close()
+
+class TestBackendProductIdentity:
+    """Test backend products are keyed on the Mercari listing"""
+
+    def test_product_id_is_the_mercari_item_id(self, make_scraper):
+        """Test the row key comes from the item URL, and is stable without one"""
+        scraper = make_scraper()
+
+        product = scraper._build_product_data("https://static.mercdn.net/m1.jpg", "Camera", "¥1,000", "/item/m123")
+        no_link = [scraper._build_product_data("https://static.mercdn.net/m9.jpg", "Lens", None, None) for _ in range(2)]
+
+        assert product["id"] == "m123"
+        assert no_link[0]["id"] == no_link[1]["id"]
+
+    def test_same_listing_scraped_twice_is_a_duplicate(self, make_scraper, session_factory):
+        """Test a listing seen on an earlier crawl is rejected, by the seen filter and by the database"""
+        first = make_scraper()
+        product = first._build_product_data("https://static.mercdn.net/m1.jpg", "Camera", "¥1,000", "/item/m123")
+        asyncio.run(first._save_product(product))
+        first.seen_ids.save(first.seen_filter_path)
+
+        second = make_scraper()
+        again = second._build_product_data("https://static.mercdn.net/m1.jpg", "Camera", "¥1,000", "/item/m123")
+        asyncio.run(second._save_product(again))
+
+        assert "m123" in second.seen_ids
+        assert second.duplicate_count == 1
+        assert second.scraped_count == 0
+        assert stored_ids(session_factory) == ["m123"]
+
+class TestBackendCheckpointResume:
+    """Test resumed backend sweeps write each listing once"""
+
+    def test_redone_page_stores_one_copy_per_listing(self, make_scraper, session_factory, tmp_path):
+        """Test a page interrupted after saving its rows is redone without duplicating them"""
+        path = str(tmp_path / "checkpoint.json")
+
+        first = make_scraper()
+        page_products = [listing(first, "m1"), listing(first, "m2")]
+        interrupted = RunCheckpoint(path)
+        interrupted.begin()
+        with patch.object(first, "setup_page", AsyncMock(return_value=AsyncMock())), \
+             patch.object(first, "scrape_search_page", AsyncMock(return_value=page_products)), \
+             patch.object(interrupted, "mark_done", side_effect=RuntimeError("killed")):
+            with pytest.raises(RuntimeError):
+                asyncio.run(first.scrape_products(["camera"], pages_per_keyword=1, checkpoint=interrupted))
+
+        resumed = RunCheckpoint(path)
+        assert resumed.begin(resume=True) is True
+        second = make_scraper()
+        with patch.object(second, "setup_page", AsyncMock(return_value=AsyncMock())), \
+             patch.object(second, "scrape_search_page", AsyncMock(return_value=page_products)) as scrape:
+            results = asyncio.run(second.scrape_products(["camera"], pages_per_keyword=1, checkpoint=resumed))
+
+        scrape.assert_awaited_once()
+        assert stored_ids(session_factory) == ["m1", "m2"]
+        assert results["scraped_count"] == 0
+        assert results["duplicate_count"] == 2
+        assert resumed.is_done("camera", 1)
+
+class TestBackendDetailEnrichment:
+    """Test the detail page enrichment stage"""
+
+    @pytest.fixture
+    def scraper(self, make_scraper):
+        """Scraper with three stored, unenriched listings"""
+        scraper = make_scraper()
+        for item_id in ("m1", "m2", "m3"):
+            asyncio.run(scraper._save_product(listing(scraper, item_id)))
+        return scraper
+
+    def test_detail_update_fills_only_empty_fields(self, backend):
+        """Test details never overwrite values the search crawl already stored"""
+        row = types.SimpleNamespace(id="m1", condition="unknown", seller_rating=4.5, brand="Sony", category="unknown",
+                                    description="")
+        details = {"condition": "like_new", "seller_rating": 3.0, "brand": "Canon", "category": "Cameras",
+                   "description": " Barely used "}
+
+        update = backend.MercariScraper._build_detail_update(None, row, details)
+        enriched_at = update.pop("enriched_at")
+
+        assert update == {"id": "m1", "description": "Barely used", "condition": "like_new", "category": "Cameras"}
+        assert enriched_at is not None
+
+        described = types.SimpleNamespace(**{**vars(row), "description": "Seller's own text"})
+        assert "description" not in backend.MercariScraper._build_detail_update(None, described, details)
+
+    def test_updates_are_written_in_batches(self, scraper, session_factory):
+        """Test detail updates are flushed every batch_size rows and once at the end"""
+        details = AsyncMock(return_value={"condition": "good", "description": "Works"})
+        with patch.object(scraper, "setup_page", AsyncMock(return_value=AsyncMock())), \
+             patch.object(scraper, "scrape_product_details", details), \
+             patch.object(scraper.session, "bulk_update_mappings", wraps=scraper.session.bulk_update_mappings) as bulk:
+            result = asyncio.run(scraper.enrich_details(workers=1, batch_size=2))
+
+        assert [len(call.args[1]) for call in bulk.call_args_list] == [2, 1]
+        assert result == {"enriched_count": 3, "failed_count": 0}
+        session = session_factory()
+        assert {row[0] for row in session.execute(text("SELECT condition FROM products"))} == {"good"}
+        session.close()
+
+    def test_pages_without_details_are_not_retried(self, scraper):
+        """Test a row whose page yields nothing is marked tried instead of being selected every run"""
+        with patch.object(scraper, "setup_page", AsyncMock(return_value=AsyncMock())), \
+             patch.object(scraper, "scrape_product_details", AsyncMock(return_value={})):
+            first = asyncio.run(scraper.enrich_details(workers=2, batch_size=10))
+            second = asyncio.run(scraper.enrich_details(workers=2, batch_size=10))
+
+        assert first == {"enriched_count": 0, "failed_count": 3}
+        assert second == {"enriched_count": 0, "failed_count": 0}
+
+class TestBackendCrawlWorkers:
+    """Test the keyword/page worker pool behind scrape_products"""
+
+    @pytest.fixture
+    def pages(self):
+        """Browser pages handed out by the mocked setup_page"""
+        return []
+
+    @pytest.fixture
+    def scraper(self, make_scraper, pages):
+        """Scraper with three workers and mocked browser pages"""
+        scraper = make_scraper()
+        scraper.workers = 3
+
+        async def setup_page():
+            page = AsyncMock()
+            pages.append(page)
+            return page
+
+        scraper.setup_page = setup_page
+        return scraper
+
+    def test_every_keyword_page_is_crawled_once(self, scraper, pages):
+        """Test a full sweep spreads each (keyword, page) pair over the workers exactly once"""
+        crawled = []
+
+        async def scrape(page, keyword, page_num):
+            crawled.append((keyword, page_num))
+            await asyncio.sleep(0)
+            return [listing(scraper, f"m{keyword}{page_num}")]
+
+        scraper.scrape_search_page = scrape
+        results = asyncio.run(scraper.scrape_products(["a", "b"], pages_per_keyword=3))
+
+        assert sorted(crawled) == [("a", 1), ("a", 2), ("a", 3), ("b", 1), ("b", 2), ("b", 3)]
+        assert results["scraped_count"] == 6
+        assert len(pages) == 3
+        assert all(page.close.await_count == 1 for page in pages)
+
+    def test_pages_are_closed_when_a_worker_fails(self, scraper, pages):
+        """Test a worker's browser page is closed even when scraping raises"""
+        scraper.scrape_search_page = AsyncMock(side_effect=RuntimeError("browser crashed"))
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(scraper.scrape_products(["a"], pages_per_keyword=1))
+
+        assert pages and all(page.close.await_count == 1 for page in pages)
+
+    def test_incremental_mode_pages_on_only_while_listings_are_new(self, scraper, session_factory):
+        """Test the next page is queued only while a page is all new, stopping at the high-water mark"""
+        scraper.crawl_state.advance("camera", [{"id": "m5"}])
+        results_by_page = {
+            ("camera", 1): ["m9", "m8"],
+            ("camera", 2): ["m7", "m5", "m4"],
+            ("lens", 1): [],
+        }
+        crawled = []
+
+        async def scrape(page, keyword, page_num):
+            crawled.append((keyword, page_num))
+            return [listing(scraper, item_id) for item_id in results_by_page.get((keyword, page_num), [])]
+
+        scraper.scrape_search_page = scrape
+        results = asyncio.run(scraper.scrape_products(["camera", "lens"], pages_per_keyword=5, incremental=True))
+
+        assert sorted(crawled) == [("camera", 1), ("camera", 2), ("lens", 1)]
+        assert results["new_listing_count"] == 3
+        assert results["pages_skipped"] == 3 + 4
+        assert stored_ids(session_factory) == ["m7", "m8", "m9"]
+
+    def test_incremental_mark_stays_when_a_keyword_page_fails(self, scraper):
+        """Test a keyword with a failed page keeps its old mark while the others advance"""
+        scraper.crawl_state.advance("camera", [{"id": "m1"}])
+
+        async def scrape(page, keyword, page_num):
+            if (keyword, page_num) == ("camera", 2):
+                scraper.failed_pages.add((keyword, page_num))
+                return []
+            return [listing(scraper, f"m{keyword}{page_num}")]
+
+        scraper.scrape_search_page = scrape
+        asyncio.run(scraper.scrape_products(["camera", "lens"], pages_per_keyword=2, incremental=True))
+
+        assert scraper.crawl_state.get_mark("camera")["newest_id"] == "m1"
+        assert scraper.crawl_state.get_mark("lens")["newest_id"] == "mlens1"
+
+    def test_search_page_is_paced_by_the_rate_limiter_alone(self, scraper):
+        """Test a search page waits for a rate-limit token and its items, not a fixed delay"""
+        page = AsyncMock()
+        page.goto.return_value.status = 200
+        page.evaluate.return_value = []
+        scraper.rate_limiter = AsyncMock()
+        scraper.rate_limiter.record = lambda *args, **kwargs: None
+
+        with patch.object(scraper, "_scroll_page", AsyncMock()), \
+             patch.object(scraper.resource_blocker, "reset_page_stats",
+                          return_value={"blocked": {}, "estimated_bytes_saved": 0}), \
+             patch("asyncio.sleep", AsyncMock()) as sleep:
+            asyncio.run(scraper.scrape_search_page(page, "camera", 1))
+
+        scraper.rate_limiter.acquire_async.assert_awaited_once_with("jp.mercari.com")
+        page.wait_for_selector.assert_awaited_once()
+        sleep.assert_not_awaited()
@@ -0,0 +1,188 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from core.browser_pool import BrowserPool
+
+def make_fake_playwright():
+    """Build a fake Playwright object whose browsers and pages report healthy"""
+    def new_page():
+        page = MagicMock()
+        page.is_closed.return_value = False
+        page.set_extra_http_headers = AsyncMock()
+        return page
+
+    def new_context(**kwargs):
+        context = MagicMock()
+        context.new_page = AsyncMock(side_effect=new_page)
+        context.close = AsyncMock()
+        return context
+
+    def launch(**kwargs):
+        browser = MagicMock()
+        browser.is_connected.return_value = True
+        browser.new_context = AsyncMock(side_effect=new_context)
+        browser.close = AsyncMock()
+        return browser
+
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(side_effect=launch)
+    playwright.stop = AsyncMock()
+    return playwright
+
+class TestBrowserPool:
+    """Test suite for BrowserPool"""
+
+    @pytest.fixture
+    def fake_playwright(self):
+        """Patch async_playwright with a fake driver"""
+        playwright = make_fake_playwright()
+        with patch('core.browser_pool.async_playwright') as mock_async_playwright:
+            mock_async_playwright.return_value.start = AsyncMock(return_value=playwright)
+            yield playwright
+
+    def test_lease_reuses_warm_page(self, fake_playwright):
+        """Test consecutive leases get the same page without relaunching"""
+        async def scenario():
+            pool = BrowserPool(max_pages_per_context=10)
+            async with pool.lease() as first:
+                pass
+            async with pool.lease() as second:
+                pass
+            stats = pool.get_stats()
+            await pool.close()
+            return first, second, stats
+
+        first, second, stats = asyncio.run(scenario())
+
+        assert first is second
+        assert fake_playwright.chromium.launch.await_count == 1
+        assert stats["created"] == 1
+        assert stats["leases"] == 2
+
+    def test_recycle_after_max_pages(self, fake_playwright):
+        """Test a context is replaced once it has served max_pages_per_context pages"""
+        async def scenario():
+            pool = BrowserPool(max_pages_per_context=2)
+            pages = []
+            for _ in range(3):
+                async with pool.lease() as page:
+                    pages.append(page)
+            stats = pool.get_stats()
+            await pool.close()
+            return pages, stats
+
+        pages, stats = asyncio.run(scenario())
+
+        assert pages[0] is pages[1]
+        assert pages[2] is not pages[0]
+        assert stats["recycled"] == 1
+
+    def test_failed_lease_discards_page(self, fake_playwright):
+        """Test a page is not returned to the pool when the lease block raises"""
+        async def scenario():
+            pool = BrowserPool()
+            with pytest.raises(ValueError):
+                async with pool.lease():
+                    raise ValueError("navigation failed")
+            stats = pool.get_stats()
+            await pool.close()
+            return stats
+
+        stats = asyncio.run(scenario())
+
+        assert stats["idle"] == 0
+        assert stats["recycled"] == 1
+
+    def test_unhealthy_idle_page_replaced(self, fake_playwright):
+        """Test closed pages are dropped on the next lease"""
+        async def scenario():
+            pool = BrowserPool()
+            async with pool.lease() as first:
+                pass
+            first.is_closed.return_value = True
+            async with pool.lease() as second:
+                pass
+            stats = pool.get_stats()
+            await pool.close()
+            return first, second, stats
+
+        first, second, stats = asyncio.run(scenario())
+
+        assert first is not second
+        assert stats["unhealthy"] == 1
+
+    def test_concurrent_leases_respect_capacity(self, fake_playwright):
+        """Test concurrent leases never exceed browsers x contexts"""
+        async def scenario():
+            pool = BrowserPool(max_browsers=1, contexts_per_browser=2)
+            active = {"now": 0, "peak": 0}
+
+            async def use():
+                async with pool.lease():
+                    active["now"] += 1
+                    active["peak"] = max(active["peak"], active["now"])
+                    await asyncio.sleep(0.01)
+                    active["now"] -= 1
+
+            await asyncio.gather(*[use() for _ in range(6)])
+            await pool.close()
+            return active["peak"]
+
+        assert asyncio.run(scenario()) == 2
+
+    def test_cold_pool_concurrent_leases_respect_browser_caps(self, fake_playwright):
+        """Test concurrent leases on a cold pool launch one browser and never overbook it"""
+        launch = fake_playwright.chromium.launch.side_effect
+
+        async def slow_launch(**kwargs):
+            await asyncio.sleep(0.01)
+            browser = launch(**kwargs)
+            new_context = browser.new_context.side_effect
+
+            async def slow_new_context(**options):
+                await asyncio.sleep(0.01)
+                return new_context(**options)
+
+            browser.new_context = AsyncMock(side_effect=slow_new_context)
+            return browser
+
+        fake_playwright.chromium.launch = AsyncMock(side_effect=slow_launch)
+
+        async def scenario():
+            pool = BrowserPool(max_browsers=1, contexts_per_browser=4)
+            peak = {"contexts": 0}
+
+            async def use():
+                async with pool.lease():
+                    peak["contexts"] = max(peak["contexts"], *(b["contexts"] for b in pool._browsers))
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*[use() for _ in range(8)])
+            stats = pool.get_stats()
+            await pool.close()
+            return peak["contexts"], stats
+
+        peak_contexts, stats = asyncio.run(scenario())
+
+        assert fake_playwright.chromium.launch.await_count == 1
+        assert stats["browsers"] == 1
+        assert peak_contexts <= 4
+        assert stats["created"] == 4
+
+    def test_failed_new_context_releases_reserved_slot(self, fake_playwright):
+        """Test a context that fails to open does not keep its browser slot booked"""
+        async def scenario():
+            pool = BrowserPool(max_browsers=1, contexts_per_browser=1)
+            async with pool.lease():
+                pass
+            browser = pool._browsers[0]
+            browser["browser"].new_context.side_effect = RuntimeError("context crashed")
+            pool._idle_slots[0]["page"].is_closed.return_value = True
+            with pytest.raises(RuntimeError):
+                async with pool.lease():
+                    pass
+            contexts = browser["contexts"]
+            await pool.close()
+            return contexts
+
+        assert asyncio.run(scenario()) == 0
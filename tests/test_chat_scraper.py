@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from core.chat_scraper import ChatScraper, EXTRACT_PRODUCTS_JS, PRODUCT_SELECTORS
+
+class TestChatScraperExtraction:
+    """Test suite for ChatScraper's in-page batch extraction"""
+
+    @pytest.fixture
+    def scraper(self):
+        """Create a ChatScraper with a mock pool"""
+        return ChatScraper(pool=MagicMock())
+
+    def test_batch_extraction_is_one_evaluate_call(self, scraper):
+        """Test the extraction script receives the selector lists and max_results"""
+        product = {"id": "mercari_1_6", "name": "iPhone", "price": 12000}
+        page = MagicMock()
+        page.evaluate = AsyncMock(side_effect=[[], [product]])
+
+        products = asyncio.run(scraper._extract_products(page, max_results=5))
+
+        assert products == [product]
+        script, options = page.evaluate.await_args_list[1].args
+        assert script == EXTRACT_PRODUCTS_JS
+        assert options["containers"] == PRODUCT_SELECTORS
+        assert options["maxResults"] == 5
+        assert options["baseUrl"] == scraper.base_url
+        page.query_selector_all.assert_not_called()
+
+    def test_falls_back_to_per_element_extraction(self, scraper):
+        """Test the element-by-element path runs when the batch script fails"""
+        page = MagicMock()
+        page.evaluate = AsyncMock(side_effect=Exception("evaluate failed"))
+        page.query_selector_all = AsyncMock(return_value=[])
+
+        products = asyncio.run(scraper._extract_products(page, max_results=5))
+
+        assert products == []
+        page.query_selector_all.assert_awaited()
+
+class TestChatScraperStreaming:
+    """Test suite for ChatScraper's streaming search"""
+
+    def test_stream_yields_each_product(self):
+        """Test per-element extraction results are yielded one at a time"""
+        page = MagicMock()
+        page.evaluate = AsyncMock(side_effect=Exception("evaluate failed"))
+        page.query_selector_all = AsyncMock(return_value=["el1", "el2", "el3"])
+        pool = MagicMock()
+        pool.start = AsyncMock(return_value=True)
+        pool.lease.return_value.__aenter__ = AsyncMock(return_value=page)
+        pool.lease.return_value.__aexit__ = AsyncMock(return_value=False)
+        pool.resource_blocker = None
+        scraper = ChatScraper(pool=pool)
+        scraper._rate_limited_goto = AsyncMock()
+        scraper._wait_for_products = AsyncMock()
+        extracted = []
+
+        async def extract(element):
+            extracted.append(element)
+            return {"id": element}
+
+        scraper._extract_single_product = extract
+
+        async def first_then_rest():
+            stream = scraper.stream_products("iphone", max_results=2)
+            first = await stream.__anext__()
+            extracted_before_second = list(extracted)
+            rest = [product async for product in stream]
+            return first, extracted_before_second, rest
+
+        first, extracted_before_second, rest = asyncio.run(first_then_rest())
+
+        assert first == {"id": "el1"}
+        assert extracted_before_second == ["el1"]
+        assert rest == [{"id": "el2"}]
@@ -0,0 +1,68 @@
+import json
+import pytest
+from core.checkpoint import RunCheckpoint
+
+class TestRunCheckpoint:
+    """Test suite for RunCheckpoint"""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Checkpoint file location"""
+        return str(tmp_path / "checkpoint.json")
+
+    def test_units_persist_after_each_mark(self, path):
+        """Test every finished unit is on disk immediately"""
+        checkpoint = RunCheckpoint(path)
+        checkpoint.begin()
+        checkpoint.mark_done("iPhone", 1, {"scraped_count": 20})
+
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        assert len(state["done"]) == 1
+        assert state["counters"] == {"scraped_count": 20}
+
+    def test_resume_skips_done_units_and_keeps_counters(self, path):
+        """Test an interrupted run resumes with its finished units and counter totals"""
+        first = RunCheckpoint(path)
+        first.begin()
+        first.mark_done("iPhone", 1, {"scraped_count": 20, "duplicate_count": 1})
+        first.mark_done("iPhone", 2, {"scraped_count": 15, "duplicate_count": 0})
+
+        resumed = RunCheckpoint(path)
+        assert resumed.begin(resume=True) is True
+
+        assert resumed.is_done("iPhone", 2)
+        assert not resumed.is_done("MacBook", 1)
+        assert resumed.pending([("iPhone", 1), ("iPhone", 3), ("MacBook", 1)]) == [("iPhone", 3), ("MacBook", 1)]
+        assert resumed.counters == {"scraped_count": 35, "duplicate_count": 1}
+
+    def test_without_resume_starts_over(self, path):
+        """Test a normal run discards the previous run's progress"""
+        first = RunCheckpoint(path)
+        first.begin()
+        first.mark_done("iPhone", 1)
+
+        fresh = RunCheckpoint(path)
+        assert fresh.begin(resume=False) is False
+        assert not fresh.is_done("iPhone", 1)
+
+    def test_finished_run_is_not_resumed(self, path):
+        """Test --resume after a completed run starts a new one"""
+        first = RunCheckpoint(path)
+        first.begin()
+        first.mark_done("iPhone", 1)
+        first.finish()
+
+        again = RunCheckpoint(path)
+        assert again.begin(resume=True) is False
+        assert not again.is_done("iPhone", 1)
+
+    def test_corrupt_file_starts_over(self, path):
+        """Test an unreadable checkpoint is ignored instead of failing the run"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+
+        checkpoint = RunCheckpoint(path)
+
+        assert checkpoint.begin(resume=True) is False
+        assert checkpoint.counters == {}
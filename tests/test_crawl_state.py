@@ -0,0 +1,154 @@
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from core.crawl_state import CrawlState, listing_key
+
+def listing(item_id):
+    """A product dict as the scrapers produce it"""
+    return {"id": item_id, "name": f"Item {item_id}", "price": 1000,
+            "url": f"https://jp.mercari.com/item/{item_id}"}
+
+class TestCrawlState:
+    """Test suite for CrawlState"""
+
+    @pytest.fixture
+    def state(self, tmp_path):
+        """Create a CrawlState backed by a temporary file"""
+        return CrawlState(path=str(tmp_path / "crawl_state.json"))
+
+    def test_listing_key_prefers_item_url(self):
+        """Test listings are identified by the item ID in their URL"""
+        assert listing_key({"id": "random-uuid", "url": "https://jp.mercari.com/item/m42"}) == "m42"
+        assert listing_key({"id": "m7"}) == "m7"
+
+    def test_everything_is_new_without_mark(self, state):
+        """Test a query that was never crawled treats every listing as new"""
+        new, reached = state.split_new("iphone", [listing("m3"), listing("m2")])
+
+        assert [p["id"] for p in new] == ["m3", "m2"]
+        assert not reached
+
+    def test_split_stops_at_known_listing(self, state):
+        """Test only listings newer than the mark are returned"""
+        state.advance("iphone", [listing("m2"), listing("m1")])
+
+        new, reached = state.split_new("iphone", [listing("m4"), listing("m3"), listing("m2"), listing("m1")])
+
+        assert [p["id"] for p in new] == ["m4", "m3"]
+        assert reached
+
+    def test_advance_and_persist(self, state, tmp_path):
+        """Test marks survive a reload and keep the newest listing first"""
+        state.advance("iphone", [listing("m2"), listing("m1")])
+        state.advance("iphone", [listing("m3")])
+        state.save()
+
+        mark = CrawlState(path=str(tmp_path / "crawl_state.json")).get_mark("iphone")
+
+        assert mark["newest_id"] == "m3"
+        assert mark["known_ids"] == ["m3", "m2", "m1"]
+
+    def test_known_ids_are_bounded(self, tmp_path):
+        """Test only keep_ids listings are remembered per query"""
+        state = CrawlState(path=None, keep_ids=2)
+        state.advance("iphone", [listing("m3"), listing("m2"), listing("m1")])
+
+        assert state.get_mark("iphone")["known_ids"] == ["m3", "m2"]
+
+class TestMercariScraperIncremental:
+    """Test MercariScraper's incremental crawl"""
+
+    @pytest.fixture
+    def scraper(self, tmp_path, monkeypatch):
+        """Create a requests-only MercariScraper with isolated state"""
+        monkeypatch.setenv("SCRAPER_SELECTOR_STATS", str(tmp_path / "selector_stats.json"))
+        monkeypatch.setenv("SCRAPER_CRAWL_STATE", str(tmp_path / "crawl_state.json"))
+        monkeypatch.setenv("SCRAPER_PAGE_ARCHIVE", "off")
+        from core.mercari_scraper import MercariScraper
+        scraper = MercariScraper(use_selenium=False)
+        yield scraper
+        scraper.close()
+
+    def run_crawl(self, scraper, pages, max_pages=5, page_limits=None):
+        """Crawl one query where page N of the results is pages[N - 1]"""
+        def fake_parse(html):
+            return pages[int(html)]
+
+        async def fake_fetch(url, params=None, headers=None):
+            index = int(params.get("page_token", "v1:0").split(":")[1])
+            return {"url": url, "status": 200, "headers": {}, "text": str(index),
+                    "elapsed": 0.0, "error": None, "cache": None}
+
+        with patch.object(scraper.fetch_engine, "fetch", AsyncMock(side_effect=fake_fetch)) as fetch, \
+                patch.object(scraper, "_parse_mercari_html", side_effect=fake_parse):
+            summary = scraper.search_many_incremental(["iphone"], max_pages=max_pages,
+                                                      page_limits=page_limits)["iphone"]
+        return summary, fetch.await_count
+
+    def test_first_run_walks_all_pages(self, scraper):
+        """Test a query without a mark is paginated up to max_pages"""
+        pages = [[listing("m6"), listing("m5")], [listing("m4"), listing("m3")], [listing("m2"), listing("m1")]]
+
+        summary, fetches = self.run_crawl(scraper, pages, max_pages=3)
+
+        assert fetches == 3
+        assert len(summary["new_products"]) == 6
+        assert summary["pages_skipped"] == 0
+
+    def test_page_limit_caps_one_query(self, scraper):
+        """Test a per-query page limit stops its crawl before max_pages"""
+        pages = [[listing("m6"), listing("m5")], [listing("m4"), listing("m3")], [listing("m2"), listing("m1")]]
+
+        summary, fetches = self.run_crawl(scraper, pages, max_pages=3, page_limits={"iphone": 1})
+
+        assert fetches == 1
+        assert [p["id"] for p in summary["new_products"]] == ["m6", "m5"]
+
+    def test_refresh_stops_at_mark(self, scraper):
+        """Test a refresh costs one page when the mark is on it"""
+        scraper.crawl_state.advance("iphone", [listing("m6"), listing("m5")])
+        pages = [[listing("m8"), listing("m7"), listing("m6")], [listing("m5"), listing("m4")]]
+
+        summary, fetches = self.run_crawl(scraper, pages, max_pages=5)
+        assert scraper.commit_incremental("iphone", summary)
+
+        assert fetches == 1
+        assert [p["id"] for p in summary["new_products"]] == ["m8", "m7"]
+        assert summary["pages_skipped"] == 4
+        assert scraper.crawl_state.get_mark("iphone")["newest_id"] == "m8"
+
+    def test_mark_waits_for_commit(self, scraper, tmp_path):
+        """Test crawling alone neither moves nor persists the mark"""
+        pages = [[listing("m2"), listing("m1")]]
+
+        summary, _ = self.run_crawl(scraper, pages, max_pages=1)
+
+        assert scraper.crawl_state.get_mark("iphone") is None
+        assert not (tmp_path / "crawl_state.json").exists()
+
+        scraper.commit_incremental("iphone", summary)
+        assert CrawlState(path=str(tmp_path / "crawl_state.json")).get_mark("iphone")["newest_id"] == "m2"
+
+    def test_run_incremental_keeps_mark_when_saving_fails(self, scraper):
+        """Test listings that could not be stored are crawled again on the next run"""
+        from scheduled_scraper import run_incremental
+        pages = [[listing("m2"), listing("m1")]]
+        db = Mock()
+        db.get_product_by_id.return_value = None
+        db.add_product.side_effect = [True, False]
+        ranker = Mock()
+        ranker.rank_products.side_effect = lambda products, prefs: products
+        checkpoint = Mock()
+
+        summary, _ = self.run_crawl(scraper, pages, max_pages=1)
+        with patch.object(scraper, "search_many_incremental", return_value={"iphone": summary}):
+            run_incremental(scraper, db, ranker, ["iphone"], 1, checkpoint)
+        assert scraper.crawl_state.get_mark("iphone") is None
+        checkpoint.mark_done.assert_not_called()
+
+        db.add_product.side_effect = None
+        db.add_product.return_value = True
+        summary, _ = self.run_crawl(scraper, pages, max_pages=1)
+        with patch.object(scraper, "search_many_incremental", return_value={"iphone": summary}):
+            run_incremental(scraper, db, ranker, ["iphone"], 1, checkpoint)
+        assert scraper.crawl_state.get_mark("iphone")["newest_id"] == "m2"
+        checkpoint.mark_done.assert_called_once_with("iphone", 1, {"added": 2})
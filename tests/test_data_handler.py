@@ -90,6 +90,23 @@ class TestDataHandler:
         assert result == sample_products
         data_handler.db_manager.search_products.assert_called_once_with(query, filters)
     
+    def test_iter_search_products_streams_then_stores_history(self, sample_products):
+        """Test products are yielded one by one and history is stored once the stream ends"""
+        handler = DataHandler.__new__(DataHandler)
+        handler.db_manager = Mock()
+        handler.scraper = Mock()
+        handler.scraper.iter_search_products.return_value = iter(sample_products)
+        handler.use_real_data = True
+        
+        stream = handler.iter_search_products("iPhone", {}, session_id="s1")
+        first = next(stream)
+        
+        assert first == sample_products[0]
+        handler.db_manager.store_search_results.assert_not_called()
+        assert list(stream) == sample_products[1:]
+        handler.db_manager.store_search_results.assert_called_once_with("iPhone", sample_products, "s1")
+        handler.db_manager.search_products.assert_not_called()
+    
     def test_search_products_database_only(self, data_handler, sample_products):
         """Test product search uses database when real data is disabled"""
         # Mock database to return sample products
@@ -0,0 +1,179 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from core.driver_pool import DriverPool
+
+def make_driver():
+    """Fake Selenium driver that answers commands"""
+    driver = MagicMock()
+    driver.window_handles = ["main"]
+    return driver
+
+class TestDriverPool:
+    """Test suite for DriverPool"""
+
+    @pytest.fixture
+    def factory(self):
+        """Driver factory handing out fresh fake drivers"""
+        return MagicMock(side_effect=make_driver)
+
+    def test_no_driver_until_first_lease(self, factory):
+        """Test constructing the pool does not start Chrome"""
+        pool = DriverPool(driver_factory=factory)
+
+        assert factory.call_count == 0
+        with pool.lease():
+            pass
+        assert factory.call_count == 1
+
+    def test_lease_reuses_driver(self, factory):
+        """Test consecutive leases get the same driver"""
+        pool = DriverPool(max_pages_per_driver=10, driver_factory=factory)
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            pass
+
+        assert first is second
+        assert pool.get_stats()["leases"] == 2
+        assert pool.get_stats()["idle"] == 1
+
+    def test_recycle_after_max_pages(self, factory):
+        """Test a driver is quit once it has served max_pages_per_driver pages"""
+        pool = DriverPool(max_pages_per_driver=2, driver_factory=factory)
+        drivers = []
+        for _ in range(3):
+            with pool.lease() as driver:
+                drivers.append(driver)
+
+        assert drivers[0] is drivers[1]
+        assert drivers[2] is not drivers[0]
+        drivers[0].quit.assert_called_once()
+        assert pool.get_stats()["recycled"] == 1
+
+    def test_recycle_over_memory_ceiling(self, factory):
+        """Test a driver whose process tree exceeds max_memory_mb is quit"""
+        pool = DriverPool(max_memory_mb=500, driver_factory=factory)
+        with patch('core.driver_pool.driver_memory_mb', return_value=800.0):
+            with pool.lease() as driver:
+                pass
+
+        driver.quit.assert_called_once()
+        assert pool.get_stats()["memory_recycled"] == 1
+        assert pool.get_stats()["idle"] == 0
+
+    def test_timeout_keeps_healthy_driver(self, factory):
+        """Test an exception from a live driver does not discard it"""
+        pool = DriverPool(driver_factory=factory)
+        with pytest.raises(TimeoutError):
+            with pool.lease() as driver:
+                raise TimeoutError("page did not load")
+
+        driver.quit.assert_not_called()
+        assert pool.get_stats()["idle"] == 1
+
+    def test_dead_driver_is_discarded(self, factory):
+        """Test a driver that stopped answering is quit after the failed block"""
+        pool = DriverPool(driver_factory=factory)
+        with pytest.raises(RuntimeError):
+            with pool.lease() as driver:
+                type(driver).window_handles = property(MagicMock(side_effect=Exception("gone")))
+                raise RuntimeError("session deleted")
+
+        driver.quit.assert_called_once()
+        assert pool.get_stats()["idle"] == 0
+
+    def test_failed_start_marks_unavailable(self):
+        """Test a factory that cannot start Chrome disables the pool"""
+        factory = MagicMock(return_value=None)
+        pool = DriverPool(driver_factory=factory)
+
+        with pytest.raises(RuntimeError):
+            with pool.lease():
+                pass
+        assert pool.available is False
+
+        with pytest.raises(RuntimeError):
+            with pool.lease():
+                pass
+        assert factory.call_count == 1
+
+    def test_failed_start_is_retried_after_backoff(self):
+        """Test the pool tries Chrome again once the backoff passes, doubling it after each failure"""
+        factory = MagicMock(side_effect=[None, None, make_driver()])
+        pool = DriverPool(driver_factory=factory, retry_interval=60, max_retry_interval=100)
+        clock = [1000.0]
+
+        with patch('core.driver_pool.time.monotonic', side_effect=lambda: clock[0]):
+            for _ in range(2):
+                with pytest.raises(RuntimeError):
+                    with pool.lease():
+                        pass
+                assert pool.available is False
+                clock[0] += 59
+                assert pool.available is False
+                clock[0] += 41
+            with pool.lease():
+                pass
+
+        assert factory.call_count == 3
+        assert pool.available is True
+        assert pool.get_stats()["created"] == 1
+
+    def test_unenforced_memory_ceiling_is_logged_once(self, factory, caplog):
+        """Test pools created without psutil warn, once, that max_memory_mb is ignored"""
+        with patch('core.driver_pool.PSUTIL_AVAILABLE', False), \
+             patch('core.driver_pool._memory_ceiling_warned', False), \
+             caplog.at_level("WARNING", logger="core.driver_pool"):
+            DriverPool(driver_factory=factory, max_memory_mb=512)
+            DriverPool(driver_factory=factory, max_memory_mb=512)
+
+        warnings = [r for r in caplog.records if "memory ceiling" in r.getMessage()]
+        assert len(warnings) == 1
+
+    def test_close_quits_idle_drivers(self, factory):
+        """Test close quits every idle driver"""
+        pool = DriverPool(driver_factory=factory)
+        with pool.lease() as driver:
+            pass
+        pool.close()
+
+        driver.quit.assert_called_once()
+        assert pool.get_stats()["idle"] == 0
+
+class TestMercariScraperLazySelenium:
+    """Test MercariScraper only starts Chrome when a Selenium page is needed"""
+
+    def test_construction_does_not_start_chrome(self, mock_external_services):
+        """Test building a Selenium-enabled scraper launches no driver"""
+        from core.mercari_scraper import MercariScraper
+
+        with patch.dict('os.environ', {}, clear=False) as env:
+            for key in ("CI", "STREAMLIT_CLOUD"):
+                env.pop(key, None)
+            env["HOME"] = "/root"
+            scraper = MercariScraper(use_selenium=True)
+
+        assert scraper.use_selenium is True
+        assert scraper.driver_pool.get_stats()["leases"] == 0
+        mock_external_services['chrome'].assert_not_called()
+        scraper.close()
+
+    def test_falls_back_to_requests_when_chrome_fails(self):
+        """Test a failed driver start switches the scraper to the requests path"""
+        from core.mercari_scraper import MercariScraper
+
+        scraper = MercariScraper(use_selenium=False)
+        scraper.use_selenium = True
+        scraper.driver_pool = DriverPool(driver_factory=MagicMock(return_value=None))
+
+        with patch.object(scraper, '_scrape_with_requests', return_value=[{"id": "m1"}]) as mock_requests, \
+             patch.object(scraper, '_scrape_with_selenium', wraps=scraper._scrape_with_selenium) as mock_selenium:
+            products = scraper._scrape_mercari_products("iphone")
+            scraper._scrape_mercari_products("iphone")
+
+        assert products == [{"id": "m1"}]
+        # Selenium stays enabled, but is skipped while the pool backs off
+        assert scraper.use_selenium is True
+        assert mock_selenium.call_count == 1
+        assert mock_requests.call_count == 2
+        scraper.close()
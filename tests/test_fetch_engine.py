@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock
+from core.fetch_engine import AsyncFetchEngine, run_sync
+from core.rate_limiter import AdaptiveRateLimiter
+
+class TestAsyncFetchEngine:
+    """Test suite for AsyncFetchEngine"""
+
+    @pytest.fixture
+    def mock_session(self):
+        """Create a mock requests session"""
+        session = Mock()
+
+        def fake_get(url, params=None, headers=None, timeout=None):
+            response = Mock()
+            response.url = f"{url}?keyword={params['keyword']}" if params else url
+            response.status_code = 200
+            response.headers = {"Content-Type": "text/html"}
+            response.text = f"<html>{params['keyword'] if params else ''}</html>"
+            return response
+
+        session.get.side_effect = fake_get
+        return session
+
+    @pytest.fixture
+    def engine(self, mock_session):
+        """Create AsyncFetchEngine instance for testing"""
+        limiter = AdaptiveRateLimiter(initial_rate=1000, max_rate=1000, burst=100)
+        engine = AsyncFetchEngine(session=mock_session, max_concurrency=8, per_host_limit=2, rate_limiter=limiter)
+        yield engine
+        engine.close()
+
+    def test_engine_mounts_pooled_adapters(self, engine, mock_session):
+        """Test the engine mounts keep-alive adapters on the session"""
+        mounted = [call.args[0] for call in mock_session.mount.call_args_list]
+        assert "https://" in mounted
+        assert "http://" in mounted
+
+    def test_fetch_many_preserves_order(self, engine):
+        """Test results come back in request order"""
+        batch = [("https://jp.mercari.com/search", {"keyword": kw}) for kw in ["a", "b", "c"]]
+
+        results = engine.fetch_many_sync(batch)
+
+        assert [r["text"] for r in results] == ["<html>a</html>", "<html>b</html>", "<html>c</html>"]
+        assert all(r["status"] == 200 and r["error"] is None for r in results)
+
+    def test_fetch_records_errors(self, engine, mock_session):
+        """Test failed requests are reported instead of raised"""
+        mock_session.get.side_effect = Exception("connection reset")
+
+        results = engine.fetch_many_sync([("https://jp.mercari.com/search", None)])
+
+        assert results[0]["status"] is None
+        assert "connection reset" in results[0]["error"]
+
+    def test_lowercase_retry_after_reaches_rate_limiter(self, engine, mock_session):
+        """Test response headers are matched case-insensitively"""
+        mock_session.get.side_effect = None
+        mock_session.get.return_value = Mock(url="https://jp.mercari.com/search", status_code=429,
+                                             headers={"retry-after": "7", "etag": '"v1"'}, text="")
+        engine.rate_limiter = Mock(acquire_async=AsyncMock())
+
+        result = run_sync(engine.fetch("https://jp.mercari.com/search"))
+
+        assert result["headers"]["ETag"] == '"v1"'
+        assert engine.rate_limiter.record.call_args.kwargs["retry_after"] == 7.0
+
+    def test_per_host_limit(self, engine, mock_session):
+        """Test no more than per_host_limit requests hit one host at once"""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def slow_get(url, params=None, headers=None, timeout=None):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+            response = Mock(url=url, status_code=200, headers={}, text="")
+            return response
+
+        mock_session.get.side_effect = slow_get
+        batch = [("https://jp.mercari.com/search", {"keyword": str(i)}) for i in range(6)]
+
+        engine.fetch_many_sync(batch)
+
+        assert state["peak"] <= 2
+
+    def test_throttle_feeds_rate_limiter(self, engine, mock_session):
+        """Test 429 responses lower the host's rate"""
+        mock_session.get.side_effect = None
+        mock_session.get.return_value = Mock(url="https://jp.mercari.com/search", status_code=429,
+                                             headers={}, text="")
+        before = engine.rate_limiter.get_rate("jp.mercari.com")
+
+        engine.fetch_many_sync([("https://jp.mercari.com/search", None)])
+
+        assert engine.rate_limiter.get_rate("jp.mercari.com") < before
+
+    def test_run_sync_inside_running_loop(self):
+        """Test run_sync works when called from a thread with a running loop"""
+        async def inner():
+            return 42
+
+        async def outer():
+            return run_sync(inner())
+
+        assert asyncio.run(outer()) == 42
@@ -0,0 +1,84 @@
+import pytest
+from core.html_parser import (
+    BeautifulSoupBackend, available_backends, get_parser_backend, SELECTOLAX_AVAILABLE
+)
+
+SAMPLE_HTML = """
+<html><body>
+  <ul>
+    <li data-testid="item-cell">
+      <a href="/item/m111" class="card"><img src="a.jpg" alt="iPhone 13">
+        <span class="price">¥12,000</span><span class="name">iPhone <b>13</b></span></a>
+    </li>
+    <li data-testid="item-cell">
+      <a href="/item/m222" class="card"><img src="b.jpg" alt="iPad">
+        <span class="price">¥30,500</span><span class="name">iPad</span></a>
+    </li>
+  </ul>
+  <a href="/help">Help</a>
+</body></html>
+"""
+
+class TestHtmlParserBackends:
+    """Test suite for the pluggable HTML parser backends"""
+
+    @pytest.fixture(params=list(available_backends()))
+    def backend(self, request):
+        """Each installed backend in turn"""
+        return available_backends()[request.param]
+
+    def test_select_and_attributes(self, backend):
+        """Test CSS selection and attribute access"""
+        root = backend.parse(SAMPLE_HTML)
+
+        cells = root.select('[data-testid="item-cell"]')
+
+        assert len(cells) == 2
+        assert cells[0].select_one('a').get('href') == '/item/m111'
+        assert cells[1].select_one('img').get('alt') == 'iPad'
+        assert cells[0].select_one('.missing') is None
+        assert cells[0].get('missing', 'default') == 'default'
+
+    def test_text_and_strings(self, backend):
+        """Test text extraction across nested tags"""
+        root = backend.parse(SAMPLE_HTML)
+
+        name = root.select_one('.name')
+
+        assert name.get_text() == 'iPhone 13'
+        assert [s for s in name.strings() if s.strip()] == ['iPhone ', '13']
+
+    def test_fallback_helpers(self, backend):
+        """Test the regex helpers used by the scraper's fallback path"""
+        root = backend.parse(SAMPLE_HTML)
+
+        links = root.find_links(r'/item/')
+        prices = root.find_text_parents(r'¥[\d,]+')
+
+        assert [a.get('href') for a in links] == ['/item/m111', '/item/m222']
+        assert [p.get('class') for p in prices][0] in ('price', ['price'])
+        assert prices[0].parent.get('href') == '/item/m111'
+
+class TestGetParserBackend:
+    """Test suite for backend selection"""
+
+    def test_explicit_bs4(self):
+        """Test asking for bs4 returns the html.parser backend"""
+        backend = get_parser_backend('bs4')
+        assert isinstance(backend, BeautifulSoupBackend)
+        assert backend.name == 'bs4'
+
+    def test_unknown_backend_falls_back_to_bs4(self):
+        """Test an unavailable backend name falls back to bs4"""
+        assert get_parser_backend('does-not-exist').name == 'bs4'
+
+    def test_env_var_selects_backend(self, monkeypatch):
+        """Test SCRAPER_HTML_PARSER picks the default backend"""
+        monkeypatch.setenv('SCRAPER_HTML_PARSER', 'bs4')
+        assert get_parser_backend().name == 'bs4'
+
+    @pytest.mark.skipif(not SELECTOLAX_AVAILABLE, reason="selectolax not installed")
+    def test_auto_prefers_selectolax(self, monkeypatch):
+        """Test auto picks selectolax when installed"""
+        monkeypatch.delenv('SCRAPER_HTML_PARSER', raising=False)
+        assert get_parser_backend().name == 'selectolax'
@@ -0,0 +1,138 @@
+import os
+import re
+import time
+import pytest
+from unittest.mock import Mock
+from core.fetch_engine import AsyncFetchEngine
+from core.http_cache import HttpCache
+from core.rate_limiter import AdaptiveRateLimiter
+
+SEARCH_URL = "https://jp.mercari.com/search"
+ITEM_URL = "https://jp.mercari.com/item/m123"
+
+class TestHttpCache:
+    """Test suite for HttpCache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create an HttpCache in a temporary directory"""
+        cache = HttpCache(path=str(tmp_path / "http_cache.sqlite"))
+        yield cache
+        cache.close()
+
+    def test_store_and_lookup(self, cache):
+        """Test a stored page is returned fresh with its validators"""
+        cache.store(SEARCH_URL, {"keyword": "iphone"}, {"ETag": '"abc"'}, "<html>iphone</html>")
+
+        entry = cache.lookup(SEARCH_URL, {"keyword": "iphone"})
+
+        assert entry["text"] == "<html>iphone</html>"
+        assert cache.is_fresh(entry)
+        assert cache.conditional_headers(entry) == {"If-None-Match": '"abc"'}
+        assert cache.lookup(SEARCH_URL, {"keyword": "ipad"}) is None
+
+    def test_param_order_does_not_matter(self, cache):
+        """Test the cache key is independent of parameter order"""
+        cache.store(SEARCH_URL, {"a": "1", "b": "2"}, {}, "page")
+
+        assert cache.lookup(SEARCH_URL, {"b": "2", "a": "1"}) is not None
+
+    def test_ttl_policies(self, cache):
+        """Test URL classes get their own freshness lifetimes"""
+        assert cache.ttl_for(ITEM_URL) > cache.ttl_for(SEARCH_URL)
+        assert cache.ttl_for("https://jp.mercari.com/") == cache.default_ttl
+
+    def test_revalidated_refreshes_entry(self, cache):
+        """Test a 304 makes a stale entry fresh again"""
+        cache.store(ITEM_URL, None, {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, "item")
+        entry = cache.lookup(ITEM_URL)
+        entry["expires_at"] = time.time() - 1
+        assert not cache.is_fresh(entry)
+
+        cache.revalidated(entry, {"etag": '"v2"'})
+
+        refreshed = cache.lookup(ITEM_URL)
+        assert cache.is_fresh(refreshed)
+        assert refreshed["etag"] == '"v2"'
+        assert refreshed["last_modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    def test_no_store_is_respected(self, cache):
+        """Test responses marked no-store are not cached"""
+        cache.store(SEARCH_URL, None, {"Cache-Control": "private, no-store"}, "secret")
+
+        assert cache.lookup(SEARCH_URL) is None
+
+    def test_eviction_keeps_cache_under_cap(self, tmp_path):
+        """Test least recently used entries are evicted past max_bytes"""
+        cache = HttpCache(path=str(tmp_path / "small.sqlite"), max_bytes=2000)
+        for i in range(20):
+            cache.store(f"{ITEM_URL}{i}", None, {}, os.urandom(300).hex())
+
+        stats = cache.get_stats()
+        cache.close()
+
+        assert stats["bytes"] <= 2000
+        assert stats["evicted"] > 0
+
+class TestFetchEngineCache:
+    """Test AsyncFetchEngine serves and revalidates through the cache"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        """Create an engine with a cache and a mock session"""
+        session = Mock()
+        cache = HttpCache(path=str(tmp_path / "http_cache.sqlite"))
+        limiter = AdaptiveRateLimiter(initial_rate=1000, max_rate=1000, burst=100)
+        engine = AsyncFetchEngine(session=session, rate_limiter=limiter, http_cache=cache)
+        yield engine
+        engine.close()
+        cache.close()
+
+    def test_fresh_entry_skips_network(self, engine):
+        """Test a fresh cached page is served without a request"""
+        engine.http_cache.store(ITEM_URL, None, {"content-type": "text/html"}, "cached item")
+
+        results = engine.fetch_many_sync([(ITEM_URL, None)])
+
+        engine.session.get.assert_not_called()
+        assert results[0]["text"] == "cached item"
+        assert results[0]["headers"]["Content-Type"] == "text/html"
+        assert results[0]["cache"] == "hit"
+
+    def test_stale_entry_is_revalidated(self, engine):
+        """Test a stale entry sends validators and a 304 returns the cached body"""
+        engine.http_cache.ttl_policies = [(re.compile("/item/"), -1)]
+        engine.http_cache.store(ITEM_URL, None, {"ETag": '"v1"'}, "cached item")
+        engine.session.get.return_value = Mock(url=ITEM_URL, status_code=304, headers={}, text="")
+
+        results = engine.fetch_many_sync([(ITEM_URL, None)])
+
+        sent_headers = engine.session.get.call_args.kwargs["headers"]
+        assert sent_headers["If-None-Match"] == '"v1"'
+        assert results[0]["status"] == 200
+        assert results[0]["text"] == "cached item"
+        assert results[0]["cache"] == "revalidated"
+
+    def test_miss_is_stored(self, engine):
+        """Test a 200 response is written to the cache"""
+        engine.session.get.return_value = Mock(url=ITEM_URL, status_code=200, headers={"ETag": '"v1"'},
+                                               text="fresh item")
+
+        engine.fetch_many_sync([(ITEM_URL, None)])
+
+        assert engine.http_cache.lookup(ITEM_URL)["text"] == "fresh item"
+
+    def test_cached_results_report_the_full_request_url(self, engine):
+        """Test hits and revalidations carry the URL with its query string, like a live fetch"""
+        params = {"keyword": "iphone", "page_token": "v1:1"}
+        engine.http_cache.store(SEARCH_URL, params, {"ETag": '"v1"'}, "cached search")
+
+        hit = engine.fetch_many_sync([(SEARCH_URL, params)])[0]
+        engine.http_cache.ttl_policies = [(re.compile("/search"), -1)]
+        engine.http_cache.store(SEARCH_URL, params, {"ETag": '"v1"'}, "cached search")
+        engine.session.get.return_value = Mock(url=SEARCH_URL, status_code=304, headers={}, text="")
+        revalidated = engine.fetch_many_sync([(SEARCH_URL, params)])[0]
+
+        expected = "https://jp.mercari.com/search?keyword=iphone&page_token=v1%3A1"
+        assert (hit["cache"], hit["url"]) == ("hit", expected)
+        assert (revalidated["cache"], revalidated["url"]) == ("revalidated", expected)
@@ -0,0 +1,111 @@
+import io
+import os
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from PIL import Image
+from core.image_cache import ImageCache, get_image_cache, make_thumbnail
+
+def png_bytes(width=1200, height=800, color=(200, 30, 30)):
+    """Encode a solid-colour test image"""
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(out, "PNG")
+    return out.getvalue()
+
+class TestImageCache:
+    """Test suite for ImageCache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Cache that renders thumbnails in-process"""
+        cache = ImageCache(root=str(tmp_path / "images"), size=(100, 100), workers=0)
+        yield cache
+        cache.close()
+
+    def test_make_thumbnail_fits_size_as_webp(self):
+        """Test thumbnails keep their aspect ratio within the bounding box"""
+        data = make_thumbnail(png_bytes(1200, 800), (100, 100), 80)
+
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.format == "WEBP"
+            assert image.size == (100, 67)
+
+    def test_image_is_downloaded_once(self, cache):
+        """Test the second request is served from disk"""
+        with patch.object(cache, '_download', return_value=png_bytes()) as download:
+            first = cache.thumbnail("https://static.mercdn.net/item/m1.jpg")
+            second = cache.thumbnail("https://static.mercdn.net/item/m1.jpg")
+
+        assert first == second and os.path.exists(first)
+        download.assert_called_once()
+        assert cache.get_stats()["hits"] == 1
+
+    def test_thumbnails_render_in_process_pool(self, tmp_path):
+        """Test conversion through worker processes"""
+        cache = ImageCache(root=str(tmp_path / "images"), size=(50, 50), workers=1)
+        try:
+            with patch.object(cache, '_download', return_value=png_bytes()):
+                paths = cache.thumbnails(["https://a/1.jpg", "https://a/2.jpg", None, "https://a/1.jpg"])
+        finally:
+            cache.close()
+
+        assert set(paths) == {"https://a/1.jpg", "https://a/2.jpg"}
+        assert all(os.path.exists(path) for path in paths.values())
+
+    def test_least_recently_used_is_evicted(self, cache):
+        """Test the cache stays within max_bytes by dropping the oldest unused thumbnail"""
+        with patch.object(cache, '_download', return_value=png_bytes()):
+            first = cache.thumbnail("https://a/1.jpg")
+            second = cache.thumbnail("https://a/2.jpg")
+            cache.max_bytes = os.path.getsize(first) * 2
+            cache.thumbnail("https://a/1.jpg")  # Now more recent than 2.jpg
+            cache.thumbnail("https://a/3.jpg")
+
+        assert os.path.exists(first)
+        assert not os.path.exists(second)
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_failed_image_falls_back(self, cache):
+        """Test an undecodable image gives None and is not fetched again"""
+        cache._download = Mock(return_value=b"not an image")
+
+        assert cache.thumbnail("https://a/broken.jpg") is None
+        assert cache.thumbnail("https://a/broken.jpg") is None
+        cache._download.assert_called_once()
+        assert cache.thumbnail("data:image/png;base64,xyz") is None
+
+    def test_index_survives_restart(self, cache):
+        """Test thumbnails on disk are reused by a new process"""
+        with patch.object(cache, '_download', return_value=png_bytes()):
+            path = cache.thumbnail("https://a/1.jpg")
+
+        reopened = ImageCache(root=cache.root, size=(100, 100), workers=0)
+
+        assert reopened.get("https://a/1.jpg") == path
+        assert reopened.get_stats()["bytes"] == os.path.getsize(path)
+
+    def test_warm_returns_before_the_download(self, cache):
+        """Test warming queues the work in the background instead of blocking the caller"""
+        release = threading.Event()
+
+        def slow_download(url):
+            release.wait(5)
+            return png_bytes()
+
+        with patch.object(cache, '_download', side_effect=slow_download) as download:
+            started = time.monotonic()
+            cache.warm(["https://a/1.jpg", "https://a/1.jpg", None])
+            assert time.monotonic() - started < 0.5
+            assert cache.get("https://a/1.jpg") is None
+
+            release.set()
+            cache.close()
+
+        download.assert_called_once()
+        assert cache.get("https://a/1.jpg") is not None
+
+    def test_shared_cache_can_be_disabled(self):
+        """Test SCRAPER_IMAGE_CACHE=off serves remote images directly"""
+        with patch.dict(os.environ, {"SCRAPER_IMAGE_CACHE": "off"}):
+            assert get_image_cache() is None
@@ -0,0 +1,153 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from core.job_queue import JobQueue, LeaseKeeper
+
+class TestJobQueue:
+    """Test suite for JobQueue"""
+
+    @pytest.fixture
+    def queue(self, tmp_path):
+        """Job queue in a temporary SQLite file"""
+        queue = JobQueue(str(tmp_path / "jobs.sqlite"), visibility_timeout=60, retry_backoff=10)
+        yield queue
+        queue.close()
+
+    def test_lease_and_complete(self, queue):
+        """Test a job is leased once and recorded as done"""
+        job_id = queue.enqueue("search", {"query": "iPhone", "page": 1})
+
+        job = queue.lease("worker-1")
+        assert job["id"] == job_id
+        assert job["payload"] == {"query": "iPhone", "page": 1}
+        assert job["attempts"] == 1
+        assert queue.lease("worker-2") is None
+
+        assert queue.complete(job_id, "worker-1", {"products": 12}) is True
+        assert queue.get_job(job_id)["result"] == {"products": 12}
+        assert queue.get_stats()["done"] == 1
+
+    def test_dedupe_key_blocks_active_duplicates(self, queue):
+        """Test a pending job with the same dedupe key is not queued twice, but a finished one is"""
+        first = queue.enqueue("search", {"query": "iPhone"}, dedupe_key="search:iPhone:1")
+        assert queue.enqueue("search", {"query": "iPhone"}, dedupe_key="search:iPhone:1") is None
+
+        queue.complete(queue.lease("worker-1")["id"], "worker-1")
+        second = queue.enqueue("search", {"query": "iPhone"}, dedupe_key="search:iPhone:1")
+
+        assert second is not None and second != first
+
+    def test_priority_order(self, queue):
+        """Test higher priority jobs are leased first"""
+        queue.enqueue("search", {"query": "niche"}, priority=1)
+        queue.enqueue("search", {"query": "iPhone"}, priority=5)
+
+        assert queue.lease("worker-1")["payload"]["query"] == "iPhone"
+        assert queue.lease("worker-1")["payload"]["query"] == "niche"
+
+    def test_kind_filter(self, queue):
+        """Test workers only lease the kinds they handle"""
+        queue.enqueue("detail", {"id": "m1"})
+
+        assert queue.lease("worker-1", kinds=["search"]) is None
+        assert queue.lease("worker-1", kinds=["detail"])["kind"] == "detail"
+
+    def test_expired_lease_is_released_to_another_worker(self, queue):
+        """Test a crashed worker's job is leased again after the visibility timeout"""
+        job_id = queue.enqueue("search", {"query": "iPhone"})
+        queue.lease("worker-1")
+
+        with patch('core.job_queue.time.time', return_value=time.time() + 61):
+            job = queue.lease("worker-2")
+
+        assert job["id"] == job_id
+        assert job["attempts"] == 2
+        # The original worker can no longer report on the job
+        assert queue.complete(job_id, "worker-1") is False
+        assert queue.complete(job_id, "worker-2") is True
+
+    def test_heartbeat_extends_lease(self, queue):
+        """Test a heartbeat keeps the job away from other workers past the original timeout"""
+        job_id = queue.enqueue("search", {"query": "iPhone"})
+        queue.lease("worker-1")
+        now = time.time()
+
+        with patch('core.job_queue.time.time', return_value=now + 50):
+            assert queue.heartbeat(job_id, "worker-1") is True
+        with patch('core.job_queue.time.time', return_value=now + 70):
+            assert queue.lease("worker-2") is None
+
+    def test_fail_retries_with_backoff_then_gives_up(self, queue):
+        """Test failed attempts are retried after a growing delay until max_attempts"""
+        job_id = queue.enqueue("search", {"query": "iPhone"}, max_attempts=2)
+        now = time.time()
+
+        queue.lease("worker-1")
+        assert queue.fail(job_id, "worker-1", "HTTP 503") is True
+        job = queue.get_job(job_id)
+        assert job["status"] == "queued"
+        assert job["available_at"] >= now + 10
+        assert queue.lease("worker-1") is None
+
+        with patch('core.job_queue.time.time', return_value=now + 11):
+            assert queue.lease("worker-1")["attempts"] == 2
+            queue.fail(job_id, "worker-1", "HTTP 503")
+
+        job = queue.get_job(job_id)
+        assert job["status"] == "failed"
+        assert job["last_error"] == "HTTP 503"
+
+    def test_expired_final_attempt_fails_job(self, queue):
+        """Test a job whose last allowed attempt crashed is failed instead of leased again"""
+        job_id = queue.enqueue("search", {"query": "iPhone"}, max_attempts=1)
+        queue.lease("worker-1")
+
+        with patch('core.job_queue.time.time', return_value=time.time() + 61):
+            assert queue.lease("worker-2") is None
+
+        assert queue.get_job(job_id)["status"] == "failed"
+
+    def test_concurrent_workers_never_share_a_job(self, tmp_path):
+        """Test parallel leases from separate connections hand out each job once"""
+        path = str(tmp_path / "jobs.sqlite")
+        producer = JobQueue(path)
+        for i in range(40):
+            producer.enqueue("search", {"i": i})
+
+        leased = []
+        lock = threading.Lock()
+
+        def worker(name):
+            queue = JobQueue(path)
+            while True:
+                job = queue.lease(name)
+                if job is None:
+                    break
+                with lock:
+                    leased.append(job["id"])
+                queue.complete(job["id"], name)
+            queue.close()
+
+        threads = [threading.Thread(target=worker, args=(f"worker-{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(leased) == sorted(set(leased))
+        assert len(leased) == 40
+        assert producer.get_stats()["done"] == 40
+        producer.close()
+
+    def test_lease_keeper_heartbeats(self, queue):
+        """Test LeaseKeeper renews the lease while work runs"""
+        job_id = queue.enqueue("search", {"query": "iPhone"})
+        queue.lease("worker-1")
+        before = queue.get_job(job_id)["lease_expires"]
+
+        with LeaseKeeper(queue, job_id, "worker-1", interval=0.05) as keeper:
+            time.sleep(0.2)
+
+        assert keeper.lost is False
+        assert queue.get_job(job_id)["lease_expires"] > before
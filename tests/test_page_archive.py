@@ -0,0 +1,67 @@
+import json
+import time
+import pytest
+from unittest.mock import patch
+from core import page_archive
+from core.page_archive import PageArchive, reparse
+
+SEARCH_PAGE = ('<html><script type="application/json">'
+               + json.dumps({"items": [{"id": "m1", "name": "iPhone 13", "price": "52000"}]})
+               + '</script></html>')
+
+class TestPageArchive:
+    """Test suite for PageArchive"""
+
+    @pytest.fixture
+    def archive(self, tmp_path):
+        """Create a PageArchive in a temporary directory"""
+        archive = PageArchive(root=str(tmp_path / "archive"))
+        yield archive
+        archive.close()
+
+    def test_store_and_load_roundtrip(self, archive):
+        """Test archived HTML comes back unchanged"""
+        digest = archive.store("https://jp.mercari.com/search?keyword=iphone", "<html>日本語</html>")
+
+        assert archive.load(digest) == "<html>日本語</html>"
+
+    def test_identical_pages_are_deduplicated(self, archive):
+        """Test the same content is stored once but indexed per fetch"""
+        first = archive.store("https://jp.mercari.com/search?keyword=a", SEARCH_PAGE)
+        second = archive.store("https://jp.mercari.com/search?keyword=b", SEARCH_PAGE)
+
+        stats = archive.get_stats()
+        assert first == second
+        assert stats["pages"] == 2
+        assert stats["objects"] == 1
+
+    def test_zlib_fallback(self, archive):
+        """Test pages can be archived and read without zstandard"""
+        with patch.object(page_archive, "ZSTD_AVAILABLE", False):
+            digest = archive.store("https://jp.mercari.com/item/m1", "<html>item</html>", page_type="detail")
+            assert archive.load(digest) == "<html>item</html>"
+
+    def test_iter_pages_filters(self, archive):
+        """Test index queries by time range, page type and URL"""
+        now = time.time()
+        archive.store("https://jp.mercari.com/search?keyword=old", "old", fetched_at=now - 86400)
+        archive.store("https://jp.mercari.com/search?keyword=new", "new", fetched_at=now)
+        archive.store("https://jp.mercari.com/item/m1", "item", page_type="detail", fetched_at=now)
+
+        recent = list(archive.iter_pages(since=now - 60))
+        details = list(archive.iter_pages(page_type="detail"))
+        matching = list(archive.iter_pages(url_contains="keyword=old"))
+
+        assert len(recent) == 2
+        assert [p["url"] for p in details] == ["https://jp.mercari.com/item/m1"]
+        assert len(matching) == 1
+
+    def test_reparse_runs_extraction_over_archive(self, archive, tmp_path):
+        """Test bulk re-parsing extracts products from archived pages"""
+        archive.store("https://jp.mercari.com/search?keyword=iphone", SEARCH_PAGE)
+        pages = list(archive.iter_pages())
+
+        results = list(reparse(archive.root, pages, workers=1))
+
+        assert results[0]["error"] is None
+        assert [p["name"] for p in results[0]["products"]] == ["iPhone 13"]
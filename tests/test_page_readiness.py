@@ -0,0 +1,85 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from selenium.common.exceptions import JavascriptException
+from core.page_readiness import ReadinessWaiter, first_present
+from core.mercari_scraper import MercariScraper, SEARCH_FALLBACK_SELECTORS, SEARCH_READY_SELECTORS
+
+class TestReadinessWaiter:
+    """Test suite for ReadinessWaiter"""
+
+    @pytest.fixture
+    def waiter(self):
+        """Waiter with a short poll interval"""
+        return ReadinessWaiter(default_deadline=1.0, poll_interval=0.02)
+
+    @pytest.fixture
+    def driver(self):
+        """Driver whose page matches nothing"""
+        driver = MagicMock()
+        driver.execute_script.return_value = None
+        driver.find_elements.return_value = []
+        return driver
+
+    def test_returns_first_matching_selector(self, waiter, driver):
+        """Test every selector is checked in one round trip per poll"""
+        driver.execute_script.side_effect = [None, None, ".item-cell"]
+
+        matched = waiter.wait_for_any(driver, SEARCH_READY_SELECTORS, site="search")
+
+        assert matched == ".item-cell"
+        assert driver.execute_script.call_count == 3
+        assert waiter.get_stats()["search"]["matches"] == {".item-cell": 1}
+
+    def test_no_match_costs_one_deadline(self, waiter, driver):
+        """Test a page no selector fits gives up after the total deadline, not one per selector"""
+        started = time.monotonic()
+        matched = waiter.wait_for_any(driver, SEARCH_READY_SELECTORS, site="search", deadline=0.2)
+        elapsed = time.monotonic() - started
+
+        assert matched is None
+        assert 0.2 <= elapsed < 0.5
+        stats = waiter.get_stats()["search"]
+        assert stats["waits"] == 1 and stats["timeouts"] == 1
+        assert stats["max_seconds"] >= 0.2
+
+    def test_generic_selectors_only_checked_after_specific_ones_miss(self, waiter, driver):
+        """Test page chrome matching a generic selector does not end the wait before results render"""
+        def page(script, selectors):
+            return "article" if "article" in selectors else None
+        driver.execute_script.side_effect = page
+
+        matched = waiter.wait_for_any(driver, SEARCH_READY_SELECTORS, site="search", deadline=0.2,
+                                      fallback_selectors=SEARCH_FALLBACK_SELECTORS)
+
+        assert matched == "article"
+        passed_lists = [call.args[1] for call in driver.execute_script.call_args_list]
+        assert passed_lists[-1] == SEARCH_FALLBACK_SELECTORS
+        assert all(selectors == SEARCH_READY_SELECTORS for selectors in passed_lists[:-1])
+        stats = waiter.get_stats()["search"]
+        assert stats["fallbacks"] == 1 and stats["timeouts"] == 0
+        assert stats["max_seconds"] >= 0.2
+
+    def test_falls_back_to_element_lookups_without_scripts(self, driver):
+        """Test selectors are checked one by one when the script cannot run"""
+        driver.execute_script.side_effect = JavascriptException("blocked")
+        driver.find_elements.side_effect = lambda by, selector: [object()] if selector == ".item" else []
+
+        assert first_present(driver, [".item-cell", ".item", "article"]) == ".item"
+
+class TestMercariScraperReadiness:
+    """Test MercariScraper's Selenium readiness waits"""
+
+    def test_search_wait_uses_configured_deadline(self):
+        """Test the search page deadline comes from ready_deadlines and the page is still parsed on timeout"""
+        scraper = MercariScraper(use_selenium=False, ready_deadlines={"search": 3.5})
+        driver = MagicMock(page_source="<html></html>")
+
+        with patch.object(scraper.readiness, 'wait_for_any', return_value=None) as wait:
+            page_source = scraper._wait_for_search_results(driver)
+
+        assert page_source == "<html></html>"
+        assert wait.call_args.kwargs["deadline"] == 3.5
+        assert wait.call_args.kwargs["fallback_selectors"] == SEARCH_FALLBACK_SELECTORS
+        assert scraper.ready_deadlines["detail"] == 10.0
+        scraper.close()
@@ -0,0 +1,93 @@
+import asyncio
+import time
+import pytest
+from core.rate_limiter import AdaptiveRateLimiter, host_of, parse_retry_after
+
+class TestAdaptiveRateLimiter:
+    """Test suite for AdaptiveRateLimiter"""
+
+    @pytest.fixture
+    def limiter(self):
+        """Create an in-memory limiter for testing"""
+        return AdaptiveRateLimiter(initial_rate=10.0, min_rate=1.0, max_rate=20.0, burst=2.0,
+                                   additive_increase=1.0, multiplicative_decrease=0.5, latency_target=1.0)
+
+    def test_host_of(self):
+        """Test URLs are bucketed by host"""
+        assert host_of("https://jp.mercari.com/search?keyword=iPhone") == "jp.mercari.com"
+
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing"""
+        assert parse_retry_after("5") == 5.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+
+    def test_burst_is_free_then_waits(self, limiter):
+        """Test the burst is served immediately and later requests are spaced by the rate"""
+        assert limiter.reserve("jp.mercari.com") == 0.0
+        assert limiter.reserve("jp.mercari.com") == 0.0
+        wait = limiter.reserve("jp.mercari.com")
+        assert wait == pytest.approx(0.1, abs=0.02)
+
+    def test_reservations_queue_up(self, limiter):
+        """Test successive reservations wait progressively longer"""
+        limiter.reserve("jp.mercari.com")
+        limiter.reserve("jp.mercari.com")
+        first = limiter.reserve("jp.mercari.com")
+        second = limiter.reserve("jp.mercari.com")
+        assert second > first
+
+    def test_hosts_are_independent(self, limiter):
+        """Test each host has its own bucket"""
+        for _ in range(3):
+            limiter.reserve("jp.mercari.com")
+        assert limiter.reserve("static.mercdn.net") == 0.0
+
+    def test_throttle_halves_rate(self, limiter):
+        """Test 429 and 503 responses cut the rate multiplicatively"""
+        assert limiter.record("jp.mercari.com", status=429) == pytest.approx(5.0)
+        assert limiter.record("jp.mercari.com", status=503) == pytest.approx(2.5)
+
+    def test_rate_never_below_minimum(self, limiter):
+        """Test the rate is floored at min_rate"""
+        for _ in range(10):
+            limiter.record("jp.mercari.com", error=True)
+        assert limiter.get_rate("jp.mercari.com") == pytest.approx(1.0)
+
+    def test_slow_response_lowers_rate(self, limiter):
+        """Test latency above target is treated as congestion"""
+        assert limiter.record("jp.mercari.com", status=200, latency=2.0) == pytest.approx(5.0)
+
+    def test_success_increases_additively(self, limiter):
+        """Test healthy responses raise the rate up to max_rate"""
+        assert limiter.record("jp.mercari.com", status=200, latency=0.2) == pytest.approx(11.0)
+        for _ in range(20):
+            limiter.record("jp.mercari.com", status=200, latency=0.2)
+        assert limiter.get_rate("jp.mercari.com") == pytest.approx(20.0)
+
+    def test_retry_after_pushes_bucket_into_debt(self, limiter):
+        """Test Retry-After delays the next request by at least that long"""
+        limiter.record("jp.mercari.com", status=429, retry_after=2.0)
+        assert limiter.reserve("jp.mercari.com") >= 2.0
+
+    def test_acquire_async_waits(self, limiter):
+        """Test async acquire sleeps for the reserved wait"""
+        async def scenario():
+            start = time.monotonic()
+            for _ in range(3):
+                await limiter.acquire_async("jp.mercari.com")
+            return time.monotonic() - start
+
+        assert asyncio.run(scenario()) >= 0.08
+
+    def test_sqlite_state_shared_between_instances(self, tmp_path):
+        """Test two limiters on the same file share buckets, as separate processes would"""
+        path = str(tmp_path / "rate_limits.sqlite")
+        first = AdaptiveRateLimiter(initial_rate=10.0, burst=1.0, state_path=path)
+        second = AdaptiveRateLimiter(initial_rate=10.0, burst=1.0, state_path=path)
+
+        assert first.reserve("jp.mercari.com") == 0.0
+        assert second.reserve("jp.mercari.com") > 0.0
+
+        first.record("jp.mercari.com", status=429)
+        assert second.get_rate("jp.mercari.com") == pytest.approx(5.0)
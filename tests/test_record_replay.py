@@ -0,0 +1,53 @@
+import pytest
+import requests
+from benchmarks.record_replay import Recordings, ReplayServer, request_key, search_url
+
+class TestRecordReplay:
+    """Test suite for the offline record/replay harness"""
+
+    @pytest.fixture
+    def recordings(self, tmp_path):
+        """Create recordings with one search page and one item page"""
+        recordings = Recordings(str(tmp_path / "recordings"))
+        recordings.add(search_url("iphone"), "<html>iphone results</html>")
+        recordings.add("https://jp.mercari.com/item/m123", "<html>item m123</html>")
+        recordings.save()
+        return Recordings(str(tmp_path / "recordings"))
+
+    def test_request_key_ignores_host_and_param_order(self):
+        """Test live and replay URLs map to the same key"""
+        assert request_key("https://jp.mercari.com/search?b=2&a=1") == request_key("http://127.0.0.1:9/search?a=1&b=2")
+
+    def test_index_roundtrip(self, recordings):
+        """Test saved recordings are found again after reloading"""
+        assert recordings.search_queries() == ["iphone"]
+        assert recordings.item_paths() == ["/item/m123"]
+
+    def test_lookup_falls_back_to_keyword(self, recordings):
+        """Test a search with different extra parameters still finds the recording"""
+        entry = recordings.lookup("/search?keyword=iphone")
+
+        assert recordings.read_body(entry) == b"<html>iphone results</html>"
+
+    def test_keyword_fallback_keeps_pages_apart(self, tmp_path):
+        """Test later pages, requested with page_token, are not served page 1's recording"""
+        recordings = Recordings(str(tmp_path / "paged"))
+        recordings.add(search_url("iphone"), "<html>page 1</html>")
+        recordings.add(f"{search_url('iphone')}&page_token=v1:1", "<html>page 2</html>")
+
+        page_2 = recordings.lookup("/search?keyword=iphone&page_token=v1%3A1")
+        page_1 = recordings.lookup("/search?keyword=iphone")
+
+        assert recordings.read_body(page_2) == b"<html>page 2</html>"
+        assert recordings.read_body(page_1) == b"<html>page 1</html>"
+
+    def test_replay_server(self, recordings):
+        """Test recorded pages are served over HTTP and unknown paths get 404"""
+        with ReplayServer(recordings) as server:
+            hit = requests.get(f"{server.base_url}/item/m123", timeout=5)
+            miss = requests.get(f"{server.base_url}/item/unknown", timeout=5)
+
+        assert hit.status_code == 200
+        assert hit.text == "<html>item m123</html>"
+        assert miss.status_code == 404
+        assert server.stats == {"served": 1, "missing": 1}
@@ -0,0 +1,112 @@
+import pytest
+from core.refresh_scheduler import RefreshScheduler, match_demand
+from scheduled_scraper import record_refreshes
+
+NOW = 1_700_000_000.0
+
+class TestRefreshScheduler:
+    """Test suite for RefreshScheduler"""
+
+    @pytest.fixture
+    def scheduler(self):
+        """In-memory scheduler with a small budget"""
+        return RefreshScheduler(path=None, pages_per_hour=10, default_churn=2.0, min_interval=600)
+
+    def test_match_demand_counts_searches_containing_query(self):
+        """Test user searches are attributed to every scheduled query they mention"""
+        counts = {"iphone 13 cheap": 4, "iPhone case": 2, "rolex": 1}
+
+        demand = match_demand(["iPhone", "Rolex", "Chanel"], counts)
+
+        assert demand == {"iPhone": 6, "Rolex": 1, "Chanel": 0}
+
+    def test_demand_raises_priority(self, scheduler):
+        """Test a searched query outranks an unsearched one with the same churn and age"""
+        plan = scheduler.plan(["niche", "iPhone"], {"iPhone": 20}, now=NOW)
+
+        assert [item["query"] for item in plan] == ["iPhone", "niche"]
+
+    def test_churn_and_age_raise_priority(self, scheduler):
+        """Test fast-churning and long-unrefreshed queries come first"""
+        scheduler.record_refresh("slow", 0, 1, now=NOW - 7200)
+        scheduler.record_refresh("fast", 0, 1, now=NOW - 7200)
+        scheduler.record_refresh("slow", 1, 1, now=NOW - 3600)
+        scheduler.record_refresh("fast", 50, 1, now=NOW - 3600)
+
+        plan = scheduler.plan(["slow", "fast"], now=NOW + 3600)
+
+        assert plan[0]["query"] == "fast"
+        assert scheduler.get_query_state("fast")["churn"] > scheduler.get_query_state("slow")["churn"]
+
+    def test_recently_refreshed_query_is_skipped(self, scheduler):
+        """Test a query is not refreshed again within min_interval"""
+        scheduler.record_refresh("iPhone", 5, 1, now=NOW - 60)
+
+        assert scheduler.priority("iPhone", demand=100, now=NOW) == 0.0
+        assert scheduler.plan(["iPhone"], now=NOW) == []
+
+    def test_plan_respects_hourly_budget(self, scheduler):
+        """Test the plan stops once the per-hour page budget is spent"""
+        for i, query in enumerate(["a", "b", "c"]):
+            scheduler.record_refresh(query, 0, 4, now=NOW - 7200 - i)
+
+        plan = scheduler.plan(["a", "b", "c"], now=NOW)
+        assert sum(item["cost"] for item in plan) <= 10
+        assert len(plan) == 2
+
+        scheduler.record_refresh("x", 0, 8, now=NOW)
+        assert scheduler.budget_remaining(now=NOW + 1) == 2
+        assert scheduler.budget_remaining(now=NOW + 3601) == 10
+
+    def test_unrefreshed_queries_cost_the_page_limit(self):
+        """Test a query with no history is budgeted at the crawl's page limit, not one page"""
+        scheduler = RefreshScheduler(path=None, pages_per_hour=12, default_pages=5)
+
+        plan = scheduler.plan(["a", "b", "c"], now=NOW)
+
+        assert [item["cost"] for item in plan] == [5, 5]
+
+    def test_page_caps_hold_the_budget_when_queries_grow(self, scheduler):
+        """Test crawls that find more pages than last run still fit the hourly budget"""
+        scheduler.default_pages = 5
+        for query in ["a", "b"]:
+            scheduler.record_refresh(query, 0, 1, now=NOW - 7200)
+
+        plan = scheduler.plan(["a", "b", "c"], now=NOW)
+        # Every query now has a full max_pages of new listings, so each crawl runs to its cap
+        record_refreshes(scheduler, {
+            item["query"]: {"error": None, "new_products": [], "pages_fetched": item["pages"]} for item in plan
+        })
+
+        assert [item["cost"] for item in plan] == [5, 1, 1]
+        assert sum(item["pages"] for item in plan) == 10
+        assert all(item["cost"] <= item["pages"] <= 5 for item in plan)
+        assert scheduler.budget_remaining(now=NOW + 1) == 0
+
+    def test_failed_crawls_are_not_recorded(self, scheduler):
+        """Test an errored crawl is not charged, does not lower churn and can run again"""
+        summaries = {
+            "ok": {"error": None, "new_products": [{}, {}], "pages_fetched": 2},
+            "broken": {"error": "timeout", "new_products": [], "pages_fetched": 1},
+        }
+
+        record_refreshes(scheduler, summaries)
+
+        assert scheduler.get_query_state("broken") is None
+        assert scheduler.get_query_state("ok")["pages"] == 2
+        assert scheduler.budget_remaining() == 8
+        assert scheduler.priority("broken") > 0
+
+    def test_state_persists(self, tmp_path):
+        """Test churn estimates and fetch history survive a reload"""
+        path = str(tmp_path / "schedule.json")
+        scheduler = RefreshScheduler(path=path, pages_per_hour=10)
+        scheduler.record_refresh("iPhone", 0, 3, now=NOW - 3600)
+        scheduler.record_refresh("iPhone", 12, 3, now=NOW)
+        scheduler.save()
+
+        reloaded = RefreshScheduler(path=path, pages_per_hour=10)
+
+        assert reloaded.get_query_state("iPhone") == scheduler.get_query_state("iPhone")
+        # The refresh an hour earlier has left the budget window
+        assert reloaded.budget_remaining(now=NOW + 1) == 7
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from core.resource_blocker import ResourceBlocker, ESTIMATED_BYTES_BY_TYPE
+
+def make_route(resource_type, url):
+    """Create a fake Playwright route for a request"""
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.url = url
+    route.abort = AsyncMock()
+    route.continue_ = AsyncMock()
+    return route
+
+class TestResourceBlocker:
+    """Test suite for ResourceBlocker"""
+
+    @pytest.fixture
+    def blocker(self):
+        """Create ResourceBlocker instance for testing"""
+        return ResourceBlocker()
+
+    @pytest.fixture
+    def page(self):
+        """Create a fake page that records its route handler"""
+        page = MagicMock()
+        page.route = AsyncMock()
+        return page
+
+    def run_route(self, page, route):
+        """Invoke the handler the blocker installed on the page"""
+        handler = page.route.await_args.args[1]
+        asyncio.run(handler(route))
+
+    def test_should_block_by_type(self, blocker):
+        """Test heavy resource types are blocked and page scripts are not"""
+        assert blocker.should_block("image", "https://static.mercdn.net/item/1.jpg")
+        assert blocker.should_block("font", "https://jp.mercari.com/font.woff2")
+        assert not blocker.should_block("document", "https://jp.mercari.com/search")
+        assert not blocker.should_block("script", "https://jp.mercari.com/app.js")
+
+    def test_should_block_trackers(self, blocker):
+        """Test analytics scripts are blocked even though scripts are allowed"""
+        assert blocker.should_block("script", "https://www.googletagmanager.com/gtm.js")
+
+    def test_custom_allow_list(self):
+        """Test a custom allow list overrides the defaults"""
+        blocker = ResourceBlocker(allowed_types=["document", "script", "xhr", "fetch", "image"])
+        assert not blocker.should_block("image", "https://static.mercdn.net/item/1.jpg")
+
+    def test_handler_counts_per_page(self, blocker, page):
+        """Test blocked requests are aborted and counted for the page"""
+        asyncio.run(blocker.attach(page))
+        image_route = make_route("image", "https://static.mercdn.net/item/1.jpg")
+        doc_route = make_route("document", "https://jp.mercari.com/search")
+
+        self.run_route(page, image_route)
+        self.run_route(page, doc_route)
+
+        image_route.abort.assert_awaited_once()
+        doc_route.continue_.assert_awaited_once()
+        stats = blocker.page_stats(page)
+        assert stats["blocked"] == {"image": 1}
+        assert stats["allowed"] == 1
+        assert stats["estimated_bytes_saved"] == ESTIMATED_BYTES_BY_TYPE["image"]
+
+    def test_reset_page_stats(self, blocker, page):
+        """Test resetting returns the snapshot and clears the counters"""
+        asyncio.run(blocker.attach(page))
+        self.run_route(page, make_route("font", "https://jp.mercari.com/font.woff2"))
+
+        snapshot = blocker.reset_page_stats(page)
+
+        assert snapshot["blocked"] == {"font": 1}
+        assert blocker.page_stats(page)["blocked"] == {}
+        assert blocker.totals["blocked"] == {"font": 1}
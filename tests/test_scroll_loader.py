@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from core.scroll_loader import SCROLL_UNTIL_LOADED_JS, scroll_until_loaded
+
+class TestScrollLoader:
+    """Test suite for the event-driven scroll loader"""
+
+    def test_passes_limits_to_page_script(self):
+        """Test the selector, target and deadlines are sent to the in-page script in milliseconds"""
+        page = MagicMock()
+        page.evaluate = AsyncMock(return_value={"items": 120, "scrolls": 3, "elapsed_ms": 850, "reason": "target"})
+
+        result = asyncio.run(scroll_until_loaded(page, '[class*="item"]', max_items=120, deadline=10,
+                                                 stall_timeout=2))
+
+        script, options = page.evaluate.await_args.args
+        assert script == SCROLL_UNTIL_LOADED_JS
+        assert options == {"selector": '[class*="item"]', "maxItems": 120, "deadlineMs": 10000, "stallMs": 2000}
+        assert result == {"items": 120, "scrolls": 3, "elapsed": 0.85, "reason": "target"}
+
+    def test_script_failure_is_reported(self):
+        """Test a failing page script does not raise"""
+        page = MagicMock()
+        page.evaluate = AsyncMock(side_effect=Exception("page closed"))
+
+        result = asyncio.run(scroll_until_loaded(page, ".item"))
+
+        assert result["reason"] == "error"
+
+# A list that appends ten 200px items shortly after each scroll, until it holds total items
+GROWING_LIST_HTML = """
+<ul id="list"></ul>
+<script>
+    const list = document.getElementById('list');
+    let added = 0;
+    function addBatch() {
+        for (let i = 0; i < 10 && added < %d; i++) {
+            const item = document.createElement('li');
+            item.className = 'item';
+            item.style.height = '200px';
+            item.textContent = added++;
+            list.appendChild(item);
+        }
+    }
+    addBatch();
+    window.addEventListener('scroll', () => setTimeout(addBatch, 50));
+</script>
+"""
+
+class TestScrollLoaderInBrowser:
+    """Run SCROLL_UNTIL_LOADED_JS on a real page; skipped when no Playwright browser is installed"""
+
+    def scroll(self, total, **kwargs):
+        """Load a growing list of up to total items and scroll it"""
+        async def scenario():
+            from playwright.async_api import async_playwright
+            async with async_playwright() as playwright:
+                try:
+                    browser = await playwright.chromium.launch()
+                except Exception:
+                    return None
+                try:
+                    page = await browser.new_page()
+                    await page.set_content(GROWING_LIST_HTML % total)
+                    return await scroll_until_loaded(page, ".item", **kwargs)
+                finally:
+                    await browser.close()
+
+        result = asyncio.run(scenario())
+        if result is None:
+            pytest.skip("No Playwright browser installed")
+        return result
+
+    def test_stops_at_target(self):
+        """Test scrolling stops once max_items items have loaded"""
+        result = self.scroll(100, max_items=30, deadline=10, stall_timeout=2)
+
+        assert result["reason"] == "target"
+        assert 30 <= result["items"] < 100
+
+    def test_stops_when_growth_stalls(self):
+        """Test the observer gives up stall_timeout after the list stops growing"""
+        result = self.scroll(25, deadline=10, stall_timeout=0.5)
+
+        assert result["reason"] == "stalled"
+        assert result["items"] == 25
+        assert result["elapsed"] < 5
+
+    def test_stops_at_deadline(self):
+        """Test an endless list is cut off at the deadline"""
+        result = self.scroll(100000, deadline=1, stall_timeout=2)
+
+        assert result["reason"] == "deadline"
+        assert result["items"] > 10
+        assert result["elapsed"] < 3
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from core.mercari_scraper import MercariScraper
+from tests.test_structured_data import NEXT_DATA, page_with
+
+class TestMercariSearchStreaming:
+    """Test suite for MercariScraper's streaming search APIs"""
+
+    @pytest.fixture
+    def scraper(self):
+        """requests-only scraper without cache or archive"""
+        scraper = MercariScraper(use_selenium=False)
+        scraper.http_cache = None
+        scraper.page_archive = None
+        yield scraper
+        scraper.close()
+
+    def test_iter_search_products_yields_parsed_products(self, scraper):
+        """Test products come out of the generator as the page is parsed"""
+        with patch.object(scraper, '_cached_get', return_value=page_with(NEXT_DATA)):
+            stream = scraper.iter_search_products("iphone")
+            first = next(stream)
+            rest = list(stream)
+
+        assert first["id"] == "m111"
+        assert [p["id"] for p in rest] == ["m222"]
+
+    def test_iter_search_products_streams_selenium_pages(self, scraper):
+        """Test the Selenium path also yields products as they are parsed instead of building a list"""
+        scraper.use_selenium = True
+        scraper.driver_pool = MagicMock(available=True)
+
+        with patch.object(scraper, '_fetch_with_selenium', return_value=page_with(NEXT_DATA)) as fetch, \
+             patch.object(scraper, '_parse_mercari_html') as parse_all:
+            stream = scraper.iter_search_products("iphone")
+            first = next(stream)
+
+        assert first["id"] == "m111"
+        fetch.assert_called_once()
+        parse_all.assert_not_called()
+
+    def test_iter_search_products_falls_back_to_samples(self, scraper):
+        """Test a failed fetch yields the same sample products as search_products"""
+        with patch.object(scraper, '_cached_get', side_effect=Exception("down")):
+            products = list(scraper.iter_search_products("iphone"))
+
+        assert products
+        assert all(p["id"] for p in products)
+
+    def test_stream_search_many_yields_pages_as_they_arrive(self, scraper):
+        """Test the faster query's products are yielded before the slower page completes"""
+        async def fetch(url, params, headers):
+            if params["keyword"] == "slow":
+                await asyncio.sleep(0.1)
+            return {"error": None, "status": 200, "cache": None, "text": page_with(NEXT_DATA), "url": url}
+
+        scraper.fetch_engine.fetch = AsyncMock(side_effect=fetch)
+
+        async def collect():
+            return [(query, product["id"]) async for query, product in scraper.stream_search_many(["slow", "fast"])]
+
+        pairs = asyncio.run(collect())
+
+        assert pairs == [("fast", "m111"), ("fast", "m222"), ("slow", "m111"), ("slow", "m222")]
+
+    def test_stream_search_many_skips_failed_pages(self, scraper):
+        """Test a failed query yields nothing while the others still stream"""
+        async def fetch(url, params, headers):
+            if params["keyword"] == "broken":
+                return {"error": "timeout", "status": None, "cache": None, "text": "", "url": url}
+            return {"error": None, "status": 200, "cache": None, "text": page_with(NEXT_DATA), "url": url}
+
+        scraper.fetch_engine.fetch = AsyncMock(side_effect=fetch)
+
+        async def collect():
+            return [query async for query, _ in scraper.stream_search_many(["broken", "ok"])]
+
+        assert asyncio.run(collect()) == ["ok", "ok"]
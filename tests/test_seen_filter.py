@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import Mock
+from core.seen_filter import SeenFilter, load_seen_filter
+from scheduled_scraper import save_products
+
+class TestSeenFilter:
+    """Test suite for SeenFilter and load_seen_filter"""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Filter file location"""
+        return str(tmp_path / "seen_ids.bloom")
+
+    def test_added_ids_are_always_found(self):
+        """Test there are no false negatives"""
+        seen = SeenFilter(capacity=1000)
+        ids = [f"m{i}" for i in range(1000)]
+        seen.update(ids)
+
+        assert all(item in seen for item in ids)
+        assert seen.add("m1") is False
+        assert seen.add("m-new") is True
+
+    def test_false_positive_rate_stays_near_target(self):
+        """Test unseen IDs are rarely reported as seen at capacity"""
+        seen = SeenFilter(capacity=5000, error_rate=0.01)
+        seen.update(f"m{i}" for i in range(5000))
+
+        false_positives = sum(f"x{i}" in seen for i in range(10000))
+
+        assert false_positives < 300
+
+    def test_save_and_load_round_trip(self, path):
+        """Test a reloaded filter answers the same as the saved one"""
+        seen = SeenFilter(capacity=100)
+        seen.update(["m1", "m2"])
+        seen.save(path)
+
+        loaded = SeenFilter.load(path)
+
+        assert "m1" in loaded and "m2" in loaded
+        assert loaded.count == 2
+
+    def test_missing_file_is_built_from_stored_ids(self, path):
+        """Test the first run seeds the filter from the database and saves it"""
+        load_ids = Mock(return_value=["m1", "m2"])
+
+        seen = load_seen_filter(path, load_ids)
+        again = load_seen_filter(path, load_ids)
+
+        assert "m1" in seen and "m2" in again
+        load_ids.assert_called_once()
+
+    def test_corrupt_or_saturated_file_is_rebuilt(self, path):
+        """Test an unusable file falls back to the stored IDs"""
+        with open(path, "wb") as f:
+            f.write(b"garbage")
+        assert "m1" in load_seen_filter(path, lambda: ["m1"])
+
+        full = SeenFilter(capacity=2)
+        full.update(["a", "b", "c"])
+        full.save(path)
+        rebuilt = load_seen_filter(path, lambda: ["a", "b", "c"])
+        assert not rebuilt.is_saturated
+
+    def test_unreadable_ids_give_no_filter(self, path):
+        """Test a database error disables the filter rather than marking everything unseen"""
+        assert load_seen_filter(path, lambda: None) is None
+
+    def test_save_products_only_checks_possible_duplicates(self):
+        """Test unseen IDs are inserted without a lookup and added to the filter"""
+        seen = SeenFilter(capacity=100)
+        seen.add("old")
+        db = Mock()
+        db.get_product_by_id.return_value = {"id": "old"}
+        db.add_product.return_value = True
+        ranker = Mock()
+        ranker.rank_products.side_effect = lambda products, prefs: products
+        products = [{"id": "old", "name": "Old"}, {"id": "new", "name": "New"}]
+
+        added = save_products(db, ranker, "iphone", products, seen)
+
+        assert added == 1
+        db.get_product_by_id.assert_called_once_with("old")
+        db.add_product.assert_called_once_with(products[1])
+        assert "new" in seen
+
+    def test_save_products_remembers_ids_another_writer_stored(self):
+        """Test a failed insert of a row that exists is remembered, while a real error is not"""
+        seen = SeenFilter(capacity=100)
+        stored = {"raced"}
+        db = Mock()
+        db.get_product_by_id.side_effect = lambda product_id: {"id": product_id} if product_id in stored else None
+        db.add_product.return_value = False
+        ranker = Mock()
+        ranker.rank_products.side_effect = lambda products, prefs: products
+        failed = []
+
+        added = save_products(db, ranker, "iphone", [{"id": "raced", "name": "Raced"}, {"id": "bad", "name": "Bad"}],
+                              seen, failed)
+
+        assert added == 0
+        assert "raced" in seen
+        assert "bad" not in seen
+        assert failed == ["bad"]
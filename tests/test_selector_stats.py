@@ -0,0 +1,79 @@
+import pytest
+from core.selector_stats import SelectorStats
+
+class TestSelectorStats:
+    """Test suite for SelectorStats"""
+
+    @pytest.fixture
+    def stats(self):
+        """Create an in-memory SelectorStats for testing"""
+        return SelectorStats(dead_after=3, reprobe_interval=0)
+
+    @pytest.fixture
+    def selectors(self):
+        """Candidate selectors in their hand-written priority order"""
+        return ['[data-testid="item-name"]', '.item-name', 'h3']
+
+    def test_unseen_selectors_keep_order(self, stats, selectors):
+        """Test the original order is used before anything is learned"""
+        assert stats.ordered('search', 'name', selectors) == selectors
+
+    def test_winner_moves_first(self, stats, selectors):
+        """Test the selector that matched is tried first next time"""
+        stats.record('search', 'name', '[data-testid="item-name"]', False)
+        stats.record('search', 'name', '.item-name', True)
+
+        assert stats.ordered('search', 'name', selectors)[0] == '.item-name'
+
+    def test_fields_and_page_types_are_separate(self, stats, selectors):
+        """Test learning for one field does not reorder another"""
+        stats.record('search', 'name', 'h3', True)
+
+        assert stats.ordered('detail', 'name', selectors) == selectors
+        assert stats.ordered('search', 'price', selectors) == selectors
+
+    def test_dead_selectors_dropped(self, stats, selectors):
+        """Test selectors that never match are skipped after dead_after attempts"""
+        for _ in range(3):
+            stats.record('search', 'name', '[data-testid="item-name"]', False)
+        stats.record('search', 'name', '.item-name', True)
+
+        assert '[data-testid="item-name"]' not in stats.ordered('search', 'name', selectors)
+
+    def test_all_dead_returns_everything(self, stats, selectors):
+        """Test every selector is retried when none of them work any more"""
+        for selector in selectors:
+            for _ in range(3):
+                stats.record('search', 'name', selector, False)
+
+        assert sorted(stats.ordered('search', 'name', selectors)) == sorted(selectors)
+
+    def test_reprobe_includes_dead_selectors(self, selectors):
+        """Test dead selectors come back on the periodic reprobe"""
+        stats = SelectorStats(dead_after=1, reprobe_interval=2)
+        stats.record('search', 'name', 'h3', False)
+        stats.record('search', 'name', '.item-name', True)
+
+        assert 'h3' not in stats.ordered('search', 'name', selectors)
+        assert 'h3' in stats.ordered('search', 'name', selectors)
+
+    def test_persistence_round_trip(self, tmp_path, selectors):
+        """Test hit rates survive a save and reload"""
+        path = str(tmp_path / "selector_stats.json")
+        stats = SelectorStats(path=path)
+        stats.record('search', 'name', 'h3', True)
+        stats.save()
+
+        reloaded = SelectorStats(path=path)
+
+        assert reloaded.get_hit_rates('search', 'name') == {'h3': 1.0}
+        assert reloaded.ordered('search', 'name', selectors)[0] == 'h3'
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        """Test an unreadable stats file starts from empty counters"""
+        path = tmp_path / "selector_stats.json"
+        path.write_text("{not json")
+
+        stats = SelectorStats(path=str(path))
+
+        assert stats.get_hit_rates('search', 'name') == {}
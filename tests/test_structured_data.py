@@ -0,0 +1,114 @@
+import json
+import pytest
+from unittest.mock import patch
+from core.structured_data import extract_products, find_json_scripts, normalize_product
+
+BASE_URL = "https://jp.mercari.com"
+
+NEXT_DATA = {
+    "props": {"pageProps": {"search": {"items": [
+        {"id": "m111", "name": "iPhone 13", "price": "52000", "itemConditionId": "2",
+         "thumbnails": ["https://static.mercdn.net/thumb/item/webp/m111_1.jpg?123"],
+         "itemBrand": {"name": "Apple"}, "seller": {"name": "taro"}},
+        {"id": "m222", "name": "iPad Air", "price": 30500, "itemConditionId": 4,
+         "thumbnails": []}
+    ]}}}
+}
+
+JSON_LD = {
+    "@context": "https://schema.org",
+    "@type": "Product",
+    "name": "Nintendo Switch",
+    "image": ["https://static.mercdn.net/item/detail/orig/photos/m333_1.jpg"],
+    "brand": {"@type": "Brand", "name": "Nintendo"},
+    "description": "Barely used",
+    "offers": {"@type": "Offer", "price": "25000", "priceCurrency": "JPY",
+               "itemCondition": "https://schema.org/UsedCondition", "url": "https://jp.mercari.com/item/m333"},
+    "url": "/item/m333"
+}
+
+def page_with(*payloads, script_type="application/json"):
+    """Build a page with the given JSON payloads embedded"""
+    scripts = "".join(f'<script type="{script_type}">{json.dumps(p)}</script>' for p in payloads)
+    return f"<html><head><script>var x = 1;</script>{scripts}</head><body></body></html>"
+
+class TestStructuredData:
+    """Test suite for embedded JSON product extraction"""
+
+    def test_find_json_scripts_skips_plain_scripts(self):
+        """Test only JSON script bodies are returned"""
+        html = ('<script>var a = 1;</script>'
+                '<script id="__NEXT_DATA__" type="application/json">{"a": 1}</script>'
+                '<script type="application/ld+json">{"b": 2}</script>')
+
+        assert find_json_scripts(html) == ['{"a": 1}', '{"b": 2}']
+
+    def test_extracts_hydration_items(self):
+        """Test products are read from a Next.js payload"""
+        products = extract_products(page_with(NEXT_DATA), BASE_URL)
+
+        assert [p["id"] for p in products] == ["m111", "m222"]
+        assert products[0]["price"] == 52000
+        assert products[0]["condition"] == "like_new"
+        assert products[0]["brand"] == "Apple"
+        assert products[0]["url"] == "https://jp.mercari.com/item/m111"
+        assert products[1]["image_url"] is None
+
+    def test_extracts_json_ld_product(self):
+        """Test a schema.org Product is normalized"""
+        products = extract_products(page_with(JSON_LD, script_type="application/ld+json"), BASE_URL)
+
+        assert len(products) == 1
+        product = products[0]
+        assert product["id"] == "m333"
+        assert product["price"] == 25000
+        assert product["condition"] == "good"
+        assert product["brand"] == "Nintendo"
+        assert product["url"] == "https://jp.mercari.com/item/m333"
+        assert product["description"] == "Barely used"
+
+    def test_duplicates_and_limit(self):
+        """Test products repeated across payloads are returned once and limit is honoured"""
+        html = page_with(NEXT_DATA, NEXT_DATA)
+
+        assert len(extract_products(html, BASE_URL)) == 2
+        assert len(extract_products(html, BASE_URL, limit=1)) == 1
+
+    def test_invalid_json_is_skipped(self):
+        """Test malformed payloads do not raise"""
+        html = '<script type="application/json">{not json</script>'
+
+        assert extract_products(html, BASE_URL) == []
+
+    def test_product_without_price_is_dropped(self):
+        """Test nodes missing required fields are ignored"""
+        assert normalize_product({"@type": "Product", "name": "No price"}, BASE_URL) is None
+
+class TestMercariScraperStructuredData:
+    """Test MercariScraper prefers embedded JSON over the DOM walk"""
+
+    @pytest.fixture
+    def scraper(self, tmp_path, monkeypatch):
+        """Create a requests-only MercariScraper"""
+        from core.mercari_scraper import MercariScraper
+        monkeypatch.setenv("SCRAPER_SELECTOR_STATS", str(tmp_path / "selector_stats.json"))
+        scraper = MercariScraper(use_selenium=False)
+        yield scraper
+        scraper.close()
+
+    def test_parse_uses_embedded_json(self, scraper):
+        """Test the DOM parser is skipped when the page embeds product JSON"""
+        with patch.object(scraper.parser, "parse") as mock_parse:
+            products = scraper._parse_mercari_html(page_with(NEXT_DATA))
+
+        mock_parse.assert_not_called()
+        assert [p["name"] for p in products] == ["iPhone 13", "iPad Air"]
+        assert products[0]["image_url"] == "https://static.mercdn.net/thumb/item/webp/m111_1.jpg"
+        assert products[1]["category"] == "Electronics"
+
+    def test_parse_falls_back_to_dom(self, scraper):
+        """Test pages without embedded JSON still go through the DOM walk"""
+        with patch.object(scraper.parser, "parse", wraps=scraper.parser.parse) as mock_parse:
+            scraper._parse_mercari_html("<html><body><p>nothing here</p></body></html>")
+
+        mock_parse.assert_called_once()